@@ -0,0 +1,98 @@
+"""Measure the ingestion of a bulk archive into the warehouse.
+
+A synthetic archive shaped like the EIA natural gas bulk file (one JSON
+series per line) is loaded with `bulk.ingest`. Reported: rows/sec, archive
+size and peak traced allocations (in a second run), which stay bounded by
+the batch size whatever the size of the archive.
+
+Usage: python benchmarks/bench_bulk.py [--series 2000] [--months 600]
+    [--batch-size 100000]
+"""
+import argparse
+import json
+import random
+import tempfile
+import time
+import tracemalloc
+import zipfile
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from synthetic import AREAS, PROCESSES
+
+
+def make_archive(
+    path: Path, series: int, months: int
+) -> Tuple[int, List[Dict[str, Any]]]:
+    """Write a synthetic bulk archive.
+
+    Returns its number of rows and an API v2 row of each series, to index
+    them under natural-gas/cons/sum.
+    """
+    rng = random.Random(0)
+    rows = []
+    periods = [f"{1975 + m // 12}{m % 12 + 1:02d}" for m in range(months)]
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as z:
+        with z.open("NG.txt", "w") as f:
+            f.write(json.dumps({"category_id": "1", "name": "Natural Gas"}).encode())
+            f.write(b"\n")
+            for i in range(series):
+                area, area_name = AREAS[i % len(AREAS)]
+                process, process_name = PROCESSES[i % len(PROCESSES)]
+                rows.append(
+                    {
+                        "series": f"N{i:05d}{area[1:]}2",
+                        "duoarea": area,
+                        "area-name": area_name,
+                        "process": process,
+                        "process-name": process_name,
+                        "units": "MMCF",
+                    }
+                )
+                line = {
+                    "series_id": f"NG.N{i:05d}{area[1:]}2.M",
+                    "name": f"{area_name} {process_name}, Monthly",
+                    "units": "Million Cubic Feet",
+                    "f": "M",
+                    "geography": "USA" if area == "NUS" else f"USA-{area[1:]}",
+                    "data": [[p, rng.random() * 1e5] for p in reversed(periods)],
+                }
+                f.write(json.dumps(line).encode() + b"\n")
+    return series * months, rows
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--series", type=int, default=2_000)
+    parser.add_argument("--months", type=int, default=600)
+    parser.add_argument("--batch-size", type=int, default=100_000)
+    args = parser.parse_args()
+
+    # pylint: disable=import-outside-toplevel
+    from openbb_energy.eia.utils.bulk import SeriesIndex, index_rows, ingest
+    from openbb_energy.eia.utils.warehouse import ParquetWarehouse
+
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = Path(tmp) / "NG.zip"
+        rows, v2_rows = make_archive(archive, args.series, args.months)
+        index: SeriesIndex = {}
+        index_rows(index, "natural-gas/cons/sum", v2_rows)
+        warehouse = ParquetWarehouse(Path(tmp) / "warehouse")
+        start = time.perf_counter()
+        written = ingest(archive, warehouse, index, batch_size=args.batch_size)
+        elapsed = time.perf_counter() - start
+        # Tracing slows the ingestion down, so it is measured separately.
+        tracemalloc.start()
+        ingest(archive, warehouse, index, batch_size=args.batch_size)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(f"archive: {archive.stat().st_size / (1 << 20):.1f} MB, {rows} rows")
+        print(f"written: {written}")
+        print(f"ingest: {elapsed:.1f}s, {rows / elapsed:,.0f} rows/s")
+        print(f"peak traced allocations: {peak / (1 << 20):.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Benchmark the columnar output against the data model path.
+
+Usage: python benchmarks/bench_columnar.py [rows ...]
+"""
+import copy
+import sys
+import time
+
+from openbb_energy.eia.natural_gas.natural_gas import (
+    NATURAL_GAS_COLUMNS,
+    NaturalGasBaseFetcher,
+    NaturalGasQueryParams,
+)
+from openbb_energy.eia.utils.columnar import to_dataframe
+from synthetic import make_rows
+
+
+def rows_per_second(func, rows, repeat: int = 3) -> float:
+    """Return the best throughput of `func` over `repeat` runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        data = copy.deepcopy(rows)
+        start = time.perf_counter()
+        func(data)
+        best = min(best, time.perf_counter() - start)
+    return len(rows) / best
+
+
+def main(sizes):
+    """Run the benchmark."""
+    query = NaturalGasQueryParams(frequency="monthly")
+    print(f"{'rows':>10} {'models+to_df':>16} {'columnar':>16} {'speedup':>8}")
+    for n in sizes:
+        rows = make_rows(n)
+        models = rows_per_second(
+            lambda d: [
+                m.model_dump() for m in NaturalGasBaseFetcher.transform_data(query, d)
+            ],
+            rows,
+        )
+        columnar = rows_per_second(lambda d: to_dataframe(d, NATURAL_GAS_COLUMNS), rows)
+        print(
+            f"{n:>10} {models:>14,.0f}/s {columnar:>14,.0f}/s"
+            + f" {columnar / models:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main([int(n) for n in sys.argv[1:]] or [1_000, 10_000, 50_000])
@@ -0,0 +1,56 @@
+"""Benchmark the decoding of EIA response bodies.
+
+Compares the stdlib decoder (before) with `decoding.loads` (orjson when
+installed). Reported per size: seconds to decode to rows, seconds to
+decode to columns and peak traced allocations of the columnar decode.
+
+Usage: python benchmarks/bench_decode.py [rows ...]
+"""
+import json
+import sys
+import time
+import tracemalloc
+
+from openbb_energy.eia.natural_gas.natural_gas import NATURAL_GAS_COLUMNS
+from openbb_energy.eia.utils import decoding
+from openbb_energy.eia.utils.columnar import records_to_columns
+from synthetic import make_response, make_rows
+
+
+def measure(func, payload: bytes, repeat: int = 3):
+    """Return the best time and the peak allocations of `func(payload)`."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(payload)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    func(payload)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak / (1 << 20)
+
+
+def main(sizes):
+    """Run the benchmark."""
+    cases = {
+        "stdlib json": lambda payload: json.loads(payload)["response"]["data"],
+        "decoding.loads": lambda payload: decoding.loads(payload)["response"]["data"],
+    }
+    print(f"orjson: {decoding.orjson is not None}")
+    print(f"{'decoder':<24} {'rows':>9} {'to rows':>9} {'to columns':>11} {'MB':>8}")
+    for n in sizes:
+        payload = json.dumps(make_response(make_rows(n))).encode()
+        for name, decode in cases.items():
+            rows_s, _ = measure(decode, payload)
+            columns_s, peak = measure(
+                lambda p, decode=decode: records_to_columns(
+                    decode(p), NATURAL_GAS_COLUMNS
+                ),
+                payload,
+            )
+            print(f"{name:<24} {n:>9} {rows_s:>8.3f}s {columns_s:>10.3f}s {peak:>8.1f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 1_000_000])
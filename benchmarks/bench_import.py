@@ -0,0 +1,86 @@
+"""Measure the share of the extension in cold-start import time.
+
+Each run imports the provider extension in a fresh interpreter with
+`python -X importtime`. Reported (best of the runs): the total import
+time of `openbb_energy.eia_provider`, the self time of the `openbb_energy`
+modules, the time taken by openbb-core alone, and the time openbb-core
+takes to build its `RegistryMap` over the provider, which walks every
+fetcher as the platform does at startup.
+
+Usage: python benchmarks/bench_import.py [--repeat 5]
+"""
+import argparse
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+REGISTRY_MAP = (
+    "import time; from openbb_energy.eia_provider import provider;"
+    + " from openbb_core.provider.registry import Registry;"
+    + " from openbb_core.provider.registry_map import RegistryMap;"
+    + " start = time.perf_counter(); registry = Registry();"
+    + " registry.include_provider(provider); RegistryMap(registry=registry);"
+    + " print(time.perf_counter() - start)"
+)
+
+
+def importtime(statement: str) -> Tuple[List[Tuple[int, int, str]], str]:
+    """Run a statement with `-X importtime`.
+
+    Returns the (self us, cumulative us, module) rows and the stdout.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:") :].split("|")
+        rows.append((int(self_us), int(cumulative_us), module.strip()))
+    return rows, result.stdout
+
+
+def cumulative_ms(rows: List[Tuple[int, int, str]], module: str) -> float:
+    """Return the cumulative import time of a module, in milliseconds."""
+    return max(cumulative for _, cumulative, name in rows if name == module) / 1000
+
+
+def measure() -> Dict[str, float]:
+    """Measure one cold start, in milliseconds."""
+    rows, _ = importtime("import openbb_energy.eia_provider")
+    core_rows, _ = importtime("import openbb_core.provider.abstract.provider")
+    _, registry_map = importtime(REGISTRY_MAP)
+    return {
+        "total_ms": cumulative_ms(rows, "openbb_energy.eia_provider"),
+        "extension_ms": sum(
+            self_us for self_us, _, name in rows if name.startswith("openbb_energy")
+        )
+        / 1000,
+        "core_ms": cumulative_ms(core_rows, "openbb_core.provider.abstract.provider"),
+        "registry_map_ms": float(registry_map.strip().splitlines()[-1]) * 1000,
+    }
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    runs = [measure() for _ in range(args.repeat)]
+    best = {key: min(run[key] for run in runs) for key in runs[0]}
+    print(f"import openbb_energy.eia_provider: {best['total_ms']:.1f} ms")
+    print(
+        f"  openbb_energy modules: {best['extension_ms']:.1f} ms"
+        + f" ({best['extension_ms'] / best['total_ms']:.1%})"
+    )
+    print(f"  openbb-core alone: {best['core_ms']:.1f} ms")
+    print(f"build the RegistryMap: {best['registry_map_ms']:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
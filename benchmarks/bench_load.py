@@ -0,0 +1,106 @@
+"""Measure fetcher throughput and latency against the local stand-in server.
+
+Usage: python benchmarks/bench_load.py [--concurrency 32] [--requests 256]
+    [--latency 0.05] [--jitter 0.05] [--error-rate 0.0] [--rows 20000]
+    [--rate 0] [--metrics]
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+from stand_in_server import StandInConfig, serve
+
+
+async def run(fetcher, params, concurrency: int, requests: int):
+    """Run `requests` fetches with at most `concurrency` in flight."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, errors = [], 0
+
+    async def one():
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await fetcher.fetch_data(params, {"eia_api_key": "stand-in"})
+            except Exception:  # pylint: disable=broad-except
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return time.perf_counter() - start, sorted(latencies), errors
+
+
+def main():
+    """Run the load benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=256)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument(
+        "--rate", type=float, default=0.0, help="Client rate limit, 0 to disable."
+    )
+    parser.add_argument(
+        "--metrics", action="store_true", help="Print the provider metrics."
+    )
+    args = parser.parse_args()
+
+    config = StandInConfig(args.latency, args.jitter, args.error_rate, args.rows)
+    server, url = serve(config)
+    # The metadata catalog and rate limiter state of the stand-in server go to
+    # a temporary directory, away from the user's cache.
+    cache_dir = tempfile.mkdtemp(prefix="openbb-eia-bench-")
+    os.environ["OPENBB_EIA_BASE_URL"] = url
+    os.environ["OPENBB_EIA_CACHE"] = "0"
+    os.environ["OPENBB_EIA_CACHE_DIR"] = cache_dir
+    os.environ["OPENBB_EIA_RATE"] = str(args.rate)
+
+    # pylint: disable=import-outside-toplevel
+    from openbb_energy.eia.natural_gas.consumption import ConsumptionByEndUseFetcher
+    from openbb_energy.eia.utils.ratelimit import get_rate_limiter
+    from openbb_energy.eia.utils.telemetry import get_metrics
+
+    try:
+        elapsed, latencies, errors = asyncio.run(
+            run(
+                ConsumptionByEndUseFetcher,
+                {"frequency": "monthly"},
+                args.concurrency,
+                args.requests,
+            )
+        )
+    finally:
+        server.shutdown()
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    def percentile(p: float) -> float:
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+
+    print(f"requests: {args.requests} ({errors} errors), upstream: {config.requests}")
+    print(f"throughput: {args.requests / elapsed:.1f} fetches/s")
+    print(
+        f"latency: p50 {percentile(0.5) * 1000:.0f} ms,"
+        + f" p95 {percentile(0.95) * 1000:.0f} ms,"
+        + f" p99 {percentile(0.99) * 1000:.0f} ms,"
+        + f" mean {statistics.mean(latencies) * 1000:.0f} ms"
+    )
+    limiter = get_rate_limiter()
+    if limiter is not None:
+        stats = limiter.stats()
+        print(
+            f"rate limit: {stats['delayed']}/{stats['acquired']} requests delayed,"
+            + f" {stats['waited_seconds']:.1f}s waited"
+        )
+    if args.metrics:
+        print(get_metrics().render(), end="")
+
+
+if __name__ == "__main__":
+    main()
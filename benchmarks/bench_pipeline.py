@@ -0,0 +1,132 @@
+"""Benchmark the extract -> transform pipeline of every registered fetcher.
+
+Each fetcher of the provider, in `registry.FETCHERS`, runs against synthetic
+payloads. Every (fetcher, rows) case runs in a fresh process so that peak
+RSS is per case. Reported per case: rows/sec, the time of each stage
+(transform_query + make_eia_params, JSON decode, transform_data), peak RSS
+and the peak size of the memory traced by tracemalloc.
+
+Usage:
+    python benchmarks/bench_pipeline.py [--sizes 100 10000 1000000] [--fetchers ...]
+    python benchmarks/bench_pipeline.py --save      # store the results as baselines
+    python benchmarks/bench_pipeline.py --compare   # fail on regressions
+"""
+import argparse
+import json
+import multiprocessing
+import resource
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Dict, List
+
+from synthetic import make_response, make_rows
+
+BASELINES = Path(__file__).parent / "baselines.json"
+DEFAULT_SIZES = [100, 1_000, 10_000, 100_000, 1_000_000]
+
+
+def run_case(name: str, n: int) -> Dict[str, float]:
+    """Run the pipeline of one fetcher over `n` rows."""
+    # pylint: disable=import-outside-toplevel
+    from openbb_energy.eia.utils.decoding import loads
+    from openbb_energy.eia.utils.helpers import make_eia_params
+    from openbb_energy.eia.natural_gas.registry import FETCHERS
+
+    fetcher = FETCHERS[name]
+    frequency = fetcher.frequencies[0]
+    payload = json.dumps(make_response(make_rows(n, frequency=frequency))).encode()
+
+    timings = {}
+    start = time.perf_counter()
+    query = fetcher.transform_query({"frequency": frequency, "filter_by_area": "SCA"})
+    make_eia_params(query=query, facet_list=fetcher.facet_list)
+    timings["params_s"] = time.perf_counter() - start
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    data = loads(payload)["response"]["data"]
+    timings["decode_s"] = time.perf_counter() - start
+    del payload
+
+    start = time.perf_counter()
+    fetcher.transform_data(query=query, data=data)
+    timings["transform_s"] = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    total = sum(timings.values())
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        **timings,
+        "rows_per_s": n / total,
+        # ru_maxrss is in bytes on macOS and kilobytes elsewhere.
+        "peak_rss_mb": maxrss / (1 << 20 if sys.platform == "darwin" else 1 << 10),
+        "peak_traced_mb": peak / (1 << 20),
+    }
+
+
+def run_isolated(name: str, n: int) -> Dict[str, float]:
+    """Run a case in a fresh process."""
+    with multiprocessing.get_context("spawn").Pool(1) as pool:
+        return pool.apply(run_case, (name, n))
+
+
+def compare(results: Dict[str, Dict[str, float]], threshold: float) -> List[str]:
+    """Return the cases slower than their baseline by more than `threshold`."""
+    baselines = json.loads(BASELINES.read_text()) if BASELINES.exists() else {}
+    regressions = []
+    for case, result in results.items():
+        baseline = baselines.get(case)
+        floor = baseline["rows_per_s"] * (1 - threshold) if baseline else 0
+        if result["rows_per_s"] < floor:
+            regressions.append(
+                f"{case}: {result['rows_per_s']:,.0f} rows/s"
+                + f" < baseline {baseline['rows_per_s']:,.0f} rows/s"
+            )
+    return regressions
+
+
+def main():
+    """Run the benchmark suite."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--fetchers", nargs="+", default=None)
+    parser.add_argument("--save", action="store_true", help="Save as baselines.")
+    parser.add_argument("--compare", action="store_true", help="Fail on regressions.")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args()
+
+    # pylint: disable=import-outside-toplevel
+    from openbb_energy.eia.natural_gas.registry import FETCHERS
+
+    names = args.fetchers or list(FETCHERS)
+    results = {}
+    print(
+        f"{'fetcher':<36} {'rows':>9} {'rows/s':>12} {'params':>8} {'decode':>8}"
+        + f" {'transform':>9} {'rss MB':>8} {'traced MB':>9}"
+    )
+    for name in names:
+        for n in args.sizes:
+            result = run_isolated(name, n)
+            results[f"{name}[{n}]"] = result
+            print(
+                f"{name:<36} {n:>9} {result['rows_per_s']:>12,.0f}"
+                + f" {result['params_s'] * 1000:>6.1f}ms"
+                + f" {result['decode_s']:>7.3f}s {result['transform_s']:>8.3f}s"
+                + f" {result['peak_rss_mb']:>8.0f} {result['peak_traced_mb']:>9.1f}"
+            )
+
+    if args.save:
+        BASELINES.write_text(json.dumps(results, indent=2, sort_keys=True))
+        print(f"Saved baselines to {BASELINES}")
+    if args.compare:
+        regressions = compare(results, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+"""Local stand-in for the EIA API v2.
+
+Serves `/v2/natural-gas/...` routes with facet filters, `start`/`end`,
+`total`, `warnings` and paging by `offset`/`length`. Each route advertises,
+and serves, the frequencies of its fetchers in `ROUTES`. A route and
+frequency is served the response recorded with the `record` command in
+`benchmarks/fixtures`, or synthetic rows without one. The committed
+fixtures are small samples in the recorded format, for the monthly, weekly
+and daily paths; record live routes over them for realistic payloads.
+Latency, errors and payload sizes are configurable.
+
+Usage:
+    python benchmarks/stand_in_server.py serve [--port 8765] [--latency 0.2]
+        [--jitter 0.05] [--error-rate 0.01] [--rows 20000]
+    python benchmarks/stand_in_server.py record natural-gas/cons/sum
+        --api-key KEY [--frequency annual] [--param start=2020-01 ...]
+
+Point the provider at the server with OPENBB_EIA_BASE_URL=http://127.0.0.1:8765.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from synthetic import DATE_FORMATS, make_response, make_rows
+
+from openbb_energy.eia.natural_gas.routes import ROUTES
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+PAGE_SIZE = 5000
+DEFAULT_FREQUENCIES = ("monthly", "annual")
+
+
+def make_route_frequencies() -> Dict[str, Tuple[str, ...]]:
+    """Return the frequencies of each route, from the fetchers in `ROUTES`."""
+    frequencies: Dict[str, Tuple[str, ...]] = {}
+    for spec in ROUTES:
+        route = "/".join(filter(None, ["natural-gas", spec.route1, spec.route2]))
+        known = frequencies.get(route, ())
+        frequencies[route] = known + tuple(
+            frequency for frequency in spec.frequencies if frequency not in known
+        )
+    return frequencies
+
+
+ROUTE_FREQUENCIES = make_route_frequencies()
+
+
+def get_frequencies(route: str) -> Tuple[str, ...]:
+    """Return the frequencies served for a route."""
+    return ROUTE_FREQUENCIES.get(route, DEFAULT_FREQUENCIES)
+
+
+def fixture_path(route: str, frequency: str) -> Path:
+    """Return the fixture file of a route and frequency."""
+    return FIXTURES_DIR / f"{route.replace('/', '_')}_{frequency}.json"
+
+
+class StandInConfig:
+    """Behaviour of the stand-in server.
+
+    Parameters
+    ----------
+    latency : float
+        Base latency added to every response, in seconds.
+    jitter : float
+        Maximum random latency added on top of `latency`, in seconds.
+    error_rate : float
+        Share of requests answered with a 503.
+    rows : int
+        Number of synthetic rows of routes without a fixture.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        rows: int = 20_000,
+    ):
+        """Initialize the configuration."""
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rows = rows
+        self.requests = 0
+        self._datasets: Dict[Tuple[str, str], List[Dict]] = {}
+        self._lock = threading.Lock()
+
+    def dataset(self, route: str, frequency: str) -> List[Dict]:
+        """Return the rows of a route and frequency, loading its fixture once."""
+        with self._lock:
+            if (route, frequency) not in self._datasets:
+                path = fixture_path(route, frequency)
+                self._datasets[route, frequency] = (
+                    json.loads(path.read_text())["response"]["data"]
+                    if path.exists()
+                    else make_rows(self.rows, frequency=frequency)
+                )
+            return self._datasets[route, frequency]
+
+    def datasets(self, route: str) -> List[Dict]:
+        """Return the rows of every frequency of a route."""
+        return [
+            row
+            for frequency in get_frequencies(route)
+            for row in self.dataset(route, frequency)
+        ]
+
+
+def filter_rows(rows: List[Dict], query: Dict[str, List[str]]) -> List[Dict]:
+    """Apply the EIA facet, frequency and period filters of a query."""
+    facets = {
+        key[len("facets[") : -len("][]")]: set(values)
+        for key, values in query.items()
+        if key.startswith("facets[")
+    }
+    start = query.get("start", [None])[0]
+    end = query.get("end", [None])[0]
+    result = []
+    for row in rows:
+        period = str(row["period"])
+        if start and period < start or end and period[: len(end)] > end:
+            continue
+        if all(row.get(facet) in values for facet, values in facets.items()):
+            result.append(row)
+    if query.get("sort[0][column]"):
+        column = query["sort[0][column]"][0]
+        reverse = query.get("sort[0][direction]", ["asc"])[0] == "desc"
+        result.sort(key=lambda row: str(row.get(column)), reverse=reverse)
+    return result
+
+
+def make_metadata(route: str, rows: List[Dict]) -> Dict:
+    """Synthesize the route metadata response from the rows of its frequencies."""
+    periods = sorted(str(row["period"]) for row in rows) or [""]
+    return {
+        "response": {
+            "id": route.split("/")[-1],
+            "frequency": [
+                {"id": frequency, "format": DATE_FORMATS.get(frequency, "")}
+                for frequency in get_frequencies(route)
+            ],
+            "facets": [{"id": facet} for facet in ("duoarea", "process", "series")],
+            "startPeriod": periods[0],
+            "endPeriod": periods[-1],
+        }
+    }
+
+
+def make_facet(rows: List[Dict], facet: str) -> Dict:
+    """Synthesize the facet values response of a facet from its rows."""
+    name_column = {
+        "duoarea": "area-name",
+        "process": "process-name",
+        "series": "series-description",
+    }.get(facet, "")
+    values = {row[facet]: row.get(name_column, "") for row in rows if facet in row}
+    return {
+        "response": {
+            "totalFacets": len(values),
+            "facets": [{"id": key, "name": name} for key, name in values.items()],
+        }
+    }
+
+
+def make_handler(config: StandInConfig):
+    """Return a request handler class bound to `config`."""
+
+    class Handler(BaseHTTPRequestHandler):
+        """Serve EIA API v2 routes."""
+
+        def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+            """Silence the request log."""
+
+        def _send(self, status: int, body: Dict) -> None:
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):  # pylint: disable=invalid-name
+            """Serve data, metadata and facet requests."""
+            with config._lock:  # pylint: disable=protected-access
+                config.requests += 1
+            time.sleep(config.latency + random.random() * config.jitter)
+            if random.random() < config.error_rate:
+                self._send(503, {"error": "Service Unavailable", "code": 503})
+                return
+
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+            parts = url.path.strip("/").split("/")[1:]  # drop the version
+            route, facet = parts, None
+            if "facet" in parts:
+                index = parts.index("facet")
+                route, facet = parts[:index], parts[index + 1]
+            is_data = route[-1:] == ["data"]
+            route_name = "/".join(route[:-1] if is_data else route)
+
+            if facet is not None:
+                self._send(200, make_facet(config.datasets(route_name), facet))
+                return
+            if not is_data:
+                self._send(200, make_metadata(route_name, config.datasets(route_name)))
+                return
+
+            frequencies = get_frequencies(route_name)
+            frequency = query.get("frequency", [frequencies[0]])[0]
+            if frequency not in frequencies:
+                self._send(
+                    400,
+                    {"error": f"Invalid frequency '{frequency}'.", "code": 400},
+                )
+                return
+            rows = filter_rows(config.dataset(route_name, frequency), query)
+            offset = int(query.get("offset", ["0"])[0])
+            length = min(int(query.get("length", [str(PAGE_SIZE)])[0]), PAGE_SIZE)
+            body = make_response(
+                rows[offset : offset + length], total=len(rows), frequency=frequency
+            )
+            if len(rows) - offset > length:
+                body["response"]["warnings"] = [
+                    {
+                        "warning": "incomplete return",
+                        "description": "The API can only return 5000 rows in JSON"
+                        + " format.  Please consider constraining your request"
+                        + " with facet, start, or end, or using offset to paginate"
+                        + " results.",
+                    }
+                ]
+            self._send(200, body)
+
+    return Handler
+
+
+def serve(
+    config: StandInConfig, host: str = "127.0.0.1", port: int = 0
+) -> Tuple[ThreadingHTTPServer, str]:
+    """Start the server in a background thread and return it with its URL."""
+    server = ThreadingHTTPServer((host, port), make_handler(config))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def record(
+    route: str,
+    api_key: str,
+    frequency: Optional[str] = None,
+    params: Optional[Dict[str, str]] = None,
+) -> Path:
+    """Record every page of a live EIA route and frequency into a fixture.
+
+    The frequency defaults to the first one of the route.
+    """
+    # pylint: disable=import-outside-toplevel
+    from openbb_energy.eia.utils.helpers import make_eia_paginated_request
+
+    frequency = frequency or get_frequencies(route)[0]
+    api, route1, *route2 = route.split("/")
+    response = make_eia_paginated_request(
+        api=api,
+        route1=route1,
+        route2=route2[0] if route2 else None,
+        api_version=2,
+        params={
+            **(params or {}),
+            "frequency": frequency,
+            "data[0]": "value",
+            "api_key": api_key,
+        },
+    )
+    response.get("request", {}).get("params", {}).pop("api_key", None)
+    path = fixture_path(route, frequency)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(response))
+    return path
+
+
+def main():
+    """Run the stand-in server or record a fixture."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", maxsplit=1)[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve_parser = commands.add_parser("serve", help="Serve the fixtures.")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8765)
+    serve_parser.add_argument("--latency", type=float, default=0.0)
+    serve_parser.add_argument("--jitter", type=float, default=0.0)
+    serve_parser.add_argument("--error-rate", type=float, default=0.0)
+    serve_parser.add_argument("--rows", type=int, default=20_000)
+    record_parser = commands.add_parser("record", help="Record a live route.")
+    record_parser.add_argument("route", help="Route, e.g. natural-gas/cons/sum.")
+    record_parser.add_argument("--api-key", required=True)
+    record_parser.add_argument(
+        "--frequency", help="Frequency. Defaults to the first one of the route."
+    )
+    record_parser.add_argument("--param", action="append", default=[])
+    args = parser.parse_args()
+
+    if args.command == "record":
+        params = dict(param.split("=", 1) for param in args.param)
+        path = record(args.route, args.api_key, args.frequency, params)
+        print(f"Recorded {path}")
+        return
+
+    config = StandInConfig(args.latency, args.jitter, args.error_rate, args.rows)
+    server, url = serve(config, args.host, args.port)
+    print(f"Serving on {url} (OPENBB_EIA_BASE_URL={url})")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
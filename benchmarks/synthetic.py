@@ -0,0 +1,82 @@
+"""Synthetic EIA natural gas payloads for benchmarks."""
+import random
+from datetime import date, timedelta
+from typing import Dict, List
+
+AREAS = [
+    ("NUS", "U.S."),
+    ("SCA", "CALIFORNIA"),
+    ("STX", "TEXAS"),
+    ("SNY", "NEW YORK"),
+    ("SOH", "OHIO"),
+    ("SFL", "FLORIDA"),
+    ("SLA", "USA-LA"),
+    ("SPA", "USA-PA"),
+]
+PROCESSES = [
+    ("VCS", "Commercial Consumption"),
+    ("VRS", "Residential Consumption"),
+    ("VIN", "Industrial Consumption"),
+    ("VEU", "Electric Power Consumption"),
+]
+SENTINELS = ["W", "NA", "--"]
+DATE_FORMATS = {
+    "annual": "YYYY",
+    "quarterly": 'YYYY-"Q"Q',
+    "monthly": "YYYY-MM",
+    "weekly": "YYYY-MM-DD",
+    "daily": "YYYY-MM-DD",
+}
+
+
+def make_period(step: int, frequency: str) -> str:
+    """Return the EIA period of the `step`-th observation of a frequency."""
+    if frequency == "annual":
+        return str(1967 + step % 60)
+    if frequency == "quarterly":
+        return f"{1997 + (step // 4) % 30}-Q{step % 4 + 1}"
+    if frequency in ("weekly", "daily"):
+        days = 7 * (step % 1500) if frequency == "weekly" else step % 9000
+        return str(date(1997, 1, 3) + timedelta(days=days))
+    return f"{1989 + (step // 12) % 35}-{step % 12 + 1:02d}"
+
+
+def make_rows(n: int, frequency: str = "monthly", seed: int = 0) -> List[Dict]:
+    """Return `n` EIA data rows shaped like the natural-gas routes."""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        area, area_name = AREAS[i % len(AREAS)]
+        process, process_name = PROCESSES[(i // len(AREAS)) % len(PROCESSES)]
+        period = make_period(i // (len(AREAS) * len(PROCESSES)), frequency)
+        value = rng.random() * 1e5 if rng.random() > 0.02 else rng.choice(SENTINELS)
+        rows.append(
+            {
+                "period": period,
+                "duoarea": area,
+                "area-name": area_name,
+                "product": "EPG0",
+                "product-name": "Natural Gas",
+                "process": process,
+                "process-name": process_name,
+                "series": f"N3010{area[1:]}{process[1:]}",
+                "series-description": f"{area_name} {process_name} (MMcf)",
+                "value": value,
+                "units": "MMCF",
+            }
+        )
+    return rows
+
+
+def make_response(rows: List[Dict], total: int = 0, frequency: str = "monthly") -> Dict:
+    """Wrap data rows into an EIA API v2 response."""
+    return {
+        "response": {
+            "total": str(total or len(rows)),
+            "dateFormat": DATE_FORMATS.get(frequency, "YYYY-MM"),
+            "frequency": frequency,
+            "data": rows,
+        },
+        "request": {"command": "/v2/natural-gas/cons/sum/data/", "params": {}},
+        "apiVersion": "2.1.6",
+    }
@@ -0,0 +1,218 @@
+"""Natural gas supply and disposition balance.
+
+The balancing item of an area and period is its total disposition minus
+its total supply. `BalanceEngine` fetches the component series in one
+planned batch, a single request per route however many components and
+areas are asked for, aligns them on (area, period) and computes every
+balance at once over a (key, component) matrix.
+"""
+import asyncio
+from typing import Any, Dict, List, Literal, Optional, Sequence, Tuple, Type
+
+import numpy as np
+import pandas as pd
+
+from .natural_gas import NaturalGasBaseFetcher
+from .registry import FETCHERS
+
+Role = Literal["supply", "disposition", "reported"]
+
+
+class BalanceComponent:
+    """Series of the balance.
+
+    Parameters
+    ----------
+    name : str
+        Output column name.
+    role : Role
+        "supply", "disposition", or "reported" for a published balancing
+        item compared with the computed one.
+    processes : Sequence[str]
+        EIA process ids or names of the component, matched in any case.
+    model : Optional[str]
+        Provider model serving the component, defaults to the engine's.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        role: Role,
+        processes: Sequence[str],
+        model: Optional[str] = None,
+    ):
+        """Initialize the component."""
+        self.name = name
+        self.role = role
+        self.processes = tuple(processes)
+        self.model = model
+
+
+# Lines of the EIA Supply and Disposition tables.
+SUPPLY_AND_DISPOSITION: Tuple[BalanceComponent, ...] = (
+    BalanceComponent("dry_production", "supply", ["FPD", "Dry Production"]),
+    BalanceComponent(
+        "supplemental_fuels",
+        "supply",
+        ["Supplemental Gaseous Fuels", "Supplemental Gas Supplies"],
+    ),
+    BalanceComponent("imports", "supply", ["IM0", "Imports"]),
+    BalanceComponent("intransit_receipts", "supply", ["Intransit Receipts"]),
+    BalanceComponent("interstate_receipts", "supply", ["Interstate Receipts"]),
+    BalanceComponent(
+        "storage_withdrawals",
+        "supply",
+        ["SAW", "Withdrawals from Storage", "Underground Storage Withdrawals"],
+    ),
+    BalanceComponent("lng_storage_withdrawals", "supply", ["LNG Storage Withdrawals"]),
+    BalanceComponent(
+        "consumption", "disposition", ["VC0", "Total Consumption", "Consumption"]
+    ),
+    BalanceComponent("exports", "disposition", ["EEX", "Exports"]),
+    BalanceComponent("intransit_deliveries", "disposition", ["Intransit Deliveries"]),
+    BalanceComponent("interstate_deliveries", "disposition", ["Interstate Deliveries"]),
+    BalanceComponent(
+        "storage_additions",
+        "disposition",
+        ["SAI", "Additions to Storage", "Underground Storage Injections"],
+    ),
+    BalanceComponent("lng_storage_additions", "disposition", ["LNG Storage Additions"]),
+    BalanceComponent("reported_balancing_item", "reported", ["Balancing Item"]),
+)
+
+
+class BalanceEngine:
+    """Compute supply and disposition balances from their component series.
+
+    Parameters
+    ----------
+    components : Sequence[BalanceComponent]
+        Components of the balance.
+    model : str
+        Provider model serving the components without a model.
+    """
+
+    def __init__(
+        self,
+        components: Sequence[BalanceComponent] = SUPPLY_AND_DISPOSITION,
+        model: str = "SummarySupplyAndDisposition",
+    ):
+        """Initialize the engine."""
+        self.components = list(components)
+        self.model = model
+        names = [component.name for component in self.components]
+        if len(set(names)) != len(names):
+            raise ValueError("Component names must be unique.")
+
+    def plan(
+        self, params: Dict[str, Any]
+    ) -> List[Tuple[Type[NaturalGasBaseFetcher], Dict[str, Any]]]:
+        """Return one (fetcher, params) request per route of the components.
+
+        Requests read every process of the route, the components are picked
+        from the rows, so their ids do not have to be known upfront.
+        """
+        params = {
+            k: v for k, v in params.items() if k not in ("process", "filter_by_process")
+        }
+        models = dict.fromkeys(c.model or self.model for c in self.components)
+        return [(FETCHERS[model], {**params, "lean": False}) for model in models]
+
+    async def fetch(
+        self, params: Dict[str, Any], credentials: Optional[Dict[str, str]] = None
+    ) -> pd.DataFrame:
+        """Fetch the rows of the planned requests concurrently."""
+        frames = await asyncio.gather(
+            *(
+                fetcher.fetch_columnar(request, credentials)
+                for fetcher, request in self.plan(params)
+            )
+        )
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+    def compute(self, rows: pd.DataFrame) -> pd.DataFrame:
+        """Compute the balances of fetched rows.
+
+        Parameters
+        ----------
+        rows : pd.DataFrame
+            Columnar rows with `area`, `period`, `process`, `process_name`,
+            `series` and a float `value`, as returned by `fetch_columnar`.
+            A component takes one series per area and period, repeated rows
+            of a series keep the last one.
+
+        Returns
+        -------
+        pd.DataFrame
+            One row per area and period with a column per component,
+            `total_supply`, `total_disposition`, the computed
+            `balancing_item` and the number of `missing` components.
+
+        Raises
+        ------
+        ValueError
+            If several series of an area and period match a component, e.g.
+            both a volume and a count, which cannot be added up.
+        """
+        lookup: Dict[str, int] = {}
+        for index, component in enumerate(self.components):
+            for process in component.processes:
+                lookup.setdefault(process.upper(), index)
+        # Map each distinct process to its component once, by id then name.
+        # The trailing -1 maps the missing processes (code -1) to no component.
+        processes = pd.MultiIndex.from_arrays([rows["process"], rows["process_name"]])
+        process_codes, distinct = processes.factorize()
+        mapped = np.array(
+            [
+                lookup.get(str(process).upper(), lookup.get(str(name).upper(), -1))
+                for process, name in distinct
+            ]
+            + [-1],
+            dtype=np.int64,
+        )
+        columns = mapped[process_codes]
+        rows = rows[columns >= 0].assign(column=columns[columns >= 0])
+        rows = rows.drop_duplicates(["area", "period", "column", "series"], keep="last")
+        clashes = rows[rows.duplicated(["area", "period", "column"], keep=False)]
+        if not clashes.empty:
+            area, period, index = clashes.iloc[0][["area", "period", "column"]]
+            series = clashes.loc[
+                (clashes["area"] == area)
+                & (clashes["period"] == period)
+                & (clashes["column"] == index),
+                "series",
+            ]
+            raise ValueError(
+                f"Component {self.components[index].name} matches several series"
+                + f" in {area} {period}: {', '.join(map(str, series))}."
+                + " Narrow its processes or the query."
+            )
+
+        # Hash join of the components on (area, period).
+        key_codes, keys = pd.MultiIndex.from_arrays(
+            [rows["area"], rows["period"]]
+        ).factorize()
+        column = rows["column"].to_numpy()
+        values = rows["value"].to_numpy(dtype=np.float64)
+        valid = ~np.isnan(values)
+        matrix = np.full((len(keys), len(self.components)), np.nan)
+        matrix[key_codes[valid], column[valid]] = values[valid]
+        present = ~np.isnan(matrix)
+
+        roles = np.array([c.role for c in self.components])
+        supply = np.nansum(matrix[:, roles == "supply"], axis=1)
+        disposition = np.nansum(matrix[:, roles == "disposition"], axis=1)
+        result = keys.to_frame(index=False, name=["area", "period"])
+        for index, c in enumerate(self.components):
+            result[c.name] = matrix[:, index]
+        result["total_supply"] = supply
+        result["total_disposition"] = disposition
+        result["balancing_item"] = disposition - supply
+        result["missing"] = (~present[:, roles != "reported"]).sum(axis=1)
+        return result.sort_values(["area", "period"], ignore_index=True)
+
+    async def abalance(
+        self, params: Dict[str, Any], credentials: Optional[Dict[str, str]] = None
+    ) -> pd.DataFrame:
+        """Fetch the components of a query and compute their balances."""
+        return self.compute(await self.fetch(params, credentials))
@@ -1,145 +1,8 @@
-"""Consumption Data Fetchers."""
-from typing import Any, Dict, List, Optional
-
-from ..utils.helpers import make_eia_params, make_eia_request, process_warnings
-from .natural_gas import (
-    NaturalGasQueryParams,
-    NaturalGasFetcher,
-    NaturalGasAnnualFetcher,
-    NATURAL_GAS_FACET_LIST,
-)
-
-
-class ConsumptionByEndUseFetcher(NaturalGasFetcher):
-    """Consumption by End Use Fetcher."""
-
-    @staticmethod
-    def extract_data(  # pylint: disable=unused-argument
-        query: NaturalGasQueryParams,
-        credentials: Optional[Dict[str, str]],
-        **kwargs: Any,
-    ) -> List[dict]:
-        """Extract data."""
-        api_key = credentials.get("eia_api_key") if credentials else ""
-
-        params = make_eia_params(query=query, facet_list=NATURAL_GAS_FACET_LIST)
-        params["api_key"] = api_key
-
-        response = make_eia_request(
-            api="natural-gas",
-            route1="cons",
-            route2="sum",
-            api_version=2,
-            params=params,
-        )
-        process_warnings(response["response"])
-        data: List[Dict] = response["response"]["data"]
-        return data
-
-
-class ConsumptionNumberOfConsumersFetcher(NaturalGasAnnualFetcher):
-    """Number of consumers Fetcher."""
-
-    @staticmethod
-    def extract_data(  # pylint: disable=unused-argument
-        query: NaturalGasQueryParams,
-        credentials: Optional[Dict[str, str]],
-        **kwargs: Any,
-    ) -> List[dict]:
-        """Extract data."""
-        api_key = credentials.get("eia_api_key") if credentials else ""
-
-        params = make_eia_params(query=query, facet_list=NATURAL_GAS_FACET_LIST)
-        params["api_key"] = api_key
-
-        response = make_eia_request(
-            api="natural-gas",
-            route1="cons",
-            route2="sum",
-            api_version=2,
-            params=params,
-        )
-        process_warnings(response["response"])
-        data: List[Dict] = response["response"]["data"]
-        return data
-
-
-class ConsumptionShareOfGasDeliveredFetcher(NaturalGasAnnualFetcher):
-    """Share of gas delivered Fetcher."""
-
-    @staticmethod
-    def extract_data(  # pylint: disable=unused-argument
-        query: NaturalGasQueryParams,
-        credentials: Optional[Dict[str, str]],
-        **kwargs: Any,
-    ) -> List[dict]:
-        """Extract data."""
-        api_key = credentials.get("eia_api_key") if credentials else ""
-
-        params = make_eia_params(query=query, facet_list=NATURAL_GAS_FACET_LIST)
-        params["api_key"] = api_key
-
-        response = make_eia_request(
-            api="natural-gas",
-            route1="cons",
-            route2="pns",
-            api_version=2,
-            params=params,
-        )
-        process_warnings(response["response"])
-        data: List[Dict] = response["response"]["data"]
-        return data
-
-
-class ConsumptionAccountOfOthersFetcher(NaturalGasAnnualFetcher):
-    """Account of others Fetcher."""
-
-    @staticmethod
-    def extract_data(  # pylint: disable=unused-argument
-        query: NaturalGasQueryParams,
-        credentials: Optional[Dict[str, str]],
-        **kwargs: Any,
-    ) -> List[dict]:
-        """Extract data."""
-        api_key = credentials.get("eia_api_key") if credentials else ""
-
-        params = make_eia_params(query=query, facet_list=NATURAL_GAS_FACET_LIST)
-        params["api_key"] = api_key
-
-        response = make_eia_request(
-            api="natural-gas",
-            route1="cons",
-            route2="acct",
-            api_version=2,
-            params=params,
-        )
-        process_warnings(response["response"])
-        data: List[Dict] = response["response"]["data"]
-        return data
-
-
-class ConsumptionHeatContentFetcher(NaturalGasFetcher):
-    """Heat content Fetcher."""
-
-    @staticmethod
-    def extract_data(  # pylint: disable=unused-argument
-        query: NaturalGasQueryParams,
-        credentials: Optional[Dict[str, str]],
-        **kwargs: Any,
-    ) -> List[dict]:
-        """Extract data."""
-        api_key = credentials.get("eia_api_key") if credentials else ""
-
-        params = make_eia_params(query=query, facet_list=NATURAL_GAS_FACET_LIST)
-        params["api_key"] = api_key
-
-        response = make_eia_request(
-            api="natural-gas",
-            route1="cons",
-            route2="sum",
-            api_version=2,
-            params=params,
-        )
-        process_warnings(response["response"])
-        data: List[Dict] = response["response"]["data"]
-        return data
+"""Consumption Data Fetchers, generated from the route table."""
+from .registry import FETCHERS
+
+ConsumptionByEndUseFetcher = FETCHERS["ConsumptionByEndUse"]
+ConsumptionNumberOfConsumersFetcher = FETCHERS["ConsumptionNumberOfConsumers"]
+ConsumptionShareOfGasDeliveredFetcher = FETCHERS["ConsumptionShareOfGasDelivered"]
+ConsumptionAccountOfOthersFetcher = FETCHERS["ConsumptionAccountOfOthers"]
+ConsumptionHeatContentFetcher = FETCHERS["ConsumptionHeatContent"]
@@ -0,0 +1,81 @@
+"""Generation of fetcher classes from route specs."""
+from typing import Any, Dict, List, Literal, Optional, Sequence, Tuple, Type, cast
+
+from openbb_core.provider.abstract.fetcher import Fetcher
+from pydantic import Field
+
+from .natural_gas import (
+    NaturalGasAnnualFetcher,
+    NaturalGasBaseFetcher,
+    NaturalGasData,
+    NaturalGasFetcher,
+    NaturalGasQueryParams,
+    to_annual_params,
+)
+from .routes import ANNUAL, MONTHLY_ANNUAL, NATURAL_GAS_PROCESSES, RouteSpec
+
+_query_params: Dict[Tuple, Type[NaturalGasQueryParams]] = {}
+
+
+def make_query_params(
+    frequencies: Sequence[str], processes: Optional[Sequence[str]]
+) -> Type[NaturalGasQueryParams]:
+    """Return the query params class of a set of frequencies and processes.
+
+    Classes are shared by the specs with the same frequencies and processes.
+    Annual routes accept monthly queries, which are coerced to annual.
+    """
+    frequencies = MONTHLY_ANNUAL if tuple(frequencies) == ANNUAL else tuple(frequencies)
+    key = (frequencies, tuple(processes) if processes is not None else None)
+    if key == (MONTHLY_ANNUAL, tuple(NATURAL_GAS_PROCESSES)):
+        return NaturalGasQueryParams
+    if key not in _query_params:
+        namespace: Dict[str, Any] = {
+            "__module__": __name__,
+            "__doc__": "Natural Gas query.",
+            "processes": key[1],
+        }
+        if frequencies != MONTHLY_ANNUAL:
+            namespace["__annotations__"] = {"frequency": Literal[frequencies]}
+            namespace["frequency"] = Field(
+                description="Frequency of the data to be returned.",
+                default=frequencies[0],
+            )
+        name = "".join(frequency.title() for frequency in frequencies)
+        suffix = "" if processes is not None else "AnyProcess"
+        _query_params[key] = type(
+            f"NaturalGas{name}{suffix}QueryParams", (NaturalGasQueryParams,), namespace
+        )
+    return _query_params[key]
+
+
+def make_fetcher(spec: RouteSpec) -> Type[NaturalGasBaseFetcher]:
+    """Generate the fetcher class of a route spec."""
+    query_params = make_query_params(spec.frequencies, spec.processes)
+    annual = spec.frequencies == ANNUAL
+    data = spec.data or NaturalGasData
+
+    def transform_query(params: Dict[str, Any]) -> NaturalGasQueryParams:
+        """Transform query."""
+        return query_params(**(to_annual_params(params) if annual else params))
+
+    namespace: Dict[str, Any] = {
+        "__module__": __name__,
+        "__doc__": f"{spec.description[:-1]} Fetcher.",
+        "route1": spec.route1,
+        "route2": spec.route2,
+        "facet_list": spec.facet_list,
+        "local_facets": spec.local_facets,
+        "frequencies": spec.frequencies,
+        "data_model": data,
+        "transform_query": staticmethod(transform_query),
+    }
+    if query_params is not NaturalGasQueryParams or data is not NaturalGasData:
+        # openbb-core reads the query params and data types from here. They
+        # are only known at runtime, and type checkers reject subscripts with
+        # computed types, so the generics are subscripted through Any.
+        namespace["__orig_bases__"] = (
+            cast(Any, Fetcher)[query_params, cast(Any, List)[data]],
+        )
+    base = NaturalGasAnnualFetcher if annual else NaturalGasFetcher
+    return type(f"{spec.name}Fetcher", (base,), namespace)
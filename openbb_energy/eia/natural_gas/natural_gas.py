@@ -1,19 +1,48 @@
 """EIA Natural Gas Consumption Summary Fetcher for OpenBB Energy."""
+import inspect
 import warnings
-from typing import Literal, Optional, List, Any, Dict, Union
+from typing import (
+    Any,
+    AsyncIterator,
+    ClassVar,
+    Dict,
+    List,
+    Literal,
+    Optional,
+    Sequence,
+    Type,
+    cast,
+)
 
+import pandas as pd
 from openbb_core.provider.abstract.fetcher import Fetcher
 from openbb_core.provider.abstract.data import Data
 from openbb_core.provider.abstract.query_params import QueryParams
-from pydantic import Field
+from pydantic import Field, field_validator
+
+from ..utils.columnar import NAME_COLUMNS, coerce_values, to_arrow, to_dataframe
+from ..utils.rollups import ROLLUP_FREQUENCIES, RollupFrequency, rollups
+from ..utils.route_fetcher import afetch_route, aiter_route
+from ..utils.telemetry import count, is_traced, span, traced
+from .routes import NATURAL_GAS_FACET_LIST, NATURAL_GAS_PROCESSES
 
 _warn = warnings.warn
 
-NATURAL_GAS_FACET_LIST = ["duoarea", "process", "series"]
+# Pipeline stages run in a span: method -> (span name, record the rows).
+TRACED_STAGES = {
+    "transform_query": ("transform_query", False),
+    "aextract_data": ("extract_data", True),
+    "transform_data": ("transform_data", True),
+}
 
 
 class NaturalGasQueryParams(QueryParams):
-    """Natural Gas query."""
+    """Natural Gas query.
+
+    `processes` lists the valid process ids of the route, None accepts any.
+    """
+
+    processes: ClassVar[Optional[Sequence[str]]] = NATURAL_GAS_PROCESSES
 
     frequency: Literal["monthly", "annual"] = Field(
         description="Frequency of the data to be returned.",
@@ -53,9 +82,7 @@ class NaturalGasQueryParams(QueryParams):
         alias="duoarea",
     )
 
-    filter_by_process: Optional[
-        Literal["VCS", "VDV", "VRS", "VGT", "VEU", "VIN", "VGP", "VGL"]
-    ] = Field(
+    filter_by_process: Optional[str] = Field(
         description="Filter by process. You can provide a comma separated list of processes."
         + " Choose from:"
         + " VCS (Commercial Consumption),"
@@ -77,7 +104,8 @@ class NaturalGasQueryParams(QueryParams):
     )
 
     limit: Optional[int] = Field(
-        description="Limit the number of results returned (5000 max).",
+        description="Limit the number of results returned."
+        + " Results above 5000 rows are fetched in multiple pages.",
         default=None,
         alias="length",
     )
@@ -88,61 +116,349 @@ class NaturalGasQueryParams(QueryParams):
         default=None,
     )
 
+    sort_by: Optional[
+        Literal["period", "value", "duoarea", "process", "series"]
+    ] = Field(
+        description="Column to sort the results by, on the EIA server.",
+        default=None,
+        alias="sort[0][column]",
+    )
+
+    sort_order: Literal["asc", "desc"] = Field(
+        description="Sort order of the results. Used in conjunction with sort_by.",
+        default="asc",
+        alias="sort[0][direction]",
+    )
+
+    lean: bool = Field(
+        description="Leave the area, product, process and series names out of"
+        + " the returned rows.",
+        default=False,
+        exclude=True,
+    )
+
+    @field_validator("filter_by_process")
+    @classmethod
+    def validate_process(cls, v: Optional[str]) -> Optional[str]:
+        """Validate each process of a comma separated list."""
+        if v is None:
+            return v
+        processes = [process.strip() for process in v.split(",")]
+        if cls.processes is None:
+            return ",".join(processes)
+        invalid = [p for p in processes if p not in cls.processes]
+        if invalid:
+            raise ValueError(
+                f"Invalid process {', '.join(invalid)}."
+                + f" Choose from {', '.join(cls.processes)}."
+            )
+        return ",".join(processes)
+
 
 class NaturalGasData(Data):
     """EIA natural gas survey data."""
 
     period: str = Field(description="Period")
     area: str = Field(description="Area ID", alias="duoarea")
-    area_name: str = Field(description="Area Name", alias="area-name")
+    area_name: Optional[str] = Field(
+        description="Area Name", alias="area-name", default=None
+    )
     product: str = Field(description="Product ID")
-    product_name: str = Field(description="Product Name", alias="product-name")
+    product_name: Optional[str] = Field(
+        description="Product Name", alias="product-name", default=None
+    )
     process: str = Field(description="Process ID")
-    process_name: str = Field(description="Process Name", alias="process-name")
+    process_name: Optional[str] = Field(
+        description="Process Name", alias="process-name", default=None
+    )
     series: str = Field(description="Series ID")
-    series_description: str = Field(
-        description="Series Description", alias="series-description"
+    series_description: Optional[str] = Field(
+        description="Series Description", alias="series-description", default=None
+    )
+    value: Optional[float] = Field(description="Value")
+    value_flag: Optional[str] = Field(
+        description="Code published in place of the value, e.g. W for withheld.",
+        default=None,
     )
-    value: Optional[Union[float, str]] = Field(description="Value")
     units: str = Field(description="Units of measurement")
 
 
+# EIA keys mapped to the NaturalGasData field names, used by the columnar output,
+# which derives `value_flag` from `value`.
+NATURAL_GAS_COLUMNS = {
+    field.alias or name: name
+    for name, field in dict(NaturalGasData.model_fields).items()
+    if name != "value_flag"
+}
+NATURAL_GAS_LEAN_COLUMNS = {
+    key: name
+    for key, name in NATURAL_GAS_COLUMNS.items()
+    if key not in NAME_COLUMNS.values()
+}
+
+
+def make_data(
+    data: List[Dict], model: Type[NaturalGasData] = NaturalGasData
+) -> List[NaturalGasData]:
+    """Build data models from EIA rows, with the values coerced to floats.
+
+    The values are coerced in one vectorized pass, see `coerce_values`, and
+    the sentinel codes are moved to `value_flag`. The rows are not modified,
+    since a single-flight response is shared.
+    """
+    values, flags = coerce_values([d.get("value") for d in data])
+    return [
+        model(
+            **{
+                **d,
+                "period": str(d["period"]),
+                "value": None if pd.isna(value) else value,
+                "value_flag": None if pd.isna(flag) else str(flag),
+            }
+        )
+        for d, value, flag in zip(data, values.tolist(), flags)
+    ]
+
+
 class NaturalGasBaseFetcher(
     Fetcher[
         NaturalGasQueryParams,
         List[NaturalGasData],
     ]
 ):
-    """Natural Gas Fetcher."""
+    """Natural Gas Fetcher.
+
+    Subclasses declare the EIA route they read with `route1`, `route2` and
+    `facet_list`, the frequencies it supports with `frequencies` and the
+    model of its rows with `data_model`. Facets in `local_facets` are
+    filtered locally when concurrent fetchers of the same route share one
+    upstream request, see `afetch_route`.
+    """
+
+    api: str = "natural-gas"
+    route1: str = ""
+    route2: Optional[str] = None
+    facet_list: List[str] = NATURAL_GAS_FACET_LIST
+    local_facets: Sequence[str] = ()
+    frequencies: Sequence[str] = ()
+    data_model: Type[NaturalGasData] = NaturalGasData
+
+    def __init_subclass__(cls, **kwargs: Any):
+        """Time the pipeline stages of a subclass, each in a span.
+
+        Stages are wrapped where the subclass defines or first inherits them,
+        so each one is timed once. openbb-core then points `extract_data` to
+        the timed `aextract_data`.
+        """
+        for method, (name, rows) in TRACED_STAGES.items():
+            stage = inspect.getattr_static(cls, method)
+            if isinstance(stage, (staticmethod, classmethod)) and not is_traced(
+                stage.__func__
+            ):
+                setattr(cls, method, type(stage)(traced(name, rows)(stage.__func__)))
+        super().__init_subclass__(**kwargs)
 
     @staticmethod
     def transform_query(params: Dict[str, Any]) -> NaturalGasQueryParams:
         """Transform query."""
         raise NotImplementedError("Subclasses must implement this method")
 
-    @staticmethod
-    def extract_data(  # pylint: disable=unused-argument
+    @classmethod
+    def route_kwargs(
+        cls, credentials: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """Return the route arguments of the fetch layer."""
+        if not cls.route1:
+            raise NotImplementedError("Subclasses must declare route1")
+        return {
+            "api": cls.api,
+            "route1": cls.route1,
+            "route2": cls.route2,
+            "facet_list": cls.facet_list,
+            "local_facets": cls.local_facets,
+            "api_key": credentials.get("eia_api_key") if credentials else "",
+        }
+
+    @classmethod
+    async def aextract_data(  # pylint: disable=unused-argument
+        cls,
         query: NaturalGasQueryParams,
         credentials: Optional[Dict[str, str]],
         **kwargs: Any,
     ) -> List[dict]:
         """Extract data."""
-        raise NotImplementedError("Subclasses must implement this method")
+        return await afetch_route(query=query, **cls.route_kwargs(credentials))
 
-    @staticmethod
+    @classmethod
     def transform_data(  # pylint: disable=unused-argument
-        query: NaturalGasQueryParams, data: List[dict], **kwargs: Any
+        cls, query: NaturalGasQueryParams, data: List[dict], **kwargs: Any
     ) -> List[NaturalGasData]:
         """Transform data."""
-        for d in data:
-            d["period"] = str(d["period"])
-        return [NaturalGasData(**d) for d in data]
+        return make_data(data, cls.data_model)
+
+    @classmethod
+    async def fetch_data(
+        cls,
+        params: Dict[str, Any],
+        credentials: Optional[Dict[str, str]] = None,
+        **kwargs: Any,
+    ) -> List[NaturalGasData]:
+        """Run the openbb-core pipeline in a `fetch` span and count its rows.
+
+        The stages of the pipeline run in child spans, see `TRACED_STAGES`.
+        """
+        with span("fetch", model=cls.__name__):
+            # `transform_data` returns the rows, never an `AnnotatedResult`.
+            result = cast(
+                List[NaturalGasData],
+                await super().fetch_data(params, credentials, **kwargs),
+            )
+        count(
+            "eia_rows_total",
+            "Rows returned by the EIA fetchers.",
+            len(result),
+            model=cls.__name__,
+        )
+        return result
+
+    @classmethod
+    async def fetch_columnar(
+        cls,
+        params: Dict[str, Any],
+        credentials: Optional[Dict[str, str]] = None,
+        output: Literal["pandas", "arrow"] = "pandas",
+        **kwargs: Any,
+    ) -> Any:
+        """Fetch data as columns, skipping the per-row data model construction.
+
+        Parameters
+        ----------
+        params : Dict[str, Any]
+            Query parameters.
+        credentials : Optional[Dict[str, str]]
+            Provider credentials.
+        output : Literal["pandas", "arrow"]
+            Return a `pandas.DataFrame` or a `pyarrow.Table`.
+
+        Returns
+        -------
+        Any
+            Columnar data with `period` as datetime64 and `value` as float64.
+            The name columns are left out of lean queries.
+        """
+        query = cls.transform_query(params=params)
+        data = await cls.aextract_data(query=query, credentials=credentials, **kwargs)
+        columns = NATURAL_GAS_LEAN_COLUMNS if query.lean else NATURAL_GAS_COLUMNS
+        if output == "arrow":
+            return to_arrow(data, columns)
+        return to_dataframe(data, columns)
+
+    @classmethod
+    async def fetch_rollups(
+        cls,
+        params: Dict[str, Any],
+        credentials: Optional[Dict[str, str]] = None,
+        frequencies: Sequence[RollupFrequency] = ROLLUP_FREQUENCIES,
+        aggregations: Optional[Dict[str, str]] = None,
+        partial: bool = False,
+    ) -> Dict[str, Any]:
+        """Fetch monthly data once and roll it up locally.
+
+        Parameters
+        ----------
+        params : Dict[str, Any]
+            Query parameters. The frequency is forced to monthly.
+        credentials : Optional[Dict[str, str]]
+            Provider credentials.
+        frequencies : Sequence[RollupFrequency]
+            Rollups to compute, from "quarterly", "annual" and "ytd".
+        aggregations : Optional[Dict[str, str]]
+            Aggregations by series id, see `rollups.rollup`. Lean queries
+            have no series descriptions, so their stock series need one.
+        partial : bool
+            Keep the periods with missing months.
+
+        Returns
+        -------
+        Dict[str, Any]
+            DataFrames by frequency, with the monthly rows under "monthly".
+        """
+        if "monthly" not in cls.frequencies:
+            raise ValueError(f"{cls.__name__} does not serve monthly data.")
+        monthly = await cls.fetch_columnar(
+            {**params, "frequency": "monthly"}, credentials
+        )
+        return {
+            "monthly": monthly,
+            **rollups(monthly, frequencies, aggregations, partial),
+        }
+
+    @classmethod
+    async def astream(
+        cls,
+        params: Dict[str, Any],
+        credentials: Optional[Dict[str, str]] = None,
+        batch_size: int = 5000,
+        output: Literal["records", "models", "pandas"] = "records",
+    ) -> AsyncIterator[Any]:
+        """Stream data in fixed-size batches while the next page downloads.
+
+        Parameters
+        ----------
+        params : Dict[str, Any]
+            Query parameters.
+        credentials : Optional[Dict[str, str]]
+            Provider credentials.
+        batch_size : int
+            Number of rows per batch.
+        output : Literal["records", "models", "pandas"]
+            Yield lists of dicts, lists of `NaturalGasData` or DataFrames.
+
+        Yields
+        ------
+        Any
+            Batches of at most `batch_size` rows.
+        """
+        query = cls.transform_query(params=params)
+        async for batch in aiter_route(
+            query=query, batch_size=batch_size, **cls.route_kwargs(credentials)
+        ):
+            if output == "models":
+                yield cls.transform_data(query=query, data=batch)
+            elif output == "pandas":
+                yield to_dataframe(
+                    batch,
+                    NATURAL_GAS_LEAN_COLUMNS if query.lean else NATURAL_GAS_COLUMNS,
+                )
+            else:
+                yield batch
+
+
+def to_annual_params(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Coerce the monthly frequency and dates of a query to annual."""
+    if params.get("frequency") == "monthly":
+        _warn(
+            "This data point does not support monthly frequency. "
+            + "Changing frequency to annual."
+        )
+        params["frequency"] = "annual"
+    for key in ["start_date", "end_date"]:
+        if params.get(key) and "-" in params[key]:
+            year = params[key].split("-")[0]
+            _warn(
+                "This data point does not support monthly frequency. "
+                + f"Changing {key} from {params[key]} to {year}."
+            )
+            params[key] = year
+    return params
 
 
 # pylint: disable=abstract-method
 class NaturalGasFetcher(NaturalGasBaseFetcher):
     """Natural Gas Fetcher."""
 
+    frequencies = ("monthly", "annual")
+
     @staticmethod
     def transform_query(params: Dict[str, Any]) -> NaturalGasQueryParams:
         """Transform query."""
@@ -153,22 +469,9 @@ class NaturalGasFetcher(NaturalGasBaseFetcher):
 class NaturalGasAnnualFetcher(NaturalGasBaseFetcher):
     """Natural Gas Fetcher."""
 
+    frequencies = ("annual",)
+
     @staticmethod
     def transform_query(params: Dict[str, Any]) -> NaturalGasQueryParams:
         """Transform query."""
-        if params.get("frequency") == "monthly":
-            _warn(
-                "This data point does not support monthly frequency. "
-                + "Changing frequency to annual."
-            )
-            params["frequency"] = "annual"
-        for key in ["start_date", "end_date"]:
-            if params.get(key) and "-" in params[key]:
-                year = params[key].split("-")[0]
-                _warn(
-                    "This data point does not support monthly frequency. "
-                    + f"Changing {key} from {params[key]} to {year}."
-                )
-                params[key] = year
-
-        return NaturalGasQueryParams(**params)
+        return NaturalGasQueryParams(**to_annual_params(params))
@@ -0,0 +1,15 @@
+"""Registry of the fetchers generated from the route table.
+
+openbb-core's `RegistryMap` walks every fetcher of the provider at startup,
+so the fetchers are generated eagerly: generating all of them takes a few
+milliseconds, well below the import of the fetch layer itself.
+"""
+from typing import Dict, Type
+
+from .factory import make_fetcher
+from .natural_gas import NaturalGasBaseFetcher
+from .routes import ROUTE_SPECS
+
+FETCHERS: Dict[str, Type[NaturalGasBaseFetcher]] = {
+    name: make_fetcher(spec) for name, spec in ROUTE_SPECS.items()
+}
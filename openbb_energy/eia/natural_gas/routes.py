@@ -0,0 +1,396 @@
+"""Route table of the EIA natural gas fetchers.
+
+Every provider model is declared once in `ROUTES` with the EIA route it
+reads and the frequencies it supports. The fetchers are generated from
+the table by `registry`. This module is plain data, so that the provider
+can list its models without importing the fetch layer.
+"""
+from typing import Any, Dict, List, Optional, Sequence
+
+NATURAL_GAS_FACET_LIST = ["duoarea", "process", "series"]
+NATURAL_GAS_PROCESSES = ["VCS", "VDV", "VRS", "VGT", "VEU", "VIN", "VGP", "VGL"]
+
+MONTHLY_ANNUAL = ("monthly", "annual")
+ANNUAL = ("annual",)
+
+# The cons/sum fetchers only differ in the processes and series they read,
+# so they share one upstream request per area and period and filter locally.
+SHARED_ROUTE_LOCAL_FACETS = ("process", "series")
+
+
+class RouteSpec:
+    """Declaration of a provider model served by an EIA route.
+
+    Parameters
+    ----------
+    name : str
+        Provider model name, e.g. ConsumptionByEndUse.
+    route1 : str
+        First route under natural-gas, e.g. cons.
+    route2 : Optional[str]
+        Second route, e.g. sum.
+    description : str
+        One line description of the data.
+    frequencies : Sequence[str]
+        Frequencies served by the route. The first one is the default unless
+        the route serves annual data.
+    facet_list : Optional[Sequence[str]]
+        Facets of the route. Defaults to `NATURAL_GAS_FACET_LIST`.
+    local_facets : Sequence[str]
+        Facets that may be filtered locally, see `NaturalGasBaseFetcher`.
+    processes : Optional[Sequence[str]]
+        Valid process ids, None to accept any.
+    data : Optional[Any]
+        Data model of the rows, a `NaturalGasData` subclass. Defaults to
+        `NaturalGasData`.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        name: str,
+        route1: str,
+        route2: Optional[str],
+        description: str,
+        frequencies: Sequence[str] = MONTHLY_ANNUAL,
+        facet_list: Optional[Sequence[str]] = None,
+        local_facets: Sequence[str] = (),
+        processes: Optional[Sequence[str]] = None,
+        data: Optional[Any] = None,
+    ):
+        """Initialize the spec."""
+        self.name = name
+        self.route1 = route1
+        self.route2 = route2
+        self.description = description
+        self.frequencies = tuple(frequencies)
+        self.facet_list = list(
+            NATURAL_GAS_FACET_LIST if facet_list is None else facet_list
+        )
+        self.local_facets = tuple(local_facets)
+        self.processes = processes
+        self.data = data
+
+
+ROUTES: List[RouteSpec] = [
+    # Consumption
+    RouteSpec(
+        "ConsumptionByEndUse",
+        "cons",
+        "sum",
+        "Natural gas consumption by end use.",
+        local_facets=SHARED_ROUTE_LOCAL_FACETS,
+        processes=NATURAL_GAS_PROCESSES,
+    ),
+    RouteSpec(
+        "ConsumptionNumberOfConsumers",
+        "cons",
+        "sum",
+        "Number of natural gas consumers.",
+        frequencies=ANNUAL,
+        local_facets=SHARED_ROUTE_LOCAL_FACETS,
+        processes=NATURAL_GAS_PROCESSES,
+    ),
+    RouteSpec(
+        "ConsumptionShareOfGasDelivered",
+        "cons",
+        "pns",
+        "Share of natural gas delivered to consumers.",
+        frequencies=ANNUAL,
+        processes=NATURAL_GAS_PROCESSES,
+    ),
+    RouteSpec(
+        "ConsumptionAccountOfOthers",
+        "cons",
+        "acct",
+        "Natural gas delivered for the account of others.",
+        frequencies=ANNUAL,
+        processes=NATURAL_GAS_PROCESSES,
+    ),
+    RouteSpec(
+        "ConsumptionHeatContent",
+        "cons",
+        "sum",
+        "Heat content of natural gas consumed.",
+        local_facets=SHARED_ROUTE_LOCAL_FACETS,
+        processes=NATURAL_GAS_PROCESSES,
+    ),
+    # Exploration and reserves
+    RouteSpec("EnRSummary", "enr", "sum", "Reserves summary.", ANNUAL),
+    RouteSpec(
+        "EnRCrudeOilPlusLeaseCondensate",
+        "enr",
+        "cplc",
+        "Crude oil plus lease condensate proved reserves.",
+        ANNUAL,
+    ),
+    RouteSpec(
+        "EnRDryNaturalGasProvedReserves",
+        "enr",
+        "dry",
+        "Dry natural gas proved reserves.",
+        ANNUAL,
+    ),
+    RouteSpec(
+        "EnRNaturalGasProvedReservesWetAfterLeaseSeparation",
+        "enr",
+        "wals",
+        "Natural gas proved reserves, wet after lease separation.",
+        ANNUAL,
+    ),
+    RouteSpec(
+        "EnRNonassociatedNaturalGasProvedReservesWetAfterLeaseSeparation",
+        "enr",
+        "nang",
+        "Nonassociated natural gas proved reserves, wet after lease separation.",
+        ANNUAL,
+    ),
+    RouteSpec(
+        "EnRAssociatedDissolvedNaturalGasProvedReservesWetAfterLeaseSeparation",
+        "enr",
+        "adng",
+        "Associated-dissolved natural gas proved reserves, wet after lease"
+        + " separation.",
+        ANNUAL,
+    ),
+    RouteSpec(
+        "EnRNaturalGasLiquidsProvedReserves",
+        "enr",
+        "ngl",
+        "Natural gas liquids proved reserves.",
+        ANNUAL,
+    ),
+    RouteSpec(
+        "EnREstimatedNaturalGasPlantLiquidsContainedInTotalNaturalGasProvedReserves",
+        "enr",
+        "ngpl",
+        "Estimated natural gas plant liquids in total natural gas proved reserves.",
+        ANNUAL,
+    ),
+    RouteSpec(
+        "EnRLeaseCondensate", "enr", "lc", "Lease condensate proved reserves.", ANNUAL
+    ),
+    RouteSpec(
+        "EnRCoalbedMethane",
+        "enr",
+        "coalbed",
+        "Coalbed methane proved reserves.",
+        ANNUAL,
+    ),
+    RouteSpec("EnRShaleGas", "enr", "shalegas", "Shale gas proved reserves.", ANNUAL),
+    RouteSpec(
+        "EnRFederalOffshoreGulfOfMexicoProvedReserves",
+        "enr",
+        "fgom",
+        "Federal offshore Gulf of Mexico proved reserves.",
+        ANNUAL,
+    ),
+    RouteSpec(
+        "EnRProvedNonproducingReserves",
+        "enr",
+        "nprod",
+        "Proved nonproducing reserves.",
+        ANNUAL,
+    ),
+    RouteSpec(
+        "EnRCrudeOilAndNaturalGasDrillingActivity",
+        "enr",
+        "drill",
+        "Crude oil and natural gas drilling activity.",
+    ),
+    RouteSpec(
+        "EnRCrudeOilAndNaturalGasExploratoryAndDevelopmentWells",
+        "enr",
+        "wellend",
+        "Crude oil and natural gas exploratory and development wells.",
+    ),
+    RouteSpec(
+        "EnRMaximumUSActiveSeismicCrewCounts",
+        "enr",
+        "seis",
+        "Maximum U.S. active seismic crew counts.",
+    ),
+    RouteSpec(
+        "EnRFootageDrilledForCrudeOilAndNaturalGasWells",
+        "enr",
+        "wellfoot",
+        "Footage drilled for crude oil and natural gas wells.",
+    ),
+    RouteSpec(
+        "EnRAverageDepthOfCrudeOilAndNaturalGasWells",
+        "enr",
+        "welldep",
+        "Average depth of crude oil and natural gas wells.",
+        ANNUAL,
+    ),
+    RouteSpec(
+        "EnRCostsOfCrudeOilAndNaturalGasWellsDrilled",
+        "enr",
+        "wellcost",
+        "Costs of crude oil and natural gas wells drilled.",
+        ANNUAL,
+    ),
+    # Imports and exports
+    RouteSpec("InEImportsByCountry", "move", "impc", "Imports by country."),
+    RouteSpec("InEExportsByCountry", "move", "expc", "Exports by country."),
+    RouteSpec(
+        "InEImportsExportsByState",
+        "move",
+        "state",
+        "Imports and exports by state.",
+        ANNUAL,
+    ),
+    RouteSpec("InEImportsByPointOfEntry", "move", "poe1", "Imports by point of entry."),
+    RouteSpec("InEExportsByPointOfExit", "move", "poe2", "Exports by point of exit."),
+    RouteSpec(
+        "InEInternationalInterstateMovementsByState",
+        "move",
+        "ist",
+        "International and interstate movements by state.",
+        ANNUAL,
+    ),
+    # Prices
+    RouteSpec("PriceSummary", "pri", "sum", "Natural gas prices."),
+    RouteSpec(
+        "PriceFutures",
+        "pri",
+        "fut",
+        "Natural gas spot and futures prices.",
+        ("daily", "weekly", "monthly", "annual"),
+    ),
+    RouteSpec(
+        "PriceResidentialCommercial",
+        "pri",
+        "rescom",
+        "Prices of natural gas delivered to residential and commercial consumers.",
+    ),
+    # Production
+    RouteSpec(
+        "ProductionProducingOilWells",
+        "prod",
+        "oilwells",
+        "Number of producing oil wells.",
+        ANNUAL,
+    ),
+    RouteSpec(
+        "ProductionAndGrossWithdrawalsGross",
+        "prod",
+        "sum",
+        "Natural gas gross withdrawals and production.",
+    ),
+    RouteSpec(
+        "ProductionWellheadValueAndMarketed",
+        "prod",
+        "whv",
+        "Natural gas wellhead value and marketed production.",
+        ANNUAL,
+    ),
+    RouteSpec(
+        "ProductionOffshoreGrossWithdrawals",
+        "prod",
+        "off",
+        "Offshore natural gas gross withdrawals.",
+    ),
+    RouteSpec(
+        "ProductionGulfOfMexicoFederalOffshore",
+        "prod",
+        "deep",
+        "Gulf of Mexico federal offshore natural gas production.",
+    ),
+    RouteSpec(
+        "ProductionNaturalGasPlantLiquids",
+        "prod",
+        "ngpl",
+        "Natural gas plant liquids production.",
+    ),
+    RouteSpec(
+        "ProductionLeaseCondensate",
+        "prod",
+        "lc",
+        "Lease condensate production.",
+        ANNUAL,
+    ),
+    RouteSpec(
+        "ProductionCoalbedMethane",
+        "prod",
+        "coalbed",
+        "Coalbed methane production.",
+        ANNUAL,
+    ),
+    RouteSpec(
+        "ProductionShaleGas",
+        "prod",
+        "shalegas",
+        "Shale gas production.",
+        ANNUAL,
+    ),
+    RouteSpec(
+        "ProductionSupplementalGasSupplies",
+        "prod",
+        "ss",
+        "Supplemental supplies of natural gas.",
+    ),
+    RouteSpec(
+        "ProductionProducingGasWells",
+        "prod",
+        "wells",
+        "Number of producing gas wells.",
+        ANNUAL,
+    ),
+    RouteSpec(
+        "ProductionNaturalGasPlantProcessing",
+        "prod",
+        "pp",
+        "Natural gas plant processing.",
+        ANNUAL,
+    ),
+    # Storage
+    RouteSpec(
+        "StorageWeeklyWorkingGasUnderground",
+        "stor",
+        "wkly",
+        "Weekly working gas in underground storage.",
+        ("weekly",),
+    ),
+    RouteSpec(
+        "StorageUndergroundNaturalGasStorageByAllOperators",
+        "stor",
+        "sum",
+        "Underground natural gas storage by all operators.",
+    ),
+    RouteSpec(
+        "StorageUndergroundNaturalGasStorageByStorageType",
+        "stor",
+        "type",
+        "Underground natural gas storage by storage type.",
+    ),
+    RouteSpec(
+        "StorageLiquefiedNaturalGasAdditionsToAndWithdrawalsFromStorage",
+        "stor",
+        "lng",
+        "Liquefied natural gas additions to and withdrawals from storage.",
+        ANNUAL,
+    ),
+    RouteSpec(
+        "StorageUndergroundNaturalGasStorageCapacity",
+        "stor",
+        "cap",
+        "Underground natural gas storage capacity.",
+    ),
+    # Summary
+    RouteSpec(
+        "SummarySupplyAndDisposition",
+        "sum",
+        "snd",
+        "Natural gas supply and disposition.",
+    ),
+    RouteSpec("Summary", "sum", "lsum", "Natural gas summary."),
+    RouteSpec(
+        "SummarySupplyAndDispositionBalance",
+        "sum",
+        "sndm",
+        "Monthly natural gas supply and disposition balance.",
+        ("monthly",),
+    ),
+]
+
+ROUTE_SPECS: Dict[str, RouteSpec] = {spec.name: spec for spec in ROUTES}
@@ -0,0 +1,266 @@
+"""Storage Data Fetchers and weekly storage statistics.
+
+`WeeklyStorageStats` keeps, for every series of the Weekly Natural Gas
+Storage Report, its values by week of the year for the last six years.
+Comparing a report with last year and with the 5-year average of the same
+week then takes a constant number of lookups, and the weekly refresh only
+requests the reports since the last one stored.
+"""
+import os
+import threading
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from ..utils.cache import DEFAULT_CACHE_DIR
+from ..utils.decoding import dumps, loads
+from .registry import FETCHERS
+
+StorageWeeklyWorkingGasUndergroundFetcher = FETCHERS[
+    "StorageWeeklyWorkingGasUnderground"
+]
+StorageUndergroundNaturalGasStorageByAllOperatorsFetcher = FETCHERS[
+    "StorageUndergroundNaturalGasStorageByAllOperators"
+]
+StorageUndergroundNaturalGasStorageByStorageTypeFetcher = FETCHERS[
+    "StorageUndergroundNaturalGasStorageByStorageType"
+]
+StorageLiquefiedNaturalGasAdditionsToAndWithdrawalsFromStorageFetcher = FETCHERS[
+    "StorageLiquefiedNaturalGasAdditionsToAndWithdrawalsFromStorage"
+]
+StorageUndergroundNaturalGasStorageCapacityFetcher = FETCHERS[
+    "StorageUndergroundNaturalGasStorageCapacity"
+]
+
+AVERAGE_YEARS = 5
+# Years of each week kept: the average years and the current one.
+KEPT_YEARS = AVERAGE_YEARS + 1
+
+# (period, value) of a report.
+Report = Tuple[str, float]
+
+
+def week_of_year(period: str) -> Tuple[int, int]:
+    """Return the ISO year and week of a report date."""
+    year, week, _ = date.fromisoformat(period).isocalendar()
+    return year, week
+
+
+class SeriesState:
+    """Values of a series by week of the year, and its last two reports."""
+
+    def __init__(
+        self,
+        area: Optional[str] = None,
+        description: Optional[str] = None,
+        units: Optional[str] = None,
+    ):
+        """Initialize the state."""
+        self.area = area
+        self.description = description
+        self.units = units
+        self.weeks: Dict[int, Dict[int, float]] = {}
+        self.last: Optional[Report] = None
+        self.previous: Optional[Report] = None
+
+    def add(self, period: str, value: float) -> None:
+        """Add or revise a report."""
+        year, week = week_of_year(period)
+        years = self.weeks.setdefault(week, {})
+        years[year] = value
+        if len(years) > KEPT_YEARS:
+            del years[min(years)]
+        if self.last is None or period > self.last[0]:
+            self.previous, self.last = self.last, (period, value)
+        elif period == self.last[0]:
+            self.last = (period, value)
+        elif self.previous is None or period >= self.previous[0]:
+            self.previous = (period, value)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the state as JSON-compatible data."""
+        return {
+            "area": self.area,
+            "description": self.description,
+            "units": self.units,
+            "last": self.last,
+            "previous": self.previous,
+            "weeks": {
+                str(week): {str(year): value for year, value in years.items()}
+                for week, years in self.weeks.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SeriesState":
+        """Return a state saved with `to_dict`."""
+        state = cls(data.get("area"), data.get("description"), data.get("units"))
+        state.last = tuple(data["last"]) if data.get("last") else None  # type: ignore
+        state.previous = (
+            tuple(data["previous"]) if data.get("previous") else None  # type: ignore
+        )
+        state.weeks = {
+            int(week): {int(year): value for year, value in years.items()}
+            for week, years in data.get("weeks", {}).items()
+        }
+        return state
+
+
+class WeeklyStorageStats:
+    """Rolling weekly storage statistics, updated in constant time per report.
+
+    Parameters
+    ----------
+    path : Optional[Union[str, Path]]
+        JSON file the statistics are saved to, None to keep them in memory.
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]] = None):
+        """Initialize the statistics, loading the saved ones."""
+        self.path = Path(path) if path is not None else None
+        self.series: Dict[str, SeriesState] = {}
+        self._lock = threading.Lock()
+        if self.path is not None and self.path.exists():
+            self.series = {
+                series: SeriesState.from_dict(state)
+                for series, state in loads(self.path.read_bytes()).items()
+            }
+
+    def save(self) -> None:
+        """Save the statistics to `path`."""
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            payload = dumps(
+                {series: state.to_dict() for series, state in self.series.items()}
+            )
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_bytes(payload)
+        tmp.replace(self.path)
+
+    def update(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Add weekly rows and return the statistics of each of them.
+
+        Rows are `NaturalGasData` dumps or EIA rows. Rows without a numeric
+        value are skipped.
+        """
+        rows = sorted(rows, key=lambda row: str(row["period"]))
+        stats = []
+        with self._lock:
+            for row in rows:
+                try:
+                    value = float(row["value"])
+                except (TypeError, ValueError):
+                    continue
+                series, period = str(row["series"]), str(row["period"])
+                state = self.series.get(series)
+                if state is None:
+                    state = self.series[series] = SeriesState(
+                        row.get("area", row.get("duoarea")),
+                        row.get("series_description", row.get("series-description")),
+                        row.get("units"),
+                    )
+                state.add(period, value)
+                stats.append(self._stats(series, state, period, value))
+        return stats
+
+    def report(self) -> List[Dict[str, Any]]:
+        """Return the statistics of the last report of every series."""
+        with self._lock:
+            return [
+                self._stats(series, state, *state.last)
+                for series, state in sorted(self.series.items())
+                if state.last is not None
+            ]
+
+    def last_period(self) -> Optional[str]:
+        """Return the last report date of all series."""
+        periods = [s.last[0] for s in self.series.values() if s.last is not None]
+        return max(periods) if periods else None
+
+    @staticmethod
+    def _stats(
+        series: str, state: SeriesState, period: str, value: float
+    ) -> Dict[str, Any]:
+        """Return the comparisons of a report with last year and 5-year average."""
+        year, week = week_of_year(period)
+        years = state.weeks.get(week, {})
+        if week == 53:
+            # Most years have no week 53, those are compared by their week 52.
+            years = {**state.weeks.get(52, {}), **years}
+        history = [years[y] for y in range(year - AVERAGE_YEARS, year) if y in years]
+        last_year = years.get(year - 1)
+        average = sum(history) / len(history) if len(history) == AVERAGE_YEARS else None
+        previous = state.previous if state.last and state.last[0] == period else None
+        week_ago = (date.fromisoformat(period) - timedelta(days=7)).isoformat()
+        net_change = (
+            value - previous[1]
+            if previous is not None and previous[0] == week_ago
+            else None
+        )
+        return {
+            "period": period,
+            "area": state.area,
+            "series": series,
+            "series_description": state.description,
+            "units": state.units,
+            "value": value,
+            "net_change": net_change,
+            "last_year": last_year,
+            "vs_last_year": value - last_year if last_year is not None else None,
+            "five_year_average": average,
+            "five_year_min": min(history) if average is not None else None,
+            "five_year_max": max(history) if average is not None else None,
+            "vs_five_year": value - average if average is not None else None,
+            "vs_five_year_pct": (
+                (value - average) / average * 100 if average else None
+            ),
+        }
+
+    async def refresh(
+        self,
+        credentials: Optional[Dict[str, str]] = None,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Fetch the reports since the last one stored and update the statistics.
+
+        The last stored week is requested again to pick up its revisions. An
+        empty store is backfilled with the years of the 5-year average.
+
+        Returns
+        -------
+        List[Dict[str, Any]]
+            Statistics of the fetched reports.
+        """
+        last = self.last_period()
+        start = (
+            date.fromisoformat(last) - timedelta(days=7)
+            if last
+            else date.today().replace(month=1, day=1)
+            - timedelta(days=366 * AVERAGE_YEARS)
+        )
+        data = await StorageWeeklyWorkingGasUndergroundFetcher.fetch_data(
+            {**(params or {}), "frequency": "weekly", "start": start.isoformat()},
+            credentials,
+        )
+        stats = self.update([d.model_dump() for d in data])
+        self.save()
+        return stats
+
+
+_storage_stats: Optional[WeeklyStorageStats] = None
+
+
+def get_storage_stats() -> WeeklyStorageStats:
+    """Return the shared statistics, saved to `OPENBB_EIA_STORAGE_STATS`.
+
+    Defaults to `storage_stats.json` in the cache directory.
+    """
+    global _storage_stats  # pylint: disable=global-statement
+    if _storage_stats is None:
+        cache_dir = Path(os.environ.get("OPENBB_EIA_CACHE_DIR", DEFAULT_CACHE_DIR))
+        _storage_stats = WeeklyStorageStats(
+            os.environ.get("OPENBB_EIA_STORAGE_STATS", cache_dir / "storage_stats.json")
+        )
+    return _storage_stats
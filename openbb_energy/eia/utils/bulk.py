@@ -0,0 +1,441 @@
+"""Ingestion of the EIA bulk download archives.
+
+EIA publishes every natural gas series in one zip archive of JSON lines,
+one series per line with all its observations. The archive member is
+decompressed as a stream and decoded line by line, so a full-history
+backfill holds one series and one batch of rows in memory at a time,
+instead of paging the API for hours.
+
+Rows are shaped like the API v2 rows. The archives carry neither the API
+v2 route of a series nor its product and process facets, so each series is
+looked up in a `SeriesIndex` built from API v2 rows of the provider routes
+(see `aload_series_index`) and written to the warehouse partitions of its
+route, where `read_warehouse` and `sync` find it. Series of no indexed
+route are skipped.
+
+Usage: python -m openbb_energy.eia.utils.bulk --root PATH [--archive FILE]
+[--api-key KEY]
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import tempfile
+import warnings
+import zipfile
+from datetime import date
+from pathlib import Path
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+import pandas as pd
+import requests
+
+from .decoding import loads
+from .helpers import aiter_eia_pages, make_cache_route
+from .warehouse import ParquetWarehouse
+
+_warn = warnings.warn
+
+BULK_URL = "https://api.eia.gov/bulk/NG.zip"
+UNKNOWN_AREA = "UNK"
+
+# Routes and API v2 facets of the series, by series id, e.g. N3010CA2.
+SeriesIndex = Dict[str, List[Dict[str, str]]]
+
+# API v2 columns of a series taken from the index rather than the archive.
+INDEX_COLUMNS = (
+    "duoarea",
+    "area-name",
+    "product",
+    "product-name",
+    "process",
+    "process-name",
+    "series-description",
+    "units",
+)
+
+# Years of recent rows requested to find the series of a route.
+INDEX_YEARS = 2
+
+# First period of a year in the API v2 formats, by frequency.
+YEAR_STARTS = {
+    "annual": "{}",
+    "quarterly": "{}-Q1",
+    "monthly": "{}-01",
+    "weekly": "{}-01-01",
+    "daily": "{}-01-01",
+}
+
+FREQUENCIES = {
+    "A": "annual",
+    "Q": "quarterly",
+    "M": "monthly",
+    "W": "weekly",
+    "D": "daily",
+}
+
+
+def download(url: str, path: Union[str, Path], chunk_size: int = 1 << 20) -> Path:
+    """Stream a bulk archive to a file, without holding it in memory."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with requests.get(url, stream=True, timeout=60) as r:
+        r.raise_for_status()
+        with open(path.with_suffix(".tmp"), "wb") as f:
+            for chunk in r.iter_content(chunk_size=chunk_size):
+                f.write(chunk)
+    path.with_suffix(".tmp").replace(path)
+    return path
+
+
+def to_period(period: str) -> str:
+    """Return the API v2 period of a bulk period, e.g. 202312 -> 2023-12.
+
+    Quarters (2023Q4) become 2023-Q4.
+    """
+    if len(period) == 6:
+        return f"{period[:4]}-{period[4:]}"
+    if len(period) == 8:
+        return f"{period[:4]}-{period[4:6]}-{period[6:]}"
+    return period
+
+
+def to_area(geography: Optional[str]) -> str:
+    """Return the API v2 area id of a bulk geography, e.g. USA-CA -> SCA."""
+    if not geography:
+        return UNKNOWN_AREA
+    if geography == "USA":
+        return "NUS"
+    if geography.startswith("USA-") and len(geography) == 6:
+        return f"S{geography[4:]}"
+    return geography
+
+
+def to_series_id(series_id: str) -> str:
+    """Return the API v2 id of a bulk series id, e.g. NG.N3010CA2.M -> N3010CA2."""
+    parts = series_id.split(".")
+    return parts[1] if len(parts) > 2 else series_id
+
+
+def index_rows(index: SeriesIndex, route: str, rows: Iterable[Dict[str, Any]]) -> None:
+    """Add the series of API v2 rows of a route to an index."""
+    for row in rows:
+        entries = index.setdefault(str(row["series"]), [])
+        if all(entry["route"] != route for entry in entries):
+            entries.append(
+                {"route": route, **{c: str(row.get(c) or "") for c in INDEX_COLUMNS}}
+            )
+
+
+async def aload_series_index(
+    fetchers: Iterable[Any], api_key: Optional[str] = ""
+) -> SeriesIndex:
+    """Return the index of the series of the routes served by the fetchers.
+
+    The rows of the last `INDEX_YEARS` years of each route are requested at
+    its lowest frequency, so series discontinued before are not indexed.
+
+    Parameters
+    ----------
+    fetchers : Iterable[Any]
+        Fetcher classes with the `api`, `route1`, `route2` and `frequencies`
+        attributes, e.g. the values of the provider `fetcher_dict`.
+    api_key : Optional[str]
+        EIA API key.
+
+    Returns
+    -------
+    SeriesIndex
+        Routes and facets of each series id, the routes in name order.
+    """
+    routes: Dict[Tuple[str, str, Optional[str]], Sequence[str]] = {}
+    for fetcher in fetchers:
+        frequencies = tuple(getattr(fetcher, "frequencies", ()))
+        if frequencies:
+            routes.setdefault(
+                (fetcher.api, fetcher.route1, fetcher.route2), frequencies
+            )
+    index: SeriesIndex = {}
+    year = date.today().year - INDEX_YEARS
+
+    async def load(
+        api: str, route1: str, route2: Optional[str], frequencies: Sequence[str]
+    ) -> None:
+        frequency = "annual" if "annual" in frequencies else frequencies[-1]
+        async for page in aiter_eia_pages(
+            api=api,
+            route1=route1,
+            route2=route2,
+            api_version=2,
+            params={
+                "frequency": frequency,
+                "data[0]": "value",
+                "start": YEAR_STARTS[frequency].format(year),
+                "api_key": api_key,
+            },
+        ):
+            index_rows(
+                index, make_cache_route(api, route1, route2), page["response"]["data"]
+            )
+
+    await asyncio.gather(
+        *(load(*route, frequencies) for route, frequencies in routes.items())
+    )
+    for entries in index.values():
+        entries.sort(key=lambda entry: entry["route"])
+    return index
+
+
+def series_columns(
+    series: Dict[str, Any], facets: Optional[Dict[str, str]] = None
+) -> Dict[str, List[Any]]:
+    """Return the rows of a bulk series line as API v2 columns.
+
+    `facets` is an entry of a `SeriesIndex`, without it the product and
+    process facets are left empty.
+    """
+    data = series.get("data", [])
+    common = {
+        "duoarea": to_area(series.get("geography")),
+        "area-name": series.get("geography", ""),
+        "product": "",
+        "product-name": "",
+        "process": "",
+        "process-name": "",
+        "series": to_series_id(series["series_id"]),
+        "series-description": series.get("name", ""),
+        "units": series.get("units", ""),
+    }
+    if facets is not None:
+        common.update({c: facets[c] for c in INDEX_COLUMNS if facets.get(c)})
+    return {
+        "period": [to_period(str(period)) for period, _ in data],
+        **{key: [value] * len(data) for key, value in common.items()},
+        "value": [value for _, value in data],
+    }
+
+
+def series_rows(series: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Return the API v2 rows of a bulk series line."""
+    columns = series_columns(series)
+    return [dict(zip(columns, row)) for row in zip(*columns.values())]
+
+
+def iter_series(
+    archive: Union[str, Path], frequencies: Optional[Sequence[str]] = None
+) -> Iterator[Dict[str, Any]]:
+    """Yield the series lines of a bulk archive, decompressing as a stream.
+
+    Parameters
+    ----------
+    archive : Union[str, Path]
+        Path of the zip archive.
+    frequencies : Optional[Sequence[str]]
+        Frequencies to keep, e.g. ["monthly"]. Defaults to all.
+    """
+    with zipfile.ZipFile(archive) as z:
+        for member in z.infolist():
+            if member.is_dir():
+                continue
+            with z.open(member) as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    series = loads(line)
+                    # Category lines describe the series tree and have no data.
+                    if "series_id" not in series or "data" not in series:
+                        continue
+                    frequency = FREQUENCIES.get(series.get("f", ""))
+                    if frequency is None or (
+                        frequencies and frequency not in frequencies
+                    ):
+                        continue
+                    series["frequency"] = frequency
+                    yield series
+
+
+def iter_batches(
+    archive: Union[str, Path],
+    batch_size: int = 100_000,
+    frequencies: Optional[Sequence[str]] = None,
+    output: Literal["records", "models", "pandas", "columns"] = "records",
+    index: Optional[SeriesIndex] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Yield the rows of a bulk archive in batches of a single route and frequency.
+
+    Parameters
+    ----------
+    archive : Union[str, Path]
+        Path of the zip archive.
+    batch_size : int
+        Number of rows from which a batch is yielded.
+    frequencies : Optional[Sequence[str]]
+        Frequencies to keep. Defaults to all.
+    output : Literal["records", "models", "pandas", "columns"]
+        Rows as EIA dicts, `NaturalGasData` models, a typed DataFrame (see
+        `columnar.type_columns`) or a DataFrame of the raw EIA columns.
+    index : Optional[SeriesIndex]
+        Routes and facets of the series. Series missing from it are skipped
+        with a warning, and a series of several routes is yielded in each.
+        Without an index, the rows have no route, product nor process.
+
+    Yields
+    ------
+    Dict[str, Any]
+        {"route": Optional[str], "frequency": str, "rows": Any} batches.
+    """
+    # pylint: disable=import-outside-toplevel
+    from openbb_energy.eia.natural_gas.natural_gas import (
+        NATURAL_GAS_COLUMNS,
+        make_data,
+    )
+
+    from .columnar import type_columns
+
+    def convert(columns: Dict[str, List[Any]]) -> Any:
+        if output == "columns":
+            return pd.DataFrame(columns)
+        if output == "pandas":
+            return pd.DataFrame(type_columns(columns, NATURAL_GAS_COLUMNS), copy=False)
+        rows = [dict(zip(columns, row)) for row in zip(*columns.values())]
+        if output == "models":
+            return make_data(rows)
+        return rows
+
+    batches: Dict[Tuple[Optional[str], str], Dict[str, List[Any]]] = {}
+    skipped = 0
+    for series in iter_series(archive, frequencies):
+        frequency = series["frequency"]
+        # Without an index, a single entry without route nor facets.
+        entries: List[Dict[str, str]] = [{}]
+        if index is not None:
+            entries = index.get(to_series_id(series["series_id"]), [])
+            skipped += not entries
+        for entry in entries:
+            key = (entry.get("route"), frequency)
+            columns = series_columns(series, entry)
+            if key not in batches:
+                batches[key] = {name: [] for name in columns}
+            batch = batches[key]
+            for name, values in columns.items():
+                batch[name].extend(values)
+            if len(batch["period"]) >= batch_size:
+                yield {"route": key[0], "frequency": frequency, "rows": convert(batch)}
+                del batches[key]
+    for (route, frequency), batch in batches.items():
+        yield {"route": route, "frequency": frequency, "rows": convert(batch)}
+    if skipped:
+        _warn(f"{skipped} bulk series match no indexed route and were skipped.")
+
+
+def ingest(
+    archive: Union[str, Path],
+    warehouse: ParquetWarehouse,
+    index: SeriesIndex,
+    frequencies: Optional[Sequence[str]] = None,
+    batch_size: int = 100_000,
+) -> Dict[str, int]:
+    """Replace the routes of the archive series in the warehouse.
+
+    The rows are written to a staging directory under the warehouse root,
+    and each route and frequency is swapped in once the whole archive is
+    loaded, so a failed ingestion leaves the stored rows in place.
+
+    Parameters
+    ----------
+    archive : Union[str, Path]
+        Path of the zip archive.
+    warehouse : ParquetWarehouse
+        Warehouse to load.
+    index : SeriesIndex
+        Routes and facets of the series, see `aload_series_index`.
+    frequencies : Optional[Sequence[str]]
+        Frequencies to load. Defaults to all.
+    batch_size : int
+        Number of rows written at once.
+
+    Returns
+    -------
+    Dict[str, int]
+        Number of rows written, by route and frequency.
+    """
+    staging = Path(tempfile.mkdtemp(prefix=".staging-", dir=warehouse.root))
+    try:
+        staged = ParquetWarehouse(staging)
+        written: Dict[Tuple[str, str], int] = {}
+        for batch in iter_batches(
+            archive, batch_size, frequencies, output="columns", index=index
+        ):
+            key = (batch["route"], batch["frequency"])
+            written[key] = written.get(key, 0) + staged.write(
+                *key, batch["rows"], incremental=False
+            )
+        for route, frequency in written:
+            warehouse.replace(route, frequency, staged)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    return {
+        f"{route} ({frequency})": rows for (route, frequency), rows in written.items()
+    }
+
+
+def main() -> None:
+    """Load a bulk archive into the warehouse from the command line."""
+    parser = argparse.ArgumentParser(description="Load an EIA bulk archive.")
+    parser.add_argument(
+        "--root",
+        default=os.environ.get("OPENBB_EIA_WAREHOUSE"),
+        help="Warehouse directory. Defaults to OPENBB_EIA_WAREHOUSE.",
+    )
+    parser.add_argument(
+        "--archive", help="Local archive. Downloaded from --url when omitted."
+    )
+    parser.add_argument("--url", default=BULK_URL, help="Archive URL.")
+    parser.add_argument(
+        "--api-key",
+        default=os.environ.get("EIA_API_KEY", ""),
+        help="EIA API key, to index the series of the routes."
+        + " Defaults to EIA_API_KEY.",
+    )
+    parser.add_argument(
+        "--frequency",
+        action="append",
+        choices=list(FREQUENCIES.values()),
+        help="Frequency to load, repeatable. Defaults to all.",
+    )
+    args = parser.parse_args()
+    if not args.root:
+        parser.error("--root or OPENBB_EIA_WAREHOUSE is required")
+
+    # pylint: disable=import-outside-toplevel
+    from openbb_energy.eia.natural_gas.registry import FETCHERS
+
+    warehouse = ParquetWarehouse(args.root)
+    index = asyncio.run(aload_series_index(FETCHERS.values(), api_key=args.api_key))
+    tmp = None
+    try:
+        archive = args.archive
+        if archive is None:
+            tmp = tempfile.mkdtemp()
+            archive = download(args.url, Path(tmp) / "bulk.zip")
+        written = ingest(archive, warehouse, index, args.frequency)
+        for route, rows in written.items():
+            print(f"{route}: {rows} rows")
+    finally:
+        if tmp is not None:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+"""Persistent EIA response cache."""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import warnings
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from .decoding import dumps, loads
+from .threads import to_thread
+from .transport import get_base_url
+
+_warn = warnings.warn
+
+HOUR = 60 * 60
+DAY = 24 * HOUR
+
+DEFAULT_CACHE_DIR = Path.home() / ".openbb_platform" / "cache" / "eia"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_TTL = DAY
+
+# Route TTLs take precedence over frequency TTLs.
+# The longest matching route prefix wins, e.g. "natural-gas/enr/cplc" uses
+# the "natural-gas/enr" TTL.
+ROUTE_TTLS: Dict[str, int] = {
+    "natural-gas/stor/wkly": 6 * HOUR,
+    "natural-gas/enr": 90 * DAY,
+}
+
+FREQUENCY_TTLS: Dict[str, int] = {
+    "weekly": 6 * HOUR,
+    "monthly": DAY,
+    "quarterly": 7 * DAY,
+    "annual": 30 * DAY,
+}
+
+EXCLUDED_KEY_PARAMS = ("api_key",)
+
+
+def make_cache_key(route: str, params: Dict[str, Any]) -> str:
+    """Make a cache key from the API base URL, route and sorted query parameters.
+
+    The API key is left out so that the same query is shared across keys. The
+    base URL is part of the key, so that the responses of a stand-in server
+    never answer the queries to EIA.
+    """
+    items = sorted(
+        (key, value) for key, value in params.items() if key not in EXCLUDED_KEY_PARAMS
+    )
+    payload = json.dumps(
+        [get_base_url(), route, items], default=str, separators=(",", ":")
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def get_ttl(route: str, params: Dict[str, Any]) -> int:
+    """Return the time to live, in seconds, of a cached response."""
+    parts = route.split("/")
+    for i in range(len(parts), 0, -1):
+        prefix = "/".join(parts[:i])
+        if prefix in ROUTE_TTLS:
+            return ROUTE_TTLS[prefix]
+    return FREQUENCY_TTLS.get(params.get("frequency", ""), DEFAULT_TTL)
+
+
+class ResponseCache:
+    """SQLite backed cache of EIA JSON responses with TTL and LRU eviction.
+
+    Parameters
+    ----------
+    path : Union[str, Path]
+        Path of the SQLite database.
+    max_bytes : int
+        Maximum total size of the cached bodies. The least recently used
+        entries are evicted once it is exceeded.
+
+    The blocking SQLite calls have async counterparts, `aget` and `aset`,
+    which run them in a worker thread. The query parameters of each entry
+    are stored with it, without the API key, so that `queries` can list
+    the requests to refetch after a release.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path] = DEFAULT_CACHE_DIR / "responses.sqlite",
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        """Initialize the cache."""
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(
+            str(self.path), check_same_thread=False, isolation_level=None
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " route TEXT NOT NULL,"
+            " body BLOB NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " expires REAL NOT NULL,"
+            " accessed REAL NOT NULL,"
+            " params TEXT)"
+        )
+        columns = {
+            row[1] for row in self._connection.execute("PRAGMA table_info(responses)")
+        }
+        if "params" not in columns:
+            self._connection.execute("ALTER TABLE responses ADD COLUMN params TEXT")
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)"
+        )
+        # Running total of the cached bodies, resynchronized on eviction since
+        # other processes may share the database.
+        self._size = self._total_size()
+
+    def _total_size(self) -> int:
+        """Return the total size of the cached bodies."""
+        return self._connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()[0]
+
+    def get(self, route: str, params: Dict[str, Any]) -> Optional[Dict]:
+        """Return the cached response of a query, if fresh."""
+        key = make_cache_key(route, params)
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT body, expires FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[1] < now:
+                self.misses += 1
+                return None
+            self._connection.execute(
+                "UPDATE responses SET accessed = ? WHERE key = ?", (now, key)
+            )
+            self.hits += 1
+        return loads(row[0])
+
+    def set(
+        self,
+        route: str,
+        params: Dict[str, Any],
+        response: Dict,
+        ttl: Optional[int] = None,
+    ) -> None:
+        """Store the response of a query."""
+        key = make_cache_key(route, params)
+        body = dumps(response)
+        query = json.dumps(
+            {k: v for k, v in params.items() if k not in EXCLUDED_KEY_PARAMS},
+            default=str,
+        )
+        now = time.time()
+        ttl = get_ttl(route, params) if ttl is None else ttl
+        with self._lock:
+            replaced = self._connection.execute(
+                "SELECT size FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses"
+                + " (key, route, body, size, expires, accessed, params)"
+                + " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, route, body, len(body), now + ttl, now, query),
+            )
+            self._size += len(body) - (replaced[0] if replaced else 0)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    async def aget(self, route: str, params: Dict[str, Any]) -> Optional[Dict]:
+        """Return the cached response of a query, if fresh, without blocking."""
+        return await to_thread(self.get, route, params)
+
+    async def aset(
+        self,
+        route: str,
+        params: Dict[str, Any],
+        response: Dict,
+        ttl: Optional[int] = None,
+    ) -> None:
+        """Store the response of a query without blocking."""
+        await to_thread(self.set, route, params, response, ttl)
+
+    def _evict(self) -> None:
+        """Drop expired entries, then least recently used ones above the size limit."""
+        self._connection.execute(
+            "DELETE FROM responses WHERE expires < ?", (time.time(),)
+        )
+        self._size = self._total_size()
+        if self._size <= self.max_bytes:
+            return
+        evicted = []
+        for key, size in self._connection.execute(
+            "SELECT key, size FROM responses ORDER BY accessed"
+        ):
+            if self._size <= self.max_bytes:
+                break
+            evicted.append((key,))
+            self._size -= size
+        self._connection.executemany("DELETE FROM responses WHERE key = ?", evicted)
+
+    def queries(self, route: str) -> List[Dict[str, Any]]:
+        """Return the query parameters of the cached responses of a route."""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT params FROM responses WHERE route = ? AND params IS NOT NULL",
+                (route,),
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def routes(self) -> List[str]:
+        """Return the routes with cached responses that can be refetched."""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT DISTINCT route FROM responses WHERE params IS NOT NULL"
+            ).fetchall()
+        return sorted(row[0] for row in rows)
+
+    def invalidate(self, route: Optional[str] = None) -> None:
+        """Drop the cached responses of a route, or of every route."""
+        with self._lock:
+            if route is None:
+                self._connection.execute("DELETE FROM responses")
+            else:
+                self._connection.execute(
+                    "DELETE FROM responses WHERE route = ?", (route,)
+                )
+            self._size = self._total_size()
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Return the hit and miss counters and the cache size."""
+        with self._lock:
+            entries, size = self._connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": entries,
+            "bytes": size,
+        }
+
+
+_cache: Optional[ResponseCache] = None
+_cache_unavailable: bool = False
+
+
+def get_cache() -> Optional[ResponseCache]:
+    """Return the shared response cache, or None if it is disabled.
+
+    The cache is configured with the `OPENBB_EIA_CACHE` (set to 0 to disable),
+    `OPENBB_EIA_CACHE_DIR` and `OPENBB_EIA_CACHE_SIZE_MB` environment variables.
+    It is disabled, with a warning, when its directory cannot be written to,
+    e.g. on a read-only file system.
+    """
+    global _cache, _cache_unavailable  # pylint: disable=global-statement
+    if os.environ.get("OPENBB_EIA_CACHE", "1").lower() in ("0", "false", "no"):
+        return None
+    if _cache is None and not _cache_unavailable:
+        cache_dir = Path(os.environ.get("OPENBB_EIA_CACHE_DIR", DEFAULT_CACHE_DIR))
+        size_mb = os.environ.get("OPENBB_EIA_CACHE_SIZE_MB")
+        try:
+            _cache = ResponseCache(
+                path=cache_dir / "responses.sqlite",
+                max_bytes=int(size_mb) * 1024 * 1024 if size_mb else DEFAULT_MAX_BYTES,
+            )
+        except (OSError, sqlite3.Error) as e:
+            _cache_unavailable = True
+            _warn(f"EIA response cache disabled, {cache_dir} is not writable: {e}")
+    return _cache
+
+
+def configure_cache(**kwargs: Any) -> ResponseCache:
+    """Replace the shared response cache with one built from `kwargs`.
+
+    See `ResponseCache` for the accepted keyword arguments.
+    """
+    global _cache  # pylint: disable=global-statement
+    _cache = ResponseCache(**kwargs)
+    return _cache
@@ -0,0 +1,282 @@
+"""Async EIA API client."""
+import asyncio
+import time
+import weakref
+from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import aiohttp
+
+from .decoding import loads
+from .ratelimit import get_rate_limiter
+from .telemetry import count, observe, record_response, span
+from .transport import (
+    CircuitBreaker,
+    CircuitOpenError,
+    LatencyTracker,
+    RetryPolicy,
+    make_error,
+)
+
+
+def make_trace_config() -> aiohttp.TraceConfig:
+    """Return a trace config timing the DNS, connection and pool wait phases."""
+    config = aiohttp.TraceConfig()
+
+    def on_start(phase: str):
+        async def callback(session, context, params):  # pylint: disable=W0613
+            setattr(context, f"{phase}_start", time.perf_counter())
+
+        return callback
+
+    def on_end(phase: str):
+        async def callback(session, context, params):  # pylint: disable=W0613
+            observe(
+                "eia_http_connection_seconds",
+                "Duration of the DNS, connect (with TLS) and pool wait phases.",
+                time.perf_counter() - getattr(context, f"{phase}_start"),
+                phase=phase,
+            )
+
+        return callback
+
+    config.on_dns_resolvehost_start.append(on_start("dns"))
+    config.on_dns_resolvehost_end.append(on_end("dns"))
+    config.on_connection_create_start.append(on_start("connect"))
+    config.on_connection_create_end.append(on_end("connect"))
+    config.on_connection_queued_start.append(on_start("queued"))
+    config.on_connection_queued_end.append(on_end("queued"))
+    return config
+
+
+async def close_at_shutdown(
+    session: aiohttp.ClientSession,
+) -> AsyncGenerator[None, None]:
+    """Close a session when its event loop shuts down its async generators.
+
+    `asyncio.run`, and the portals openbb-core runs sync commands in, shut
+    down the async generators of their loop before closing it.
+    """
+    try:
+        yield
+    finally:
+        await session.close()
+
+
+class EIAClient:
+    """Async EIA API client backed by a shared keep-alive connection pool.
+
+    An `aiohttp.ClientSession` is created lazily for each running event
+    loop, so the same client can be reused by every fetcher, and closed when
+    the loop shuts down, e.g. at the end of each `asyncio.run` of a sync
+    caller.
+
+    Requests are retried with jittered exponential backoff on retryable
+    statuses and connection errors. Once enough latencies are recorded, a
+    second, hedged request is sent when the first one is slower than the
+    `hedge_percentile` latency, and the first successful response wins. A
+    per-host circuit breaker fails requests fast while the host keeps failing.
+    Every attempt first takes a token from the shared rate limiter.
+
+    Parameters
+    ----------
+    limit : int
+        Maximum number of open connections in the pool.
+    limit_per_host : int
+        Maximum number of open connections to a single host.
+    keepalive_timeout : float
+        Seconds an idle connection is kept open for reuse.
+    total_timeout : float
+        Total timeout of a request in seconds.
+    connect_timeout : float
+        Timeout for acquiring a connection in seconds.
+    retry : Optional[RetryPolicy]
+        Retry policy. Defaults to `RetryPolicy()`.
+    breaker : Optional[CircuitBreaker]
+        Circuit breaker. Defaults to `CircuitBreaker()`.
+    hedge_percentile : Optional[float]
+        Latency percentile (0 to 1) after which a hedged request is sent.
+        None disables hedging.
+    """
+
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 16,
+        keepalive_timeout: float = 30.0,
+        total_timeout: float = 60.0,
+        connect_timeout: float = 10.0,
+        retry: Optional[RetryPolicy] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        hedge_percentile: Optional[float] = 0.95,
+    ):
+        """Initialize the client."""
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = aiohttp.ClientTimeout(
+            total=total_timeout, sock_connect=connect_timeout
+        )
+        self.retry = retry or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.hedge_percentile = hedge_percentile
+        self.latencies = LatencyTracker()
+        self._sessions: "weakref.WeakKeyDictionary[Any, Any]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Return the pooled session of the running event loop."""
+        loop = asyncio.get_running_loop()
+        session, closer = self._sessions.get(loop, (None, None))
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=self.timeout,
+                headers={"Accept": "application/json"},
+                trace_configs=[make_trace_config()],
+            )
+            # Starting the generator registers it with the loop.
+            closer = close_at_shutdown(session)
+            self._sessions[loop] = (session, closer)
+            await closer.asend(None)
+        return session
+
+    async def _attempt(
+        self, url: str, params: List[Tuple[str, Any]]
+    ) -> Tuple[int, Any]:
+        """Make one GET request and return its status and decoded JSON body."""
+        session = await self._get_session()
+        host = urlparse(url).netloc
+        limiter = get_rate_limiter()
+        if limiter is not None:
+            with span("rate_limit"):
+                await limiter.aacquire()
+        with span("http", host=host) as http:
+            start = time.perf_counter()
+            async with session.get(url, params=params) as response:
+                ttfb = time.perf_counter() - start
+                payload = await response.read()
+            http.set("ttfb", ttfb)
+            http.set("status", response.status)
+            http.set("bytes", len(payload))
+        record_response(host, response.status, len(payload), ttfb)
+        if response.status < 400:
+            self.latencies.record(time.perf_counter() - start)
+        with span("decode", bytes=len(payload)):
+            try:
+                body = loads(payload)
+            except ValueError:
+                body = None
+        return response.status, body
+
+    async def _hedged_attempt(
+        self, url: str, params: List[Tuple[str, Any]]
+    ) -> Tuple[int, Any]:
+        """Make a request, hedged by a second one if it is slow."""
+        delay = (
+            self.latencies.percentile(self.hedge_percentile)
+            if self.hedge_percentile is not None
+            else None
+        )
+        primary = asyncio.ensure_future(self._attempt(url, params))
+        # Requests still running, cancelled on the way out, including when
+        # the caller is cancelled while waiting on the first one.
+        pending = {primary}
+        # Result returned if neither request succeeds, a response if any.
+        fallback: Optional["asyncio.Future[Tuple[int, Any]]"] = None
+        try:
+            if delay is None:
+                return await primary
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if done:
+                return primary.result()
+
+            count(
+                "eia_http_hedged_requests_total",
+                "Hedged EIA HTTP requests.",
+                host=urlparse(url).netloc,
+            )
+            pending.add(asyncio.ensure_future(self._attempt(url, params)))
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for future in done:
+                    if future.exception() is None and future.result()[0] < 400:
+                        return future.result()
+                    if fallback is None or fallback.exception() is not None:
+                        fallback = future
+        finally:
+            for future in pending:
+                future.cancel()
+        return fallback.result()  # type: ignore[union-attr]
+
+    async def get_json(self, url: str, params: List[Tuple[str, Any]]) -> Dict:
+        """Make a GET request and return the decoded JSON body.
+
+        Raises
+        ------
+        CircuitOpenError
+            If the circuit of the host is open.
+        EIAError
+            If the API returns an error status, after retries when retryable.
+        """
+        host = urlparse(url).netloc
+        for attempt in range(self.retry.attempts):
+            if not self.breaker.allow(host):
+                raise CircuitOpenError(
+                    f"Requests to {host} are suspended after repeated failures."
+                )
+            last = attempt == self.retry.attempts - 1
+            try:
+                status, body = await self._hedged_attempt(url, params)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                record_response(host, type(e).__name__, 0)
+                self.breaker.record_failure(host)
+                if last:
+                    raise
+            else:
+                if status < 400:
+                    self.breaker.record_success(host)
+                    return body
+                if not self.retry.is_retryable(status):
+                    raise make_error(status, body)
+                self.breaker.record_failure(host)
+                if last:
+                    raise make_error(status, body)
+            count("eia_http_retries_total", "Retried EIA HTTP requests.", host=host)
+            await asyncio.sleep(self.retry.delay(attempt))
+        raise RuntimeError("Unreachable")  # pragma: no cover
+
+    async def close(self) -> None:
+        """Close the connection pool of the running event loop."""
+        _, closer = self._sessions.pop(asyncio.get_running_loop(), (None, None))
+        if closer is not None:
+            await closer.aclose()
+
+
+_client: Optional[EIAClient] = None
+
+
+def get_client() -> EIAClient:
+    """Return the shared EIA client."""
+    global _client  # pylint: disable=global-statement
+    if _client is None:
+        _client = EIAClient()
+    return _client
+
+
+def configure_client(**kwargs: Any) -> EIAClient:
+    """Replace the shared EIA client with one built from `kwargs`.
+
+    See `EIAClient` for the accepted keyword arguments.
+    """
+    global _client  # pylint: disable=global-statement
+    _client = EIAClient(**kwargs)
+    return _client
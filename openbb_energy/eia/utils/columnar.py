@@ -0,0 +1,117 @@
+"""Columnar decoding of EIA data rows."""
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+PERIOD_FORMATS = {4: "%Y", 7: "%Y-%m", 10: "%Y-%m-%d"}
+
+# Codes EIA publishes in place of a value, e.g. W for withheld.
+SENTINELS = ["W", "NA", "--", "NM", "(s)"]
+
+# Facet id columns mapped to the descriptive columns EIA repeats on every row.
+NAME_COLUMNS: Dict[str, str] = {
+    "duoarea": "area-name",
+    "product": "product-name",
+    "process": "process-name",
+    "series": "series-description",
+}
+
+
+def parse_periods(periods: np.ndarray) -> pd.DatetimeIndex:
+    """Parse EIA periods (YYYY, YYYY-MM, YYYY-MM-DD or YYYY-Qn) into datetimes."""
+    strings = pd.Index(periods).astype(str)
+    if len(strings) == 0:
+        return pd.DatetimeIndex([])
+    first = strings[0]
+    if "Q" in first:
+        return pd.PeriodIndex(strings.str.replace("-", ""), freq="Q").to_timestamp()
+    return pd.to_datetime(strings, format=PERIOD_FORMATS.get(len(first)))
+
+
+def coerce_values(values: Any) -> Tuple[np.ndarray, pd.Categorical]:
+    """Coerce a value column to float64 in one vectorized pass.
+
+    Parameters
+    ----------
+    values : Any
+        Array-like of numbers, numeric strings and sentinel codes.
+
+    Returns
+    -------
+    Tuple[np.ndarray, pd.Categorical]
+        The float64 values, NaN where no number is available, and the
+        sentinel codes as a categorical, null where the value is numeric.
+    """
+    series = pd.Series(values, dtype=object, copy=False)
+    numeric = pd.to_numeric(series, errors="coerce").to_numpy(dtype="float64")
+    flagged = series.where(np.isnan(numeric) & series.notna().to_numpy())
+    observed = set(flagged.dropna().unique())
+    categories = SENTINELS + sorted(observed - set(SENTINELS), key=str)
+    return numeric, pd.Categorical(flagged, categories=categories)
+
+
+def records_to_columns(
+    data: List[Dict[str, Any]],
+    columns: Dict[str, str],
+) -> Dict[str, Any]:
+    """Decode EIA data rows into typed column arrays.
+
+    Parameters
+    ----------
+    data : List[Dict[str, Any]]
+        EIA data rows.
+    columns : Dict[str, str]
+        Mapping of EIA keys to output column names.
+
+    Returns
+    -------
+    Dict[str, Any]
+        Column arrays by output column name. `period` is parsed into
+        datetime64, `value` is coerced to float64 with its sentinel codes in
+        `value_flag`, and the other columns are dictionary encoded as
+        categoricals.
+    """
+    raw = {key: [row.get(key) for row in data] for key in columns}
+    return type_columns(raw, columns)
+
+
+def type_columns(raw: Dict[str, List[Any]], columns: Dict[str, str]) -> Dict[str, Any]:
+    """Type raw column values, see `records_to_columns`."""
+    result: Dict[str, Any] = {}
+    for key, name in columns.items():
+        values = np.array(raw[key], dtype=object)
+        if name == "period":
+            result[name] = parse_periods(values).values
+        elif name == "value":
+            result[name], result[f"{name}_flag"] = coerce_values(values)
+        else:
+            result[name] = pd.Categorical(values)
+    return result
+
+
+def to_dataframe(
+    data: List[Dict[str, Any]],
+    columns: Dict[str, str],
+) -> pd.DataFrame:
+    """Decode EIA data rows into a DataFrame, without building data models."""
+    return pd.DataFrame(records_to_columns(data, columns), copy=False)
+
+
+def to_arrow(
+    data: List[Dict[str, Any]],
+    columns: Dict[str, str],
+    schema: Optional[Any] = None,
+) -> Any:
+    """Decode EIA data rows into a `pyarrow.Table`. Requires pyarrow."""
+    try:
+        import pyarrow as pa  # pylint: disable=import-outside-toplevel
+    except ImportError as e:
+        raise ImportError(
+            "pyarrow is required for Arrow output."
+            + " Install it with `pip install pyarrow`."
+        ) from e
+
+    return pa.Table.from_pandas(
+        to_dataframe(data, columns), schema=schema, preserve_index=False
+    )
@@ -0,0 +1,32 @@
+"""JSON decoding of EIA responses.
+
+orjson is used when it is installed, falling back to the stdlib decoder.
+
+Responses are decoded whole, once, by the client. The response cache,
+single-flight sharing, the vintage store and the warehouse all work on the
+decoded response, so the columnar and streaming paths start from its rows
+rather than decoding `response.data` straight from the payload.
+"""
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+
+Payload = Union[bytes, bytearray, str]
+
+
+def loads(payload: Payload) -> Any:
+    """Decode a JSON document."""
+    if orjson is not None:
+        return orjson.loads(payload)  # pylint: disable=no-member
+    return json.loads(payload)
+
+
+def dumps(obj: Any) -> bytes:
+    """Encode an object as compact JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj)  # pylint: disable=no-member
+    return json.dumps(obj, separators=(",", ":")).encode()
@@ -1,28 +1,212 @@
 """EIA API helpers."""
+import asyncio
 import warnings
-from typing import Dict, List, Optional
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional, Tuple
+from urllib.parse import urlencode
 
-import requests
 from openbb_core.provider.abstract.query_params import QueryParams
 
+from .cache import get_cache
+from .client import get_client
+from .telemetry import record_cache
+from .transport import get_base_url
+from .vintages import RETRIEVED, earliest_retrieved, stamp_retrieved
+
 _warn = warnings.warn
 
-BASE_URL = "https://api.eia.gov"
+EIA_MAX_ROWS = 5000
+MAX_WORKERS = 8
+MAX_URL_LENGTH = 2048
 
 
 def make_eia_params(query: QueryParams, facet_list: List[str]):
     """Make EIA API parameters. This includes applying filters."""
     params = query.model_dump(by_alias=True, exclude_none=True)
     params["data[0]"] = "value"
+    if "sort[0][column]" not in params:
+        params.pop("sort[0][direction]", None)
 
     for facet in facet_list:
         if facet in params:
-            for facet_value in params[facet].split(","):
-                params[f"facets[{facet}][]"] = facet_value.strip()
-            params.pop(facet)
+            params[f"facets[{facet}][]"] = [
+                facet_value.strip() for facet_value in params.pop(facet).split(",")
+            ]
     return params
 
 
+def to_query_items(params: Dict) -> List[Tuple[str, Any]]:
+    """Flatten parameters into query items, repeating multi-value facets."""
+    items: List[Tuple[str, Any]] = []
+    for key, value in params.items():
+        if isinstance(value, (list, tuple)):
+            items.extend((key, item) for item in value)
+        else:
+            items.append((key, value))
+    return items
+
+
+def plan_facet_requests(
+    url: str, params: Dict, max_url_length: int = MAX_URL_LENGTH
+) -> List[Dict]:
+    """Pack the multi-value facets into as few requests as the URL length allows.
+
+    The facet with the most values is bisected until every request fits.
+
+    Parameters
+    ----------
+    url : str
+        Request URL without the query string.
+    params : Dict
+        Query parameters, with multi-value facets as lists.
+    max_url_length : int
+        Maximum length of a request URL.
+
+    Returns
+    -------
+    List[Dict]
+        Query parameters of each request.
+    """
+    if len(url) + 1 + len(urlencode(to_query_items(params))) <= max_url_length:
+        return [params]
+    facets = [
+        key
+        for key, value in params.items()
+        if isinstance(value, (list, tuple)) and len(value) > 1
+    ]
+    if not facets:
+        return [params]
+    facet = max(facets, key=lambda key: len(params[key]))
+    values = list(params[facet])
+    half = len(values) // 2
+    return plan_facet_requests(
+        url, {**params, facet: values[:half]}, max_url_length
+    ) + plan_facet_requests(url, {**params, facet: values[half:]}, max_url_length)
+
+
+def plan_requests(
+    api: str,
+    route1: str,
+    route2: Optional[str],
+    api_version: int,
+    params: Dict,
+) -> List[Dict]:
+    """Plan the requests of a query. Queries offset by the user are not split."""
+    if params.get("offset"):
+        return [params]
+    return plan_facet_requests(make_eia_url(api, route1, route2, api_version), params)
+
+
+def get_sort_keys(params: Dict) -> List[Tuple[str, bool]]:
+    """Return the (column, descending) sort keys of a query, in priority order."""
+    keys: List[Tuple[str, bool]] = []
+    while f"sort[{len(keys)}][column]" in params:
+        direction = params.get(f"sort[{len(keys)}][direction]", "asc")
+        keys.append(
+            (params[f"sort[{len(keys)}][column]"], str(direction).lower() == "desc")
+        )
+    return keys
+
+
+def make_sort_key(column: str, descending: bool) -> Callable[[Dict], Tuple]:
+    """Return the sort key of a column of EIA rows.
+
+    Values are compared as numbers, and rows without a value, or with a
+    sentinel code such as W, are sorted last in either direction.
+    """
+
+    def key(row: Dict) -> Tuple:
+        value: Any = row.get(column)
+        if column == "value":
+            try:
+                value = float(value)
+            except (TypeError, ValueError):
+                value = None
+        missing = value is None
+        return (missing != descending, 0 if missing else value)
+
+    return key
+
+
+def sort_rows(rows: List[Dict], sort: List[Tuple[str, bool]]) -> List[Dict]:
+    """Sort rows by the sort keys of a query, see `get_sort_keys`.
+
+    The sort is stable, so the rows of several sorted requests are merged.
+    """
+    for column, descending in reversed(sort):
+        rows = sorted(rows, key=make_sort_key(column, descending), reverse=descending)
+    return rows
+
+
+def merge_responses(
+    responses: List[Dict],
+    length: Optional[int] = None,
+    sort: Optional[List[Tuple[str, bool]]] = None,
+) -> Dict:
+    """Merge the responses of a planned query, keeping at most `length` rows.
+
+    Each response is sorted on its own, so with `sort`, the rows are merged
+    in the sort order before `length` is applied. The merged response keeps
+    the earliest retrieval time of the responses.
+    """
+    merged = responses[0]
+    retrieved = earliest_retrieved(responses)
+    if retrieved is not None:
+        merged[RETRIEVED] = retrieved
+    response = merged["response"]
+    for other in responses[1:]:
+        response["data"].extend(other["response"]["data"])
+        response["total"] = int(response.get("total") or 0) + int(
+            other["response"].get("total") or 0
+        )
+    if sort:
+        response["data"] = sort_rows(response["data"], sort)
+    if length is not None:
+        del response["data"][length:]
+    return merged
+
+
+def make_eia_route_url(
+    api: str,
+    route1: str,
+    route2: Optional[str],
+    api_version: int,
+) -> str:
+    """Return the URL of an EIA API route, which serves its metadata.
+
+    See `transport.get_base_url` for the base URL.
+    """
+    route_url = f"{route1}/{route2}" if route2 else route1
+    return get_base_url() + f"/v{str(api_version)}" + f"/{api}" + f"/{route_url}"
+
+
+def make_eia_url(
+    api: str,
+    route1: str,
+    route2: Optional[str],
+    api_version: int,
+) -> str:
+    """Return the data URL of an EIA API route."""
+    return make_eia_route_url(api, route1, route2, api_version) + "/data"
+
+
+def make_cache_route(api: str, route1: str, route2: Optional[str]) -> str:
+    """Return the route name used by the response cache, e.g. natural-gas/cons/sum."""
+    return f"{api}/{route1}/{route2}" if route2 else f"{api}/{route1}"
+
+
+def split_cache_route(route: str) -> Tuple[str, str, Optional[str]]:
+    """Return the api, first and second routes of a response cache route."""
+    api, route1, *route2 = route.split("/", 2)
+    return api, route1, route2[0] if route2 else None
+
+
+def is_cacheable(response: Dict) -> bool:
+    """Return whether a response holds data that can be cached."""
+    return "error" not in response and "data" in response.get("response", {})
+
+
 def make_eia_request(
     api: str,
     route1: str,
@@ -30,7 +214,10 @@ def make_eia_request(
     api_version: int,
     params: Dict,
 ) -> Dict:
-    """Return a URL for the EIA API.
+    """Make a blocking request to the EIA API using the shared client.
+
+    Responses are served from, and stored in, the shared response cache.
+    Must not be called from a running event loop, see `amake_eia_request`.
 
     Parameters
     ----------
@@ -44,32 +231,392 @@ def make_eia_request(
         API version.
     params : Dict
         Query parameters.
-    exclude : Optional[List[str]]
-        Parameters to exclude from query.
 
     Returns
     -------
     Dict
         JSON response.
     """
-    route_url = f"{route1}/{route2}" if route2 else route1
-    data_url = (
-        BASE_URL + f"/v{str(api_version)}" + f"/{api}" + f"/{route_url}" + "/data"
+    cache = get_cache()
+    cache_route = make_cache_route(api, route1, route2)
+    if cache is not None:
+        cached = cache.get(cache_route, params)
+        record_cache(cached is not None)
+        if cached is not None:
+            return cached
+
+    # The request goes through the shared client, with its retries, circuit
+    # breaker and rate limiter, in an event loop of the calling thread.
+    response = stamp_retrieved(
+        asyncio.run(
+            get_client().get_json(
+                make_eia_url(api, route1, route2, api_version),
+                params=to_query_items(params),
+            )
+        )
     )
-    r = requests.get(
-        data_url,
-        params=params,
-        headers={"Accept": "application/json"},
-        timeout=60,
+    if cache is not None and is_cacheable(response):
+        cache.set(cache_route, params, response)
+    return response
+
+
+def plan_pages(
+    total: int,
+    offset: int = 0,
+    length: Optional[int] = None,
+    page_size: int = EIA_MAX_ROWS,
+) -> List[Tuple[int, int]]:
+    """Plan the `offset`/`length` windows needed to cover a result set.
+
+    Parameters
+    ----------
+    total : int
+        Total rows available, as reported by the API.
+    offset : int
+        First row to return.
+    length : Optional[int]
+        Maximum number of rows to return. All remaining rows if None.
+    page_size : int
+        Maximum rows per request.
+
+    Returns
+    -------
+    List[Tuple[int, int]]
+        Ordered (offset, length) windows.
+    """
+    end = total if length is None else min(total, offset + length)
+    return [
+        (start, min(page_size, end - start)) for start in range(offset, end, page_size)
+    ]
+
+
+def split_page_params(params: Dict) -> Tuple[Dict, int, Optional[int]]:
+    """Split the `offset` and `length` parameters from the rest of the query."""
+    params = dict(params)
+    offset = int(params.pop("offset", None) or 0)
+    length = params.pop("length", None)
+    return params, offset, int(length) if length is not None else None
+
+
+def merge_pages(first: Dict, pages: List[Dict]) -> Dict:
+    """Append the data of the remaining page responses to the first page response.
+
+    The merged response keeps the earliest retrieval time of the pages, and
+    drops the incomplete return warning, since the pages cover the rows
+    asked for. Error responses are returned unchanged.
+    """
+    if "response" not in first:
+        return first
+    response = first["response"]
+    for page in pages:
+        response["data"].extend(page["response"]["data"])
+    retrieved = earliest_retrieved([first, *pages])
+    if retrieved is not None:
+        first[RETRIEVED] = retrieved
+    response["warnings"] = [
+        warning
+        for warning in response.get("warnings", [])
+        if warning.get("warning") != "incomplete return"
+    ]
+    return first
+
+
+def make_eia_paginated_request(
+    api: str,
+    route1: str,
+    route2: Optional[str],
+    api_version: int,
+    params: Dict,
+    max_workers: int = MAX_WORKERS,
+) -> Dict:
+    """Make an EIA API request, fetching every page of the result set.
+
+    Multi-value facets are packed into as few requests as the URL length
+    allows. For each request, the first page is requested synchronously to
+    read `total`, and the remaining pages are fetched concurrently and merged
+    in order.
+
+    Parameters
+    ----------
+    api : str
+        API name.
+    route1 : str
+        First route.
+    route2 : Optional[str]
+        Second route.
+    api_version : int
+        API version.
+    params : Dict
+        Query parameters. `offset` and `length` bound the rows returned.
+    max_workers : int
+        Maximum number of concurrent page requests.
+
+    Returns
+    -------
+    Dict
+        JSON response of the first page with the data of all pages.
+    """
+    batches = plan_requests(api, route1, route2, api_version, params)
+    if len(batches) > 1:
+        return merge_responses(
+            [
+                make_eia_paginated_request(
+                    api, route1, route2, api_version, batch, max_workers
+                )
+                for batch in batches
+            ],
+            length=split_page_params(params)[2],
+            sort=get_sort_keys(params),
+        )
+
+    params, offset, length = split_page_params(params)
+    first_length = EIA_MAX_ROWS if length is None else min(length, EIA_MAX_ROWS)
+    first = make_eia_request(
+        api=api,
+        route1=route1,
+        route2=route2,
+        api_version=api_version,
+        params={**params, "offset": offset, "length": first_length},
+    )
+    total = int(first.get("response", {}).get("total") or 0)
+    windows = plan_pages(total=total, offset=offset, length=length)[1:]
+    if not windows:
+        return merge_pages(first, [])
+
+    def fetch_page(window: Tuple[int, int]) -> Dict:
+        return make_eia_request(
+            api=api,
+            route1=route1,
+            route2=route2,
+            api_version=api_version,
+            params={**params, "offset": window[0], "length": window[1]},
+        )
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(windows))) as executor:
+        pages = list(executor.map(fetch_page, windows))
+    return merge_pages(first, pages)
+
+
+async def amake_eia_request(
+    api: str,
+    route1: str,
+    route2: Optional[str],
+    api_version: int,
+    params: Dict,
+    refresh: bool = False,
+) -> Dict:
+    """Make an asynchronous request to the EIA API using the shared client.
+
+    Responses are served from, and stored in, the shared response cache.
+
+    Parameters
+    ----------
+    api : str
+        API name.
+    route1 : str
+        First route.
+    route2 : Optional[str]
+        Second route.
+    api_version : int
+        API version.
+    params : Dict
+        Query parameters.
+    refresh : bool
+        Skip the cache read and overwrite the cached response, if any.
+
+    Returns
+    -------
+    Dict
+        JSON response.
+    """
+    cache = get_cache()
+    cache_route = make_cache_route(api, route1, route2)
+    if cache is not None and not refresh:
+        cached = await cache.aget(cache_route, params)
+        record_cache(cached is not None)
+        if cached is not None:
+            return cached
+
+    response = stamp_retrieved(
+        await get_client().get_json(
+            make_eia_url(api, route1, route2, api_version),
+            params=to_query_items(params),
+        )
     )
-    return r.json()
+    if cache is not None and is_cacheable(response):
+        await cache.aset(cache_route, params, response)
+    return response
 
 
-def process_warnings(response: Dict) -> None:
-    """Process warnings."""
+async def amake_eia_paginated_request(
+    api: str,
+    route1: str,
+    route2: Optional[str],
+    api_version: int,
+    params: Dict,
+    max_workers: int = MAX_WORKERS,
+) -> Dict:
+    """Make an asynchronous EIA API request, fetching every page of the result set.
+
+    Same as `make_eia_paginated_request`, with the remaining pages fetched as
+    concurrent tasks bounded by `max_workers`.
+    """
+    batches = plan_requests(api, route1, route2, api_version, params)
+    if len(batches) > 1:
+        responses = await asyncio.gather(
+            *(
+                amake_eia_paginated_request(
+                    api, route1, route2, api_version, batch, max_workers
+                )
+                for batch in batches
+            )
+        )
+        return merge_responses(
+            list(responses),
+            length=split_page_params(params)[2],
+            sort=get_sort_keys(params),
+        )
+
+    params, offset, length = split_page_params(params)
+    first_length = EIA_MAX_ROWS if length is None else min(length, EIA_MAX_ROWS)
+    first = await amake_eia_request(
+        api=api,
+        route1=route1,
+        route2=route2,
+        api_version=api_version,
+        params={**params, "offset": offset, "length": first_length},
+    )
+    total = int(first.get("response", {}).get("total") or 0)
+    windows = plan_pages(total=total, offset=offset, length=length)[1:]
+    if not windows:
+        return merge_pages(first, [])
+
+    semaphore = asyncio.Semaphore(max_workers)
+
+    async def fetch_page(window: Tuple[int, int]) -> Dict:
+        async with semaphore:
+            return await amake_eia_request(
+                api=api,
+                route1=route1,
+                route2=route2,
+                api_version=api_version,
+                params={**params, "offset": window[0], "length": window[1]},
+            )
+
+    pages = await asyncio.gather(*(fetch_page(window) for window in windows))
+    return merge_pages(first, list(pages))
+
+
+async def aiter_eia_pages(
+    api: str,
+    route1: str,
+    route2: Optional[str],
+    api_version: int,
+    params: Dict,
+    prefetch: int = 1,
+) -> AsyncIterator[Dict]:
+    """Yield the response of each page of an EIA result set, in order.
+
+    Up to `prefetch` following pages are downloaded while the current page is
+    consumed, so memory stays bounded by `prefetch + 1` pages. A query split
+    into several requests yields at most `length` rows in total, and when it
+    is sorted, its requests are merged in the sort order before the first
+    page is yielded.
+
+    Parameters
+    ----------
+    api : str
+        API name.
+    route1 : str
+        First route.
+    route2 : Optional[str]
+        Second route.
+    api_version : int
+        API version.
+    params : Dict
+        Query parameters. `offset` and `length` bound the rows returned.
+    prefetch : int
+        Number of pages downloaded ahead of the consumer.
+
+    Yields
+    ------
+    Dict
+        JSON response of a page, with its data rows and retrieval time.
+    """
+    batches = plan_requests(api, route1, route2, api_version, params)
+    if len(batches) > 1:
+        if get_sort_keys(params):
+            yield await amake_eia_paginated_request(
+                api, route1, route2, api_version, params
+            )
+            return
+        remaining = split_page_params(params)[2]
+        for batch in batches:
+            if remaining is not None:
+                if remaining <= 0:
+                    return
+                batch = {**batch, "length": remaining}
+            async for page in aiter_eia_pages(
+                api, route1, route2, api_version, batch, prefetch
+            ):
+                if remaining is not None:
+                    remaining -= len(page["response"]["data"])
+                yield page
+        return
+
+    params, offset, length = split_page_params(params)
+    first_length = EIA_MAX_ROWS if length is None else min(length, EIA_MAX_ROWS)
+    first = await amake_eia_request(
+        api=api,
+        route1=route1,
+        route2=route2,
+        api_version=api_version,
+        params={**params, "offset": offset, "length": first_length},
+    )
+    process_warnings(first["response"], paginated=True)
+    total = int(first["response"].get("total") or 0)
+    windows = iter(plan_pages(total=total, offset=offset, length=length)[1:])
+    pending: Deque["asyncio.Future[Dict]"] = deque()
+
+    def schedule_next() -> None:
+        window = next(windows, None)
+        if window is not None:
+            pending.append(
+                asyncio.ensure_future(
+                    amake_eia_request(
+                        api=api,
+                        route1=route1,
+                        route2=route2,
+                        api_version=api_version,
+                        params={**params, "offset": window[0], "length": window[1]},
+                    )
+                )
+            )
+
+    try:
+        for _ in range(max(prefetch, 1)):
+            schedule_next()
+        page = first
+        del first
+        yield page
+        while pending:
+            page = await pending.popleft()
+            schedule_next()
+            yield page
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def process_warnings(response: Dict, paginated: bool = False) -> None:
+    """Process warnings.
+
+    When `paginated`, the remaining pages of the response are fetched too,
+    so the incomplete return warning does not apply.
+    """
     if "warnings" in response and len(response["warnings"]) > 0:
         for warning in response["warnings"]:
-            if warning["warning"] == "incomplete return":
+            if warning["warning"] == "incomplete return" and not paginated:
                 _warn(
                     f"{warning['warning']} : {warning['description']}. "
                     + f"Total rows available: {response['total']}."
@@ -0,0 +1,379 @@
+"""Cached catalog of EIA route metadata."""
+import asyncio
+import functools
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Union
+
+import aiohttp
+from openbb_core.provider.abstract.query_params import QueryParams
+
+from .cache import DAY, DEFAULT_CACHE_DIR
+from .client import get_client
+from .helpers import make_cache_route, make_eia_route_url
+from .threads import to_thread
+from .transport import EIAError, get_base_url
+
+METADATA_TTL = 7 * DAY
+# Seconds during which a route whose metadata failed to load is not validated.
+FAILURE_TTL = 60
+
+# Errors of a metadata request, after which queries are not validated.
+METADATA_ERRORS = (
+    EIAError,
+    aiohttp.ClientError,
+    asyncio.TimeoutError,
+    KeyError,
+    TypeError,
+)
+
+
+class RouteMetadata:
+    """Frequencies, period range and facet values of an EIA route.
+
+    Parameters
+    ----------
+    route : str
+        Route name, e.g. natural-gas/cons/sum.
+    frequencies : Dict[str, str]
+        Period format of each supported frequency.
+    facets : Dict[str, Dict[str, str]]
+        Names of the values of each loaded facet. Facets are loaded on first
+        use, see `MetadataCatalog.aload_facets`.
+    start_period : Optional[str]
+        First period available.
+    end_period : Optional[str]
+        Last period available.
+    fetched : Optional[float]
+        Time the metadata was fetched.
+    facet_ids : Optional[Sequence[str]]
+        Facets of the route. Defaults to the loaded facets.
+    """
+
+    def __init__(
+        self,
+        route: str,
+        frequencies: Dict[str, str],
+        facets: Dict[str, Dict[str, str]],
+        start_period: Optional[str] = None,
+        end_period: Optional[str] = None,
+        fetched: Optional[float] = None,
+        facet_ids: Optional[Sequence[str]] = None,
+    ):
+        """Initialize the metadata and its lookup indexes."""
+        self.route = route
+        self.frequencies = frequencies
+        self.facets: Dict[str, Dict[str, str]] = {}
+        self.start_period = start_period
+        self.end_period = end_period
+        self.fetched = time.time() if fetched is None else fetched
+        self.facet_ids = list(facets if facet_ids is None else facet_ids)
+        self._index: Dict[str, Dict[str, str]] = {}
+        for facet, values in facets.items():
+            self.add_facet(facet, values)
+
+    def add_facet(self, facet: str, values: Dict[str, str]) -> None:
+        """Add the names of the values of a facet and index them."""
+        self.facets[facet] = values
+        self._index[facet] = {
+            **{name.upper(): key for key, name in values.items() if name},
+            **{key.upper(): key for key in values},
+        }
+
+    def missing_facets(self, facets: Sequence[str]) -> List[str]:
+        """Return the facets of the route among `facets` not loaded yet."""
+        return [f for f in facets if f in self.facet_ids and f not in self.facets]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the metadata as a JSON serializable dict."""
+        return {
+            "route": self.route,
+            "frequencies": self.frequencies,
+            "facets": self.facets,
+            "start_period": self.start_period,
+            "end_period": self.end_period,
+            "fetched": self.fetched,
+            "facet_ids": self.facet_ids,
+        }
+
+    def normalize_facet(self, facet: str, values: List[str]) -> List[str]:
+        """Map facet values, given as ids or names in any case, to their ids."""
+        index = self._index.get(facet)
+        if not index:
+            return values
+        normalized, invalid = [], []
+        for value in values:
+            key = index.get(value.strip().upper())
+            if key is None:
+                invalid.append(value)
+            else:
+                normalized.append(key)
+        if invalid:
+            choices = sorted(self.facets[facet])
+            raise ValueError(
+                f"Invalid {facet} {', '.join(invalid)} for {self.route}."
+                + (f" Choose from {', '.join(choices)}." if len(choices) <= 60 else "")
+            )
+        return normalized
+
+    def validate_period(
+        self, frequency: str, start: Optional[str], end: Optional[str]
+    ) -> None:
+        """Validate the frequency and the period range of a query."""
+        if self.frequencies and frequency not in self.frequencies:
+            raise ValueError(
+                f"{self.route} does not support {frequency} frequency."
+                + f" Choose from {', '.join(self.frequencies)}."
+            )
+        if start and self.end_period and start[:4] > self.end_period[:4]:
+            raise ValueError(
+                f"{self.route} has no data after {self.end_period}, got start {start}."
+            )
+        if end and self.start_period and end[:4] < self.start_period[:4]:
+            raise ValueError(
+                f"{self.route} has no data before {self.start_period}, got end {end}."
+            )
+
+    def normalize_query(self, query: QueryParams, facet_list: List[str]) -> QueryParams:
+        """Validate a query and return it with normalized facet values."""
+        params = query.model_dump(by_alias=True, exclude_none=True)
+        self.validate_period(
+            params.get("frequency", ""), params.get("start"), params.get("end")
+        )
+        updates = {}
+        for name, field in type(query).model_fields.items():
+            alias = field.alias or name
+            if alias in facet_list and alias in params:
+                updates[name] = ",".join(
+                    self.normalize_facet(alias, str(params[alias]).split(","))
+                )
+        return query.model_copy(update=updates) if updates else query
+
+
+class MetadataCatalog:
+    """In-memory index of route metadata, persisted to disk.
+
+    Routes are keyed by the API base URL too, so that the metadata of a
+    stand-in server never validates the queries to EIA. Concurrent loads of
+    the same metadata share one request, and a failed load is not retried
+    for `failure_ttl` seconds.
+
+    Parameters
+    ----------
+    path : Union[str, Path]
+        Directory of the persisted metadata.
+    ttl : int
+        Seconds before the metadata of a route is fetched again.
+    failure_ttl : int
+        Seconds before the metadata of a route that failed to load is
+        requested again.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path] = DEFAULT_CACHE_DIR / "metadata",
+        ttl: int = METADATA_TTL,
+        failure_ttl: int = FAILURE_TTL,
+    ):
+        """Initialize the catalog."""
+        self.path = Path(path)
+        self.ttl = ttl
+        self.failure_ttl = failure_ttl
+        self.routes: Dict[str, RouteMetadata] = {}
+        self.failures: Dict[str, float] = {}
+        self._loading: Dict[Any, "asyncio.Future[Any]"] = {}
+
+    @staticmethod
+    def _key(route: str) -> str:
+        """Return the key of a route of the configured API."""
+        return f"{get_base_url()}/{route}"
+
+    def _file(self, route: str) -> Path:
+        """Return the file of the persisted metadata of a route."""
+        api = hashlib.sha256(get_base_url().encode()).hexdigest()[:16]
+        return self.path / api / f"{route.replace('/', '_')}.json"
+
+    def get_loaded(self, route: str) -> Optional[RouteMetadata]:
+        """Return the fresh metadata of a route from memory."""
+        metadata = self.routes.get(self._key(route))
+        if metadata is None or metadata.fetched + self.ttl < time.time():
+            return None
+        return metadata
+
+    def get(self, route: str) -> Optional[RouteMetadata]:
+        """Return the fresh metadata of a route from memory or disk."""
+        if self._key(route) not in self.routes and self._file(route).exists():
+            self.routes[self._key(route)] = RouteMetadata(
+                **json.loads(self._file(route).read_text(encoding="utf-8"))
+            )
+        return self.get_loaded(route)
+
+    def put(self, metadata: RouteMetadata) -> None:
+        """Store the metadata of a route."""
+        self.routes[self._key(metadata.route)] = metadata
+        self.save(metadata)
+
+    def save(self, metadata: RouteMetadata) -> None:
+        """Persist the metadata of a route, if the cache directory is writable."""
+        path = self._file(metadata.route)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(metadata.to_dict()), encoding="utf-8")
+        except OSError:
+            pass
+
+    def record_failure(self, route: str) -> None:
+        """Record that the metadata of a route failed to load."""
+        self.failures[self._key(route)] = time.time()
+
+    def has_failed(self, route: str) -> bool:
+        """Return whether the metadata of a route failed to load recently."""
+        failed = self.failures.get(self._key(route))
+        return failed is not None and failed + self.failure_ttl > time.time()
+
+    async def _load_once(self, key: Any, load: Callable[[], Awaitable[Any]]) -> Any:
+        """Run `load` once for all the concurrent callers sharing `key`."""
+        key = (id(asyncio.get_running_loop()), key)
+        future = self._loading.get(key)
+        if future is None:
+            future = asyncio.ensure_future(load())
+            self._loading[key] = future
+            future.add_done_callback(lambda _: self._loading.pop(key, None))
+        return await asyncio.shield(future)
+
+    async def aget(
+        self,
+        api: str,
+        route1: str,
+        route2: Optional[str],
+        api_key: Optional[str] = "",
+        api_version: int = 2,
+    ) -> RouteMetadata:
+        """Return the metadata of a route, fetching it on first use.
+
+        Only the facet ids of the route are fetched, the values of each
+        facet are loaded by `aload_facets`. The disk is only read, in a
+        worker thread, when the metadata is not in memory.
+        """
+        route = make_cache_route(api, route1, route2)
+        metadata = self.get_loaded(route)
+        if metadata is None:
+            metadata = await to_thread(self.get, route)
+        if metadata is not None:
+            return metadata
+
+        async def load() -> RouteMetadata:
+            url = make_eia_route_url(api, route1, route2, api_version)
+            response = (
+                await get_client().get_json(url, params=[("api_key", api_key)])
+            )["response"]
+            metadata = RouteMetadata(
+                route=route,
+                frequencies={
+                    frequency["id"]: frequency.get("format", "")
+                    for frequency in response.get("frequency", [])
+                },
+                facets={},
+                start_period=response.get("startPeriod"),
+                end_period=response.get("endPeriod"),
+                facet_ids=[facet["id"] for facet in response.get("facets", [])],
+            )
+            await to_thread(self.put, metadata)
+            return metadata
+
+        return await self._load_once(self._key(route), load)
+
+    async def aload_facets(
+        self,
+        metadata: RouteMetadata,
+        facets: Sequence[str],
+        api: str,
+        route1: str,
+        route2: Optional[str],
+        api_key: Optional[str] = "",
+        api_version: int = 2,
+    ) -> RouteMetadata:
+        """Load the values of the facets of a route that are not loaded yet."""
+        missing = metadata.missing_facets(facets)
+        if not missing:
+            return metadata
+        url = make_eia_route_url(api, route1, route2, api_version)
+
+        async def load(facet: str) -> None:
+            response = await get_client().get_json(
+                f"{url}/facet/{facet}", params=[("api_key", api_key)]
+            )
+            metadata.add_facet(
+                facet,
+                {
+                    str(value["id"]): value.get("name") or value.get("alias") or ""
+                    for value in response["response"].get("facets", [])
+                },
+            )
+
+        key = self._key(metadata.route)
+        await asyncio.gather(
+            *(
+                self._load_once((key, facet), functools.partial(load, facet))
+                for facet in missing
+            )
+        )
+        await to_thread(self.save, metadata)
+        return metadata
+
+
+_catalog: Optional[MetadataCatalog] = None
+
+
+def get_catalog() -> MetadataCatalog:
+    """Return the shared metadata catalog, stored next to the response cache."""
+    global _catalog  # pylint: disable=global-statement
+    if _catalog is None:
+        cache_dir = Path(os.environ.get("OPENBB_EIA_CACHE_DIR", DEFAULT_CACHE_DIR))
+        _catalog = MetadataCatalog(cache_dir / "metadata")
+    return _catalog
+
+
+async def anormalize_query(
+    query: QueryParams,
+    api: str,
+    route1: str,
+    route2: Optional[str],
+    facet_list: List[str],
+    api_key: Optional[str] = "",
+    api_version: int = 2,
+) -> QueryParams:
+    """Validate and normalize a query against the metadata of its route.
+
+    Invalid queries raise a ValueError without a data request. Only the
+    facets the query filters on are loaded. The query is returned unchanged
+    when no API key is given, or when the metadata cannot be loaded, in
+    which case the route is not validated again for a short while.
+    """
+    if not api_key:
+        return query
+    catalog = get_catalog()
+    route = make_cache_route(api, route1, route2)
+    if catalog.has_failed(route):
+        return query
+    params = query.model_dump(by_alias=True, exclude_none=True)
+    try:
+        metadata = await catalog.aget(
+            api, route1, route2, api_key=api_key, api_version=api_version
+        )
+        metadata = await catalog.aload_facets(
+            metadata,
+            [facet for facet in facet_list if facet in params],
+            api,
+            route1,
+            route2,
+            api_key=api_key,
+            api_version=api_version,
+        )
+    except METADATA_ERRORS:
+        catalog.record_failure(route)
+        return query
+    return metadata.normalize_query(query, facet_list)
@@ -0,0 +1,199 @@
+"""Token-bucket rate limiter shared by the processes calling the EIA API."""
+import asyncio
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar, Union
+
+from .cache import DEFAULT_CACHE_DIR
+from .threads import to_thread
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore
+
+# The burst lets a paginated pull of up to 100,000 rows (20 pages) start
+# at once, later pages are paced at the rate.
+DEFAULT_RATE = 5.0
+DEFAULT_BURST = 20
+
+State = Tuple[float, float]
+T = TypeVar("T")
+
+
+class TokenBucket:
+    """Token bucket whose state is shared through a locked file.
+
+    Every request takes a token. Tokens refill at `rate` per second up to
+    `burst`. When the bucket is empty, a request reserves the next token and
+    waits for it, so waiting requests are served in arrival order across all
+    the processes sharing `path`.
+
+    Without `path`, or where file locks are unavailable or the file cannot
+    be created, the bucket is only shared within the process.
+
+    `aacquire` takes the file lock in a worker thread, and gives the token
+    back when the waiter is cancelled before using it.
+
+    Parameters
+    ----------
+    rate : float
+        Tokens added per second.
+    burst : int
+        Maximum number of tokens, i.e. the largest burst of requests.
+    path : Optional[Union[str, Path]]
+        State file shared by the processes.
+    """
+
+    def __init__(
+        self,
+        rate: float = DEFAULT_RATE,
+        burst: int = DEFAULT_BURST,
+        path: Optional[Union[str, Path]] = None,
+    ):
+        """Initialize the bucket."""
+        self.rate = rate
+        self.burst = burst
+        self.path = Path(path) if path and fcntl is not None else None
+        self.acquired = 0
+        self.delayed = 0
+        self.waited = 0.0
+        self._lock = threading.Lock()
+        self._state: State = (float(burst), time.time())
+        if self.path is not None:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                os.close(os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600))
+            except OSError:
+                self.path = None
+
+    def _refill(self, state: State) -> State:
+        """Return `state` with the tokens added since its last update."""
+        tokens, updated = state
+        now = time.time()
+        return (
+            min(float(self.burst), tokens + max(0.0, now - updated) * self.rate),
+            now,
+        )
+
+    def _take(self, state: State) -> Tuple[State, float]:
+        """Take a token from `state`; return the new state and the wait."""
+        tokens, now = self._refill(state)
+        tokens -= 1
+        return (tokens, now), max(0.0, -tokens / self.rate)
+
+    def _give(self, state: State) -> Tuple[State, None]:
+        """Give a token back to `state`."""
+        tokens, now = self._refill(state)
+        return (min(float(self.burst), tokens + 1), now), None
+
+    def _update(self, func: Callable[[State], Tuple[State, T]]) -> T:
+        """Apply `func` to the shared state under the lock; return its result."""
+        with self._lock:
+            if self.path is None:
+                self._state, result = func(self._state)
+                return result
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                raw = os.read(fd, 256)
+                try:
+                    state = tuple(json.loads(raw))
+                except ValueError:
+                    state = (float(self.burst), time.time())
+                state, result = func(state)  # type: ignore
+                os.lseek(fd, 0, os.SEEK_SET)
+                os.ftruncate(fd, 0)
+                os.write(fd, json.dumps(state).encode())
+            finally:
+                os.close(fd)  # Releases the lock.
+            return result
+
+    def reserve(self) -> float:
+        """Reserve a token and return the seconds to wait before using it."""
+        wait = self._update(self._take)
+        with self._lock:
+            self.acquired += 1
+            if wait > 0:
+                self.delayed += 1
+                self.waited += wait
+        return wait
+
+    def refund(self) -> None:
+        """Give back a reserved token that was not used."""
+        self._update(self._give)
+        with self._lock:
+            self.acquired -= 1
+
+    def acquire(self) -> float:
+        """Wait for a token. Returns the seconds waited."""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def aacquire(self) -> float:
+        """Wait for a token without blocking the event loop."""
+        reservation = asyncio.ensure_future(to_thread(self.reserve))
+        try:
+            wait = await asyncio.shield(reservation)
+            if wait > 0:
+                await asyncio.sleep(wait)
+        except asyncio.CancelledError:
+            reservation.add_done_callback(self._refund_reserved)
+            raise
+        return wait
+
+    def _refund_reserved(self, reservation: "asyncio.Future[float]") -> None:
+        """Refund the token of a completed reservation in a worker thread."""
+        if not reservation.cancelled() and reservation.exception() is None:
+            reservation.get_loop().run_in_executor(None, self.refund)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the requests and time spent waiting in this process."""
+        return {
+            "acquired": self.acquired,
+            "delayed": self.delayed,
+            "waited_seconds": self.waited,
+            "rate": self.rate,
+            "burst": self.burst,
+            "shared": self.path is not None,
+        }
+
+
+_rate_limiter: Optional[TokenBucket] = None
+
+
+def get_rate_limiter() -> Optional[TokenBucket]:
+    """Return the shared rate limiter, or None if it is disabled.
+
+    The limiter is configured with the `OPENBB_EIA_RATE` (requests per second,
+    set to 0 to disable), `OPENBB_EIA_BURST` and `OPENBB_EIA_RATE_FILE`
+    environment variables. Worker processes share the default state file in
+    the cache directory.
+    """
+    global _rate_limiter  # pylint: disable=global-statement
+    rate = float(os.environ.get("OPENBB_EIA_RATE", DEFAULT_RATE))
+    if rate <= 0:
+        return None
+    if _rate_limiter is None:
+        cache_dir = Path(os.environ.get("OPENBB_EIA_CACHE_DIR", DEFAULT_CACHE_DIR))
+        _rate_limiter = TokenBucket(
+            rate=rate,
+            burst=int(os.environ.get("OPENBB_EIA_BURST", DEFAULT_BURST)),
+            path=os.environ.get("OPENBB_EIA_RATE_FILE", cache_dir / "ratelimit"),
+        )
+    return _rate_limiter
+
+
+def configure_rate_limiter(**kwargs: Any) -> TokenBucket:
+    """Replace the shared rate limiter with one built from `kwargs`.
+
+    See `TokenBucket` for the accepted keyword arguments.
+    """
+    global _rate_limiter  # pylint: disable=global-statement
+    _rate_limiter = TokenBucket(**kwargs)
+    return _rate_limiter
@@ -0,0 +1,221 @@
+"""Local rollups of monthly EIA series.
+
+Quarterly, annual and year-to-date values are derived from monthly rows
+with vectorized reductions over the rows sorted by series and period, so
+one monthly request serves every frequency. How a series rolls up
+depends on what it measures:
+
+- flows (volumes consumed, produced, injected) are summed,
+- stocks (gas in storage, capacity, counts, reserves) take the value of
+  the last month of the period,
+- rates (prices, percentages, heat content) are averaged.
+
+The aggregation of each series is guessed from its units and description
+by `classify_series` and can be overridden per series.
+"""
+from typing import Any, Dict, List, Literal, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .columnar import coerce_values, parse_periods
+
+Aggregation = Literal["sum", "last", "mean"]
+RollupFrequency = Literal["quarterly", "annual", "ytd"]
+
+AGGREGATIONS: Tuple[Aggregation, ...] = ("sum", "last", "mean")
+ROLLUP_FREQUENCIES: Tuple[RollupFrequency, ...] = ("quarterly", "annual", "ytd")
+
+# Months in a complete period of each frequency.
+PERIOD_MONTHS = {"quarterly": 3, "annual": 12}
+
+# Description keywords, matched case-insensitively. Flow keywords win over
+# stock keywords, e.g. "Underground Storage Withdrawals" is a flow.
+FLOW_KEYWORDS = ("injection", "withdrawal", "net change", "additions")
+STOCK_KEYWORDS = (
+    "storage volume",
+    "working gas",
+    "base gas",
+    "in storage",
+    "underground storage",
+    "capacity",
+    "number of",
+    "reserves",
+    "crew count",
+)
+
+# Units of rates, e.g. $/MCF, BTU/CF and percentages.
+RATE_UNIT_MARKERS = ("/", "%", "PCT", "PERCENT")
+
+# Column names of the data model and of the EIA rows.
+DESCRIPTION_COLUMNS = ("series_description", "series-description")
+
+
+def classify_series(units: Optional[str], description: Optional[str]) -> str:
+    """Return the aggregation of a series, "sum", "last" or "mean"."""
+    text = (description or "").lower()
+    if any(keyword in text for keyword in FLOW_KEYWORDS):
+        return "sum"
+    if any(keyword in text for keyword in STOCK_KEYWORDS):
+        return "last"
+    unit = (units or "").upper()
+    if any(marker in unit for marker in RATE_UNIT_MARKERS):
+        return "mean"
+    return "sum"
+
+
+def to_monthly_frame(data: Union[pd.DataFrame, List[Dict[str, Any]]]) -> pd.DataFrame:
+    """Return monthly rows as a DataFrame with datetime periods and float values.
+
+    Accepts the output of `fetch_columnar`, EIA rows or data model dumps.
+    """
+    if isinstance(data, pd.DataFrame):
+        df = data.copy(deep=False)
+    else:
+        df = pd.DataFrame(data)
+    if df.empty:
+        return df
+    if not pd.api.types.is_datetime64_any_dtype(df["period"]):
+        df["period"] = parse_periods(df["period"].to_numpy(dtype=object)).values
+    if not pd.api.types.is_float_dtype(df["value"]):
+        df["value"], _ = coerce_values(df["value"].to_numpy(dtype=object))
+    return df
+
+
+def series_aggregations(
+    df: pd.DataFrame, overrides: Optional[Dict[str, str]] = None
+) -> Dict[str, str]:
+    """Return the aggregation of each series of a frame.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Monthly rows with a `series` column and, when available, `units` and
+        a series description column.
+    overrides : Optional[Dict[str, str]]
+        Aggregations by series id, taking precedence over `classify_series`.
+    """
+    overrides = overrides or {}
+    invalid = {a for a in overrides.values() if a not in AGGREGATIONS}
+    if invalid:
+        raise ValueError(
+            f"Invalid aggregation {', '.join(sorted(invalid))}."
+            + f" Choose from {', '.join(AGGREGATIONS)}."
+        )
+    description = next((c for c in DESCRIPTION_COLUMNS if c in df.columns), None)
+    columns = ["series"] + [c for c in ("units", description) if c in df.columns]
+    series = df[columns].drop_duplicates("series")
+    units = series["units"] if "units" in series else [None] * len(series)
+    descriptions = series[description] if description else [None] * len(series)
+    return {
+        str(s): overrides.get(str(s)) or classify_series(u, d)
+        for s, u, d in zip(series["series"], units, descriptions)
+    }
+
+
+def rollup(
+    data: Union[pd.DataFrame, List[Dict[str, Any]]],
+    frequency: RollupFrequency = "annual",
+    aggregations: Optional[Dict[str, str]] = None,
+    partial: bool = False,
+) -> pd.DataFrame:
+    """Roll monthly rows up to quarterly, annual or year-to-date values.
+
+    Parameters
+    ----------
+    data : Union[pd.DataFrame, List[Dict[str, Any]]]
+        Monthly rows with `period`, `series` and `value`, see
+        `to_monthly_frame`. The other columns are carried over from the
+        last month of each period.
+    frequency : RollupFrequency
+        "quarterly", "annual", or "ytd" for each year up to the last month
+        reported for the series, so that the years compare like for like.
+    aggregations : Optional[Dict[str, str]]
+        Aggregations by series id ("sum", "last" or "mean"), overriding
+        `classify_series`.
+    partial : bool
+        Keep periods with missing or withheld months, e.g. the current
+        year. By default only complete periods are returned.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per series and period, with `period` at the start of the
+        period, the rolled up `value`, its `aggregation` and the number of
+        `months` it covers.
+    """
+    if frequency not in ROLLUP_FREQUENCIES:
+        raise ValueError(
+            f"Invalid frequency {frequency}."
+            + f" Choose from {', '.join(ROLLUP_FREQUENCIES)}."
+        )
+    df = to_monthly_frame(data)
+    if df.empty:
+        return df
+    # Rows of concatenated pulls may repeat a month, the later row wins.
+    df = df.sort_values(["series", "period"], kind="stable").drop_duplicates(
+        ["series", "period"], keep="last"
+    )
+    # Months since 1970-01, split into calendar years and months.
+    elapsed = df["period"].to_numpy(dtype="datetime64[M]").astype(np.int64)
+    years = elapsed // 12 + 1970
+    months = elapsed % 12 + 1
+    # Codes follow the sort order, so every group is a contiguous run of rows.
+    codes, uniques = pd.factorize(df["series"])
+    methods = series_aggregations(df, aggregations)
+    aggregation = np.array([methods[str(s)] for s in uniques], dtype=object)
+    if frequency == "quarterly":
+        starts = (months - 1) // 3 * 3 + 1
+        expected = np.full(len(df), PERIOD_MONTHS["quarterly"])
+    elif frequency == "annual":
+        starts = np.ones(len(df), dtype=int)
+        expected = np.full(len(df), PERIOD_MONTHS["annual"])
+    else:
+        # Every year of a series runs up to the last month of its latest year.
+        last = np.r_[codes[1:] != codes[:-1], True]
+        cutoff = months[last][codes]
+        keep = months <= cutoff
+        df, years, months, codes = df[keep], years[keep], months[keep], codes[keep]
+        starts = np.ones(len(df), dtype=int)
+        expected = cutoff[keep]
+
+    key = codes * 1_000_000 + years * 12 + starts
+    first = np.flatnonzero(np.r_[True, key[1:] != key[:-1]])
+    ends = np.r_[first[1:], len(key)] - 1
+    values = df["value"].to_numpy()
+    valid = ~np.isnan(values)
+    counts = np.add.reduceat(valid.astype(np.int64), first)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sums = np.where(
+            counts > 0, np.add.reduceat(np.where(valid, values, 0.0), first), np.nan
+        )
+        means = sums / counts
+    methods_of_groups = aggregation[codes[first]]
+    result = df.iloc[ends].reset_index(drop=True)
+    result["period"] = pd.to_datetime(
+        {"year": years[first], "month": starts[first], "day": 1}
+    ).values
+    result["value"] = np.select(
+        [methods_of_groups == "sum", methods_of_groups == "last"],
+        [sums, values[ends]],
+        means,
+    )
+    result["aggregation"] = methods_of_groups
+    result["months"] = counts
+    if not partial:
+        result = result[counts == expected[first]].reset_index(drop=True)
+    return result
+
+
+def rollups(
+    data: Union[pd.DataFrame, List[Dict[str, Any]]],
+    frequencies: Sequence[RollupFrequency] = ROLLUP_FREQUENCIES,
+    aggregations: Optional[Dict[str, str]] = None,
+    partial: bool = False,
+) -> Dict[str, pd.DataFrame]:
+    """Return the rollups of monthly rows by frequency, see `rollup`."""
+    df = to_monthly_frame(data)
+    return {
+        frequency: rollup(df, frequency, aggregations, partial)
+        for frequency in frequencies
+    }
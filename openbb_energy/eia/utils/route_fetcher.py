@@ -0,0 +1,317 @@
+"""Route level EIA fetch layer.
+
+Fetchers that read the same EIA route go through `afetch_route`, which
+deduplicates concurrent identical upstream requests. When several
+fetchers of a route differ only in facets they may filter locally, they
+share one superset request and filter its rows; a fetcher alone sends
+its filters to EIA.
+"""
+import asyncio
+import hashlib
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from openbb_core.provider.abstract.query_params import QueryParams
+
+from .cache import make_cache_key
+from .columnar import NAME_COLUMNS
+from .helpers import (
+    EIA_MAX_ROWS,
+    aiter_eia_pages,
+    amake_eia_paginated_request,
+    get_sort_keys,
+    make_cache_route,
+    make_eia_params,
+    process_warnings,
+    sort_rows,
+)
+from .metadata import anormalize_query
+from .vintages import get_retrieved, get_vintage_store
+from .warehouse import get_warehouse
+
+# Seconds the first fetcher of a superset request waits for others to share it.
+SHARE_WINDOW = 0.002
+
+_in_flight: Dict[Tuple[int, str], "asyncio.Future[Dict]"] = {}
+# Number of fetchers gathering on each superset request, until the first of
+# them decides whether it is shared.
+_gathering: Dict[Tuple[int, str], int] = {}
+
+
+async def single_flight(key: str, func: Callable[[], Awaitable[Dict]]) -> Dict:
+    """Run `func` once for all concurrent callers sharing the same `key`."""
+    flight_key = (id(asyncio.get_running_loop()), key)
+    future = _in_flight.get(flight_key)
+    if future is None:
+        future = asyncio.ensure_future(func())
+        _in_flight[flight_key] = future
+        future.add_done_callback(lambda _: _in_flight.pop(flight_key, None))
+    return await asyncio.shield(future)
+
+
+def make_flight_key(route: str, params: Dict, api_key: Optional[str]) -> str:
+    """Make the single-flight key of a request, from its cache key and API key.
+
+    Requests made with different API keys are not shared, so that a caller
+    never gets the response, or the error, of another key.
+    """
+    key_hash = hashlib.sha256((api_key or "").encode()).hexdigest()[:16]
+    return f"{make_cache_key(route, params)}:{key_hash}"
+
+
+async def is_shared(key: str) -> bool:
+    """Return whether several fetchers share the superset request of `key`.
+
+    A fetcher joins the superset request in flight, or the fetchers gathering
+    on it. The first of them waits `SHARE_WINDOW` seconds for the fetchers
+    started together, and the request is shared if any joined.
+    """
+    flight_key = (id(asyncio.get_running_loop()), key)
+    if flight_key in _in_flight:
+        return True
+    if flight_key in _gathering:
+        _gathering[flight_key] += 1
+        return True
+    _gathering[flight_key] = 1
+    try:
+        await asyncio.sleep(SHARE_WINDOW)
+    finally:
+        gathered = _gathering.pop(flight_key)
+    return gathered > 1
+
+
+def make_local_filters(
+    query: QueryParams, local_facets: Sequence[str]
+) -> Dict[str, set]:
+    """Return the facet values to filter locally, by facet."""
+    params = query.model_dump(by_alias=True, exclude_none=True)
+    return {
+        facet: {value.strip() for value in str(params[facet]).split(",")}
+        for facet in local_facets
+        if facet in params
+    }
+
+
+def filter_rows(data: List[Dict], filters: Dict[str, set]) -> List[Dict]:
+    """Keep the rows matching every facet filter."""
+    if not filters:
+        return list(data)
+    return [
+        row
+        for row in data
+        if all(row.get(facet) in values for facet, values in filters.items())
+    ]
+
+
+def make_lean(query: QueryParams, data: List[Dict]) -> List[Dict]:
+    """Drop the descriptive name columns if the query sets `lean`.
+
+    The rows are copied, since a single-flight response is shared.
+    """
+    if not getattr(query, "lean", False):
+        return data
+    columns = set(NAME_COLUMNS.values())
+    return [
+        {key: value for key, value in row.items() if key not in columns} for row in data
+    ]
+
+
+async def arecord_vintage(route: str, response: Dict) -> None:
+    """Record the rows of a response in the vintage store, if one is configured.
+
+    The rows are recorded with the time the response was retrieved from EIA,
+    which is older than now when it is served from the response cache.
+    """
+    store = get_vintage_store()
+    if store is not None:
+        await store.arecord(
+            route, response["response"]["data"], get_retrieved(response)
+        )
+
+
+def is_paginated(query: QueryParams) -> bool:
+    """Return whether the user paginates the query with `limit` or `offset`."""
+    return getattr(query, "limit", None) is not None or bool(
+        getattr(query, "offset", None)
+    )
+
+
+def read_warehouse(query: QueryParams, route: str) -> Optional[List[Dict]]:
+    """Serve a query from the local warehouse, if it holds the route.
+
+    The rows are sorted like EIA sorts them when the query sets `sort_by`.
+    """
+    warehouse = get_warehouse()
+    params = query.model_dump(by_alias=True, exclude_none=True)
+    frequency = params.get("frequency", "")
+    if warehouse is None or is_paginated(query) or not warehouse.has(route, frequency):
+        return None
+
+    def facet_values(facet: str) -> Optional[List[str]]:
+        if facet not in params:
+            return None
+        return [value.strip() for value in str(params[facet]).split(",")]
+
+    rows = warehouse.read_rows(
+        route,
+        frequency,
+        areas=facet_values("duoarea"),
+        processes=facet_values("process"),
+        series=facet_values("series"),
+        start=params.get("start"),
+        end=params.get("end"),
+    )
+    return sort_rows(rows, get_sort_keys(params))
+
+
+def make_route_params(
+    query: QueryParams, facet_list: List[str], local_facets: Sequence[str]
+) -> Tuple[Dict, Sequence[str]]:
+    """Make the upstream parameters of a route query.
+
+    Returns the parameters and the facets left to filter locally.
+    """
+    local_facets = () if is_paginated(query) else local_facets
+    upstream_facets = [facet for facet in facet_list if facet not in local_facets]
+
+    params = make_eia_params(query=query, facet_list=upstream_facets)
+    for facet in local_facets:
+        params.pop(facet, None)
+    return params, local_facets
+
+
+async def afetch_route(
+    query: QueryParams,
+    api: str,
+    route1: str,
+    route2: Optional[str],
+    facet_list: List[str],
+    api_key: Optional[str] = "",
+    local_facets: Sequence[str] = (),
+    api_version: int = 2,
+    **kwargs: Any,
+) -> List[Dict]:
+    """Fetch the rows of an EIA route.
+
+    Parameters
+    ----------
+    query : QueryParams
+        Query parameters.
+    api : str
+        API name.
+    route1 : str
+        First route.
+    route2 : Optional[str]
+        Second route.
+    facet_list : List[str]
+        Facets supported by the route.
+    api_key : Optional[str]
+        EIA API key.
+    local_facets : Sequence[str]
+        Facets that may be filtered locally instead of upstream, so that
+        concurrent fetchers of the same route share one superset request.
+        A fetcher that no other joins within `SHARE_WINDOW` sends them
+        upstream. Ignored when the query is paginated by the user with
+        `limit` or `offset`.
+    api_version : int
+        API version.
+
+    Returns
+    -------
+    List[Dict]
+        Data rows, served from the local warehouse when it holds the route.
+        Rows fetched from EIA are recorded in the vintage store, if any.
+        When the query sets `lean`, the descriptive name columns are dropped.
+
+    Raises
+    ------
+    ValueError
+        If the query does not match the cached metadata of the route.
+    """
+    query = await anormalize_query(
+        query, api, route1, route2, facet_list, api_key, api_version
+    )
+    route = make_cache_route(api, route1, route2)
+    rows = read_warehouse(query, route)
+    if rows is not None:
+        return make_lean(query, rows)
+
+    params, local_facets = make_route_params(query, facet_list, local_facets)
+    key = make_flight_key(route, params, api_key)
+    if make_local_filters(query, local_facets) and not await is_shared(key):
+        params, local_facets = make_route_params(query, facet_list, ())
+        key = make_flight_key(route, params, api_key)
+    params["api_key"] = api_key
+
+    response = await single_flight(
+        key,
+        lambda: amake_eia_paginated_request(
+            api=api,
+            route1=route1,
+            route2=route2,
+            api_version=api_version,
+            params=params,
+            **kwargs,
+        ),
+    )
+    process_warnings(response["response"])
+    await arecord_vintage(route, response)
+    return make_lean(
+        query,
+        filter_rows(
+            response["response"]["data"], make_local_filters(query, local_facets)
+        ),
+    )
+
+
+async def aiter_route(  # pylint: disable=unused-argument
+    query: QueryParams,
+    api: str,
+    route1: str,
+    route2: Optional[str],
+    facet_list: List[str],
+    api_key: Optional[str] = "",
+    local_facets: Sequence[str] = (),
+    api_version: int = 2,
+    batch_size: int = EIA_MAX_ROWS,
+    prefetch: int = 1,
+) -> AsyncIterator[List[Dict]]:
+    """Stream the rows of an EIA route in batches of `batch_size` rows.
+
+    The next page is downloaded while the current batch is consumed, so
+    memory stays bounded by the batch size and the prefetched pages. Streams
+    are not shared, so every filter is sent upstream and `local_facets` is
+    ignored. See `afetch_route` for the other parameters.
+    """
+    query = await anormalize_query(
+        query, api, route1, route2, facet_list, api_key, api_version
+    )
+    route = make_cache_route(api, route1, route2)
+    params, _ = make_route_params(query, facet_list, ())
+    params["api_key"] = api_key
+
+    batch: List[Dict] = []
+    async for page in aiter_eia_pages(
+        api=api,
+        route1=route1,
+        route2=route2,
+        api_version=api_version,
+        params=params,
+        prefetch=prefetch,
+    ):
+        await arecord_vintage(route, page)
+        batch.extend(make_lean(query, page["response"]["data"]))
+        while len(batch) >= batch_size:
+            yield batch[:batch_size]
+            batch = batch[batch_size:]
+    if batch:
+        yield batch
@@ -0,0 +1,317 @@
+"""Release-calendar-aware cache prefetching.
+
+EIA publishes each route on a known cadence. Right after a route is
+released, the scheduler refetches the requests that were cached for it,
+overwriting them in place, then the queries of its prefetch jobs, so that
+user requests after a release are served from the cache instead of all
+going to EIA at once.
+
+Usage: python -m openbb_energy.eia.utils.scheduler [--api-key KEY]
+[--jobs FILE] [--once]
+"""
+import argparse
+import asyncio
+import calendar
+import json
+import os
+import warnings
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Type, Union
+
+from ..natural_gas.registry import FETCHERS
+from .cache import get_cache
+from .helpers import amake_eia_request, make_cache_route, split_cache_route
+from .threads import to_thread
+
+_warn = warnings.warn
+
+
+class Release:
+    """Release cadence of a route. Times are UTC."""
+
+    def next_after(self, moment: datetime) -> datetime:
+        """Return the first release strictly after `moment`."""
+        raise NotImplementedError
+
+
+class WeeklyRelease(Release):
+    """Release on a weekday (Monday is 0) at a time of day."""
+
+    def __init__(self, weekday: int, hour: int, minute: int = 0):
+        """Initialize the release."""
+        self.weekday = weekday
+        self.hour = hour
+        self.minute = minute
+
+    def next_after(self, moment: datetime) -> datetime:
+        """Return the first release strictly after `moment`."""
+        release = moment.replace(
+            hour=self.hour, minute=self.minute, second=0, microsecond=0
+        ) + timedelta(days=(self.weekday - moment.weekday()) % 7)
+        return release if release > moment else release + timedelta(days=7)
+
+
+class MonthlyRelease(Release):
+    """Release on a day of the month at a time of day.
+
+    Days past the end of a month, and -1, mean the last day of the month.
+    """
+
+    def __init__(self, day: int, hour: int, minute: int = 0):
+        """Initialize the release."""
+        self.day = day
+        self.hour = hour
+        self.minute = minute
+
+    def _in_month(self, year: int, month: int) -> datetime:
+        last = calendar.monthrange(year, month)[1]
+        day = last if self.day < 0 else min(self.day, last)
+        return datetime(year, month, day, self.hour, self.minute)
+
+    def next_after(self, moment: datetime) -> datetime:
+        """Return the first release strictly after `moment`."""
+        release = self._in_month(moment.year, moment.month)
+        if release > moment:
+            return release
+        year, month = divmod(moment.year * 12 + moment.month, 12)
+        return self._in_month(year, month + 1)
+
+
+class AnnualRelease(Release):
+    """Release on a day of the year at a time of day."""
+
+    def __init__(self, month: int, day: int, hour: int, minute: int = 0):
+        """Initialize the release."""
+        self.month = month
+        self.day = day
+        self.hour = hour
+        self.minute = minute
+
+    def next_after(self, moment: datetime) -> datetime:
+        """Return the first release strictly after `moment`."""
+        release = datetime(moment.year, self.month, self.day, self.hour, self.minute)
+        if release > moment:
+            return release
+        return release.replace(year=moment.year + 1)
+
+
+# Approximate EIA release times in UTC, after the 10:30 ET publication in
+# both EST and EDT. The longest matching route prefix wins, as for TTLs.
+RELEASE_CALENDAR: Dict[str, Release] = {
+    # Natural Gas Monthly, at the end of each month.
+    "natural-gas": MonthlyRelease(day=-1, hour=16),
+    # Weekly Natural Gas Storage Report, Thursdays.
+    "natural-gas/stor/wkly": WeeklyRelease(weekday=3, hour=15, minute=30),
+    # Natural Gas Annual, at the end of September.
+    "natural-gas/cons/acct": AnnualRelease(month=9, day=30, hour=16),
+    "natural-gas/cons/pns": AnnualRelease(month=9, day=30, hour=16),
+    # Proved reserves, in December.
+    "natural-gas/enr": AnnualRelease(month=12, day=15, hour=16),
+}
+
+
+def get_release(route: str) -> Optional[Release]:
+    """Return the release cadence of a route, if the calendar knows it."""
+    parts = route.split("/")
+    for i in range(len(parts), 0, -1):
+        prefix = "/".join(parts[:i])
+        if prefix in RELEASE_CALENDAR:
+            return RELEASE_CALENDAR[prefix]
+    return None
+
+
+class PrefetchJob:
+    """A fetcher query refetched after each release of its route.
+
+    Parameters
+    ----------
+    fetcher : Type
+        Fetcher class with the `api`, `route1` and `route2` attributes.
+    params : Dict[str, Any]
+        Query parameters of the fetcher.
+    """
+
+    def __init__(self, fetcher: Type, params: Dict[str, Any]):
+        """Initialize the job."""
+        self.fetcher = fetcher
+        self.params = params
+        self.route = make_cache_route(fetcher.api, fetcher.route1, fetcher.route2)
+
+
+def load_jobs(path: Union[str, Path], fetchers: Dict[str, Type]) -> List[PrefetchJob]:
+    """Return the prefetch jobs listed in a JSON file.
+
+    Parameters
+    ----------
+    path : Union[str, Path]
+        JSON file with a list of jobs, e.g.
+        `[{"fetcher": "ConsumptionByEndUse", "params": {"frequency": "monthly"}}]`.
+    fetchers : Dict[str, Type]
+        Fetcher classes by name.
+
+    Returns
+    -------
+    List[PrefetchJob]
+        The jobs, in the order of the file.
+    """
+    jobs = []
+    for job in json.loads(Path(path).read_text(encoding="utf-8")):
+        if job["fetcher"] not in fetchers:
+            raise ValueError(f"Unknown fetcher {job['fetcher']} in {path}")
+        jobs.append(PrefetchJob(fetchers[job["fetcher"]], job.get("params", {})))
+    return jobs
+
+
+class PrefetchScheduler:
+    """Warm the response cache right after each route release.
+
+    Parameters
+    ----------
+    jobs : Sequence[PrefetchJob]
+        Queries to refetch on top of the cached requests. By default only
+        the requests already in the cache are refetched.
+    api_key : Optional[str]
+        EIA API key.
+    delay : float
+        Seconds to wait after a release before refetching.
+    """
+
+    def __init__(
+        self,
+        jobs: Sequence[PrefetchJob] = (),
+        api_key: Optional[str] = "",
+        delay: float = 60.0,
+    ):
+        """Initialize the scheduler."""
+        self.jobs = list(jobs)
+        self.api_key = api_key
+        self.delay = delay
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    def routes(self) -> List[str]:
+        """Return the routes of the jobs and of the cached requests with a known
+        release cadence."""
+        cache = get_cache()
+        routes = {job.route for job in self.jobs}
+        if cache is not None:
+            routes.update(cache.routes())
+        return sorted(route for route in routes if get_release(route))
+
+    def next_releases(self, moment: datetime) -> Dict[str, datetime]:
+        """Return the next release of each route after `moment`."""
+        return {
+            route: get_release(route).next_after(moment)  # type: ignore
+            for route in self.routes()
+        }
+
+    async def warm(self, route: str) -> int:
+        """Refetch the cached requests and the jobs of a route.
+
+        Every request that was cached before the release, e.g. filtered
+        queries and their pages, is refetched and overwritten in place, so
+        a failed request keeps its previous response. The jobs of the route
+        are refetched next, and are cache hits for the requests that were
+        just refreshed.
+
+        Returns the number of cached requests and jobs refetched successfully.
+        """
+        cache = get_cache()
+        queries: List[Dict[str, Any]] = []
+        if cache is not None:
+            queries = await to_thread(cache.queries, route)
+        api, route1, route2 = split_cache_route(route)
+        results: List[Any] = await asyncio.gather(
+            *(
+                amake_eia_request(
+                    api=api,
+                    route1=route1,
+                    route2=route2,
+                    api_version=2,
+                    params={**params, "api_key": self.api_key},
+                    refresh=True,
+                )
+                for params in queries
+            ),
+            return_exceptions=True,
+        )
+        failed = sum(isinstance(result, Exception) for result in results)
+        if failed:
+            _warn(f"Prefetch of {failed} cached requests of {route} failed.")
+        jobs = [job for job in self.jobs if job.route == route]
+        fetched = await asyncio.gather(
+            *(
+                job.fetcher.fetch_data(job.params, {"eia_api_key": self.api_key})
+                for job in jobs
+            ),
+            return_exceptions=True,
+        )
+        for job, result in zip(jobs, fetched):
+            if isinstance(result, Exception):
+                _warn(f"Prefetch of {job.route} {job.params} failed: {result}")
+        results.extend(fetched)
+        return sum(not isinstance(result, Exception) for result in results)
+
+    async def warm_all(self) -> Dict[str, int]:
+        """Warm every route now."""
+        return {route: await self.warm(route) for route in self.routes()}
+
+    async def run(self) -> None:
+        """Warm each route after its releases, until cancelled."""
+        while True:
+            now = datetime.utcnow()
+            releases = await to_thread(self.next_releases, now)
+            if not releases:
+                return
+            due = min(releases.values())
+            wake = due + timedelta(seconds=self.delay)
+            await asyncio.sleep(max(0.0, (wake - now).total_seconds()))
+            for route, release in releases.items():
+                if release == due:
+                    await self.warm(route)
+
+    def start(self) -> "asyncio.Task[None]":
+        """Run the scheduler in the background of the running event loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self.run())
+        return self._task
+
+    def stop(self) -> None:
+        """Stop the background scheduler."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+def main() -> None:
+    """Run the prefetch scheduler from the command line."""
+    parser = argparse.ArgumentParser(description="Warm the EIA cache on release.")
+    parser.add_argument(
+        "--api-key",
+        default=os.environ.get("EIA_API_KEY", ""),
+        help="EIA API key. Defaults to EIA_API_KEY.",
+    )
+    parser.add_argument(
+        "--jobs",
+        default=os.environ.get("OPENBB_EIA_PREFETCH_JOBS"),
+        help="JSON file of queries to prefetch on top of the cached requests."
+        + " Defaults to OPENBB_EIA_PREFETCH_JOBS.",
+    )
+    parser.add_argument(
+        "--once", action="store_true", help="Warm every route now and exit."
+    )
+    args = parser.parse_args()
+
+    jobs = load_jobs(args.jobs, FETCHERS) if args.jobs else []
+    scheduler = PrefetchScheduler(jobs, api_key=args.api_key)
+    if args.once:
+        for route, warmed in asyncio.run(scheduler.warm_all()).items():
+            print(f"{route}: {warmed} requests warmed")
+        return
+    for route, release in sorted(scheduler.next_releases(datetime.utcnow()).items()):
+        print(f"{route}: next release {release:%Y-%m-%d %H:%M} UTC")
+    asyncio.run(scheduler.run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""Sync the local warehouse with the routes of the provider.
+
+Usage: python -m openbb_energy.eia.utils.sync --root PATH [--api-key KEY]
+"""
+import argparse
+import asyncio
+import os
+
+from openbb_energy.eia_provider import provider
+
+from .warehouse import ParquetWarehouse, sync_provider_routes
+
+
+def main() -> None:
+    """Sync the warehouse from the command line."""
+    parser = argparse.ArgumentParser(description="Sync the local EIA warehouse.")
+    parser.add_argument(
+        "--root",
+        default=os.environ.get("OPENBB_EIA_WAREHOUSE"),
+        help="Warehouse directory. Defaults to OPENBB_EIA_WAREHOUSE.",
+    )
+    parser.add_argument(
+        "--api-key",
+        default=os.environ.get("EIA_API_KEY", ""),
+        help="EIA API key. Defaults to EIA_API_KEY.",
+    )
+    args = parser.parse_args()
+    if not args.root:
+        parser.error("--root or OPENBB_EIA_WAREHOUSE is required")
+
+    written = asyncio.run(
+        sync_provider_routes(
+            ParquetWarehouse(args.root),
+            provider.fetcher_dict.values(),
+            api_key=args.api_key,
+        )
+    )
+    for route, rows in written.items():
+        print(f"{route}: {rows} new rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,484 @@
+"""Tracing and metrics of the EIA provider.
+
+Every stage of the fetcher pipeline runs in a span. Spans carry
+OpenTelemetry-style ids and attributes, nest through `contextvars` (so they
+follow asyncio tasks), are kept in a bounded buffer and are passed to the
+registered exporters. With `OPENBB_EIA_OTEL=1` and `opentelemetry-api`
+installed, every span is also opened as an OpenTelemetry span.
+
+Span durations, HTTP statuses, bytes and rows are aggregated in a metrics
+registry rendered in the Prometheus text exposition format.
+"""
+import asyncio
+import functools
+import os
+import random
+import threading
+import time
+import warnings
+from bisect import bisect_left
+from collections import deque
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+_warn = warnings.warn
+
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+F = TypeVar("F", bound=Callable[..., Any])
+LabelValues = Tuple[str, ...]
+Sample = Tuple[str, Dict[str, str], float]
+
+
+class Counter:
+    """Monotonic counter with labels."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...]):
+        """Initialize the counter."""
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        """Increment the counter of a label set."""
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def get(self, **labels: Any) -> float:
+        """Return the value of a label set."""
+        return self._values.get(
+            tuple(str(labels.get(name, "")) for name in self.labelnames), 0.0
+        )
+
+    def samples(self) -> List[Sample]:
+        """Return the (name, labels, value) samples."""
+        with self._lock:
+            return [
+                (self.name, dict(zip(self.labelnames, key)), value)
+                for key, value in self._values.items()
+            ]
+
+
+class Histogram:
+    """Histogram with cumulative buckets and labels."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...],
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        """Initialize the histogram."""
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # label values -> (bucket counts, sum, count)
+        self._values: Dict[LabelValues, Tuple[List[int], float, int]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: Any) -> None:
+        """Record an observation of a label set."""
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            counts, total, observations = self._values.get(
+                key, ([0] * len(self.buckets), 0.0, 0)
+            )
+            index = bisect_left(self.buckets, value)
+            if index < len(counts):
+                counts[index] += 1
+            self._values[key] = (counts, total + value, observations + 1)
+
+    def samples(self) -> List[Sample]:
+        """Return the (name, labels, value) samples."""
+        samples: List[Sample] = []
+        with self._lock:
+            for key, (counts, total, observations) in self._values.items():
+                labels = dict(zip(self.labelnames, key))
+                cumulative = 0
+                bucket_name = f"{self.name}_bucket"
+                for bound, bucket in zip(self.buckets, counts):
+                    cumulative += bucket
+                    bucket_labels = {**labels, "le": repr(bound)}
+                    samples.append((bucket_name, bucket_labels, cumulative))
+                samples.append((bucket_name, {**labels, "le": "+Inf"}, observations))
+                samples.append((f"{self.name}_sum", labels, total))
+                samples.append((f"{self.name}_count", labels, observations))
+        return samples
+
+
+class MetricsRegistry:
+    """Registry of counters and histograms."""
+
+    def __init__(self):
+        """Initialize the registry."""
+        self._metrics: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def counter(
+        self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()
+    ) -> Counter:
+        """Return the counter of a name, creating it on first use."""
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = Counter(name, documentation, labelnames)
+            return self._metrics[name]
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """Return the histogram of a name, creating it on first use."""
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = Histogram(
+                    name, documentation, labelnames, buckets
+                )
+            return self._metrics[name]
+
+    def render(self) -> str:
+        """Render the metrics in the Prometheus text exposition format."""
+        lines = []
+        for metric in list(self._metrics.values()):
+            kind = "counter" if isinstance(metric, Counter) else "histogram"
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {kind}")
+            for name, labels, value in metric.samples():
+                pairs = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+                sample = f"{name}{{{pairs}}}" if pairs else name
+                lines.append(f"{sample} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    """Escape a Prometheus label value."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Span:
+    """Timed stage of the pipeline, shaped like an OpenTelemetry span."""
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: int,
+        parent_id: Optional[int],
+        attributes: Dict[str, Any],
+    ):
+        """Initialize the span."""
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = random.getrandbits(64)
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.status = "OK"
+        self.start = time.time_ns()
+        self.end: Optional[int] = None
+        self._otel: Any = None
+
+    def set(self, key: str, value: Any) -> None:
+        """Set an attribute."""
+        self.attributes[key] = value
+        if self._otel is not None:
+            self._otel.set_attribute(key, value)
+
+    @property
+    def duration(self) -> float:
+        """Return the duration in seconds, up to now if the span is open."""
+        return ((self.end or time.time_ns()) - self.start) / 1e9
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the span in the OpenTelemetry JSON shape."""
+        return {
+            "name": self.name,
+            "traceId": f"{self.trace_id:032x}",
+            "spanId": f"{self.span_id:016x}",
+            "parentSpanId": f"{self.parent_id:016x}" if self.parent_id else "",
+            "startTimeUnixNano": self.start,
+            "endTimeUnixNano": self.end,
+            "attributes": dict(self.attributes),
+            "status": self.status,
+        }
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("eia_span", default=None)
+
+
+class Tracer:
+    """Create spans and record their durations in the metrics registry.
+
+    Parameters
+    ----------
+    metrics : MetricsRegistry
+        Registry of the stage durations.
+    buffer : int
+        Number of finished spans kept in `recent`.
+    otel : bool
+        Also open every span as an OpenTelemetry span.
+    """
+
+    def __init__(
+        self, metrics: MetricsRegistry, buffer: int = 1000, otel: bool = False
+    ):
+        """Initialize the tracer."""
+        self.metrics = metrics
+        self.recent: Deque[Span] = deque(maxlen=buffer)
+        self.exporters: List[Callable[[Span], None]] = []
+        self._durations = metrics.histogram(
+            "eia_stage_duration_seconds",
+            "Duration of the EIA provider pipeline stages.",
+            ("stage", "model"),
+        )
+        self._otel_tracer: Any = None
+        if otel:
+            try:
+                # pylint: disable=import-outside-toplevel
+                from opentelemetry import trace
+
+                self._otel_tracer = trace.get_tracer("openbb_energy.eia")
+            except ImportError:
+                pass
+
+    def add_exporter(self, exporter: Callable[[Span], None]) -> None:
+        """Call `exporter` with every finished span."""
+        self.exporters.append(exporter)
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Span]:
+        """Time a block as a child span of the current span."""
+        parent = _current_span.get()
+        opened = Span(
+            name,
+            parent.trace_id if parent else random.getrandbits(128),
+            parent.span_id if parent else None,
+            attributes,
+        )
+        if "model" not in attributes and parent is not None:
+            opened.attributes["model"] = parent.attributes.get("model", "")
+        token = _current_span.set(opened)
+        try:
+            with ExitStack() as stack:
+                if self._otel_tracer is not None:
+                    # pylint: disable=protected-access
+                    opened._otel = stack.enter_context(
+                        self._otel_tracer.start_as_current_span(
+                            name, attributes=attributes
+                        )
+                    )
+                yield opened
+        except BaseException:
+            opened.status = "ERROR"
+            raise
+        finally:
+            opened.end = time.time_ns()
+            _current_span.reset(token)
+            self._durations.observe(
+                opened.duration, stage=name, model=opened.attributes.get("model", "")
+            )
+            self.recent.append(opened)
+            self._export(opened)
+
+    def _export(self, finished: Span) -> None:
+        """Pass a finished span to the exporters.
+
+        A failing exporter is skipped with a warning, so that it can neither
+        hide the error of the traced block nor fail a successful one.
+        """
+        for exporter in self.exporters:
+            try:
+                exporter(finished)
+            except Exception as e:  # pylint: disable=broad-except
+                _warn(f"Span exporter {exporter!r} failed: {e!r}")
+
+
+def current_span() -> Optional[Span]:
+    """Return the span of the current context, if any."""
+    return _current_span.get()
+
+
+_metrics: Optional[MetricsRegistry] = None
+_tracer: Optional[Tracer] = None
+
+
+def get_metrics() -> MetricsRegistry:
+    """Return the shared metrics registry."""
+    global _metrics  # pylint: disable=global-statement
+    if _metrics is None:
+        _metrics = MetricsRegistry()
+    return _metrics
+
+
+def get_tracer() -> Tracer:
+    """Return the shared tracer.
+
+    Set `OPENBB_EIA_OTEL=1` to also emit OpenTelemetry spans.
+    """
+    global _tracer  # pylint: disable=global-statement
+    if _tracer is None:
+        _tracer = Tracer(
+            get_metrics(),
+            otel=os.environ.get("OPENBB_EIA_OTEL", "0").lower() in ("1", "true", "yes"),
+        )
+    return _tracer
+
+
+def span(name: str, **attributes: Any):
+    """Time a block with the shared tracer, see `Tracer.span`."""
+    return get_tracer().span(name, **attributes)
+
+
+def traced(name: str, rows: bool = False) -> Callable[[F], F]:
+    """Decorate a function, sync or async, to run it in a span.
+
+    Parameters
+    ----------
+    name : str
+        Name of the span.
+    rows : bool
+        Set the length of the result as the `rows` attribute of the span.
+    """
+
+    def decorator(func: F) -> F:
+        if asyncio.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                with span(name) as current:
+                    result = await func(*args, **kwargs)
+                    if rows:
+                        current.set("rows", len(result))
+                return result
+
+            setattr(async_wrapper, "span_name", name)
+            return async_wrapper  # type: ignore
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with span(name) as current:
+                result = func(*args, **kwargs)
+                if rows:
+                    current.set("rows", len(result))
+            return result
+
+        setattr(wrapper, "span_name", name)
+        return wrapper  # type: ignore
+
+    return decorator
+
+
+def is_traced(func: Callable[..., Any]) -> bool:
+    """Return whether a function is already decorated with `traced`."""
+    return hasattr(func, "span_name")
+
+
+def count(name: str, documentation: str, amount: float = 1.0, **labels: Any) -> None:
+    """Increment a counter of the shared registry.
+
+    The label names of a metric are fixed by its first use.
+    """
+    get_metrics().counter(name, documentation, tuple(labels)).inc(amount, **labels)
+
+
+def observe(name: str, documentation: str, value: float, **labels: Any) -> None:
+    """Record an observation in a histogram of the shared registry.
+
+    The label names of a metric are fixed by its first use.
+    """
+    get_metrics().histogram(name, documentation, tuple(labels)).observe(value, **labels)
+
+
+def record_response(
+    host: str, status: Any, size: int, ttfb: Optional[float] = None
+) -> None:
+    """Count an HTTP response and its bytes, and observe its time to headers.
+
+    The time to headers is mostly EIA server time, the rest of the `http`
+    span is the body transfer.
+    """
+    count(
+        "eia_http_responses_total",
+        "EIA HTTP responses by host and status.",
+        host=host,
+        status=status,
+    )
+    count(
+        "eia_http_response_bytes_total",
+        "Bytes of EIA HTTP response bodies.",
+        size,
+        host=host,
+    )
+    if ttfb is not None:
+        observe(
+            "eia_http_ttfb_seconds",
+            "Time from EIA HTTP request to response headers.",
+            ttfb,
+            host=host,
+        )
+
+
+def record_cache(hit: bool) -> None:
+    """Count a response cache lookup."""
+    count(
+        "eia_cache_lookups_total",
+        "EIA response cache lookups by result.",
+        result="hit" if hit else "miss",
+    )
+
+
+def serve_metrics(
+    host: str = "127.0.0.1", port: int = 9464
+) -> Tuple[ThreadingHTTPServer, str]:
+    """Serve the shared registry on `/metrics` in a background thread."""
+
+    class Handler(BaseHTTPRequestHandler):
+        """Serve the Prometheus text format."""
+
+        def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+            """Silence the request log."""
+
+        def do_GET(self):  # pylint: disable=invalid-name
+            """Serve the metrics."""
+            payload = get_metrics().render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/metrics"
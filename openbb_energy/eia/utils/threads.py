@@ -0,0 +1,19 @@
+"""Offloading of blocking calls from the event loop."""
+import asyncio
+import contextvars
+import functools
+from typing import Any, Callable, TypeVar
+
+T = TypeVar("T")
+
+
+async def to_thread(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking call in the default executor and await its result.
+
+    Same as `asyncio.to_thread`, which requires Python 3.9. The context
+    variables, e.g. the current trace span, are carried over to the thread.
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    call = functools.partial(context.run, func, *args, **kwargs)
+    return await loop.run_in_executor(None, call)
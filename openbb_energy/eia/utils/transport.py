@@ -0,0 +1,160 @@
+"""Resilience primitives of the EIA HTTP transport."""
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+BASE_URL = "https://api.eia.gov"
+RETRYABLE_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+
+
+def get_base_url() -> str:
+    """Return the base URL of the EIA API.
+
+    It can be overridden with `OPENBB_EIA_BASE_URL`, e.g. to point at a local
+    stand-in server.
+    """
+    return os.environ.get("OPENBB_EIA_BASE_URL", BASE_URL).rstrip("/")
+
+
+class EIAError(Exception):
+    """Error returned by the EIA API."""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        """Initialize the error."""
+        super().__init__(message)
+        self.status = status
+
+
+class CircuitOpenError(EIAError):
+    """Raised when requests to a host are short-circuited."""
+
+
+def make_error(status: int, body: Optional[Dict]) -> EIAError:
+    """Make an error from a failed response."""
+    detail = ""
+    if isinstance(body, dict):
+        detail = str(body.get("error") or body.get("message") or "")
+    return EIAError(f"EIA API returned {status}. {detail}".strip(), status=status)
+
+
+class RetryPolicy:
+    """Jittered exponential backoff.
+
+    Parameters
+    ----------
+    attempts : int
+        Maximum number of attempts, including the first one.
+    base_delay : float
+        Delay before the first retry, in seconds, before jitter.
+    max_delay : float
+        Maximum delay between attempts, in seconds.
+    statuses : frozenset
+        HTTP statuses that are retried.
+    """
+
+    def __init__(
+        self,
+        attempts: int = 4,
+        base_delay: float = 0.5,
+        max_delay: float = 8.0,
+        statuses: frozenset = RETRYABLE_STATUSES,
+    ):
+        """Initialize the policy."""
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.statuses = statuses
+
+    def delay(self, attempt: int) -> float:
+        """Return the full-jitter delay after the given failed attempt (0-based)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+    def is_retryable(self, status: int) -> bool:
+        """Return whether a status is retried."""
+        return status in self.statuses
+
+
+class CircuitBreaker:
+    """Per-host circuit breaker.
+
+    After `failure_threshold` consecutive failures the circuit of a host
+    opens and requests fail fast. After `reset_timeout` seconds one trial
+    request is let through; its outcome closes or reopens the circuit.
+
+    Parameters
+    ----------
+    failure_threshold : int
+        Consecutive failures that open the circuit.
+    reset_timeout : float
+        Seconds before a trial request is allowed.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """Initialize the breaker."""
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        # host -> (consecutive failures, time the circuit opened)
+        self._hosts: Dict[str, Tuple[int, Optional[float]]] = {}
+
+    def allow(self, host: str) -> bool:
+        """Return whether a request to the host may go out."""
+        with self._lock:
+            failures, opened = self._hosts.get(host, (0, None))
+            if opened is None:
+                return True
+            if time.monotonic() - opened >= self.reset_timeout:
+                # Half-open: let one trial through and rearm the timer.
+                self._hosts[host] = (failures, time.monotonic())
+                return True
+            return False
+
+    def record_success(self, host: str) -> None:
+        """Close the circuit of the host."""
+        with self._lock:
+            self._hosts.pop(host, None)
+
+    def record_failure(self, host: str) -> None:
+        """Count a failure, opening the circuit at the threshold."""
+        with self._lock:
+            failures, opened = self._hosts.get(host, (0, None))
+            failures += 1
+            if failures >= self.failure_threshold and opened is None:
+                opened = time.monotonic()
+            self._hosts[host] = (failures, opened)
+
+    def is_open(self, host: str) -> bool:
+        """Return whether the circuit of the host is open."""
+        with self._lock:
+            return self._hosts.get(host, (0, None))[1] is not None
+
+
+class LatencyTracker:
+    """Rolling window of request latencies.
+
+    Parameters
+    ----------
+    window : int
+        Number of recent latencies kept.
+    min_samples : int
+        Samples needed before percentiles are reported.
+    """
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        """Initialize the tracker."""
+        self.min_samples = min_samples
+        self._latencies: Deque[float] = deque(maxlen=window)
+
+    def record(self, latency: float) -> None:
+        """Record a latency, in seconds."""
+        self._latencies.append(latency)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Return the `q` percentile (0 to 1), or None without enough samples."""
+        if len(self._latencies) < self.min_samples:
+            return None
+        latencies = sorted(self._latencies)
+        return latencies[min(len(latencies) - 1, int(q * len(latencies)))]
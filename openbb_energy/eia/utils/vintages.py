@@ -0,0 +1,281 @@
+"""Vintage store of EIA observations.
+
+EIA revises preliminary values. Every fetched row can be recorded as an
+observation of (route, series, period) at the time it was seen, its
+vintage. An observation is only stored when its value differs from the
+latest stored vintage, so repeated fetches of unrevised data add nothing.
+
+The primary key is ordered (route, series, period, vintage), so "as of"
+queries and vintage diffs run as single SQL statements over the index.
+
+Responses are stamped with the time they were retrieved from EIA under
+`RETRIEVED`, which is cached along with them, so rows served from the
+response cache are recorded with the vintage they were first seen.
+"""
+import os
+import sqlite3
+import threading
+from datetime import date, datetime, time, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from .threads import to_thread
+
+VintageTime = Union[str, date, datetime]
+
+# Response key of the time a response was retrieved from EIA.
+RETRIEVED = "retrieved"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS vintages (
+    route TEXT NOT NULL,
+    series TEXT NOT NULL,
+    period TEXT NOT NULL,
+    vintage TEXT NOT NULL,
+    value,
+    PRIMARY KEY (route, series, period, vintage)
+) WITHOUT ROWID
+"""
+
+# The latest vintage of each observation at or before a vintage time.
+AS_OF = """
+SELECT series, period, value, MAX(vintage) AS vintage
+FROM vintages
+WHERE route = ? AND vintage <= ?{filters}
+GROUP BY series, period
+"""
+
+
+def make_vintage(when: Optional[VintageTime] = None) -> str:
+    """Return the vintage string of a time, the end of the day for dates.
+
+    Vintages are naive UTC ISO timestamps, so they sort as strings. Times
+    with a time zone are converted to UTC, naive times are taken as UTC.
+    """
+    if when is None:
+        return datetime.utcnow().isoformat(timespec="seconds")
+    if isinstance(when, str):
+        when = (
+            date.fromisoformat(when)
+            if len(when) == 10
+            else datetime.fromisoformat(
+                when[:-1] + "+00:00" if when.endswith("Z") else when
+            )
+        )
+    if not isinstance(when, datetime):
+        when = datetime.combine(when, time.max)
+    if when.tzinfo is not None:
+        when = when.astimezone(timezone.utc).replace(tzinfo=None)
+    return when.isoformat(timespec="seconds")
+
+
+def get_retrieved(response: Dict) -> Optional[str]:
+    """Return the vintage a response was retrieved at, if it was stamped."""
+    return response.get(RETRIEVED)
+
+
+def stamp_retrieved(response: Dict) -> Dict:
+    """Stamp a response fetched from EIA with the current vintage."""
+    response[RETRIEVED] = make_vintage()
+    return response
+
+
+def earliest_retrieved(responses: Sequence[Dict]) -> Optional[str]:
+    """Return the earliest retrieval vintage of the responses of a query."""
+    stamps = [r[RETRIEVED] for r in responses if r.get(RETRIEVED) is not None]
+    return min(stamps) if stamps else None
+
+
+class VintageStore:
+    """SQLite store of observation vintages.
+
+    The blocking SQLite calls have async counterparts, e.g. `arecord`, which
+    run them in a worker thread.
+
+    Parameters
+    ----------
+    path : Union[str, Path]
+        Path of the SQLite database.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        """Initialize the store."""
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            str(self.path), check_same_thread=False, isolation_level=None
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(SCHEMA)
+
+    def record(
+        self,
+        route: str,
+        rows: List[Dict[str, Any]],
+        vintage: Optional[VintageTime] = None,
+        series_column: str = "series",
+    ) -> int:
+        """Record the rows of a fetch as observations of `vintage`.
+
+        Returns the number of new or revised observations stored.
+        """
+        stamp = make_vintage(vintage)
+        incoming = [
+            (route, str(row[series_column]), str(row["period"]), stamp, row["value"])
+            for row in rows
+            if row.get(series_column) is not None and row.get("period") is not None
+        ]
+        if not incoming:
+            return 0
+        with self._lock:
+            self._connection.execute("BEGIN")
+            try:
+                self._connection.execute(
+                    "CREATE TEMP TABLE IF NOT EXISTS incoming"
+                    + " (route, series, period, vintage, value)"
+                )
+                self._connection.execute("DELETE FROM incoming")
+                self._connection.executemany(
+                    "INSERT INTO incoming VALUES (?, ?, ?, ?, ?)", incoming
+                )
+                cursor = self._connection.execute(
+                    """
+                    INSERT OR IGNORE INTO vintages
+                    SELECT route, series, period, vintage, value FROM incoming AS i
+                    WHERE i.value IS NOT (
+                        SELECT v.value FROM vintages AS v
+                        WHERE v.route = i.route AND v.series = i.series
+                        AND v.period = i.period AND v.vintage <= i.vintage
+                        ORDER BY v.vintage DESC LIMIT 1
+                    )
+                    OR NOT EXISTS (
+                        SELECT 1 FROM vintages AS v
+                        WHERE v.route = i.route AND v.series = i.series
+                        AND v.period = i.period AND v.vintage <= i.vintage
+                    )
+                    """
+                )
+                self._connection.execute("COMMIT")
+            except Exception:
+                self._connection.execute("ROLLBACK")
+                raise
+        return cursor.rowcount
+
+    async def arecord(
+        self,
+        route: str,
+        rows: List[Dict[str, Any]],
+        vintage: Optional[VintageTime] = None,
+        series_column: str = "series",
+    ) -> int:
+        """Record the rows of a fetch without blocking, see `record`."""
+        return await to_thread(self.record, route, rows, vintage, series_column)
+
+    @staticmethod
+    def _filters(
+        series: Optional[Sequence[str]],
+        start: Optional[str],
+        end: Optional[str],
+    ) -> Tuple[str, List[Any]]:
+        """Return the SQL conditions and arguments of the row filters."""
+        sql = ""
+        args: List[Any] = []
+        if series:
+            sql += f" AND series IN ({', '.join('?' * len(series))})"
+            args.extend(series)
+        if start:
+            sql += " AND period >= ?"
+            args.append(start)
+        if end:
+            sql += " AND period <= ?"
+            args.append(end)
+        return sql, args
+
+    def as_of(
+        self,
+        route: str,
+        when: VintageTime,
+        series: Optional[Sequence[str]] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Return the observations of a route as they were known at `when`.
+
+        Returns
+        -------
+        List[Dict[str, Any]]
+            Rows with `series`, `period`, `value` and the `vintage` the value
+            was first seen, sorted by series and period.
+        """
+        filters, args = self._filters(series, start, end)
+        with self._lock:
+            cursor = self._connection.execute(
+                AS_OF.format(filters=filters) + " ORDER BY series, period",
+                [route, make_vintage(when), *args],
+            )
+            rows = cursor.fetchall()
+        return [
+            {"series": s, "period": p, "value": v, "vintage": t} for s, p, v, t in rows
+        ]
+
+    def diff(
+        self,
+        route: str,
+        before: VintageTime,
+        after: VintageTime,
+        series: Optional[Sequence[str]] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Return the observations that changed between two vintage times.
+
+        Returns
+        -------
+        List[Dict[str, Any]]
+            Rows with `series`, `period`, the `before` and `after` values
+            (`before` is None for new observations) and the `vintage` of the
+            `after` value.
+        """
+        filters, args = self._filters(series, start, end)
+        sql = f"""
+            WITH old AS ({AS_OF.format(filters=filters)}),
+                 new AS ({AS_OF.format(filters=filters)})
+            SELECT new.series, new.period, old.value, new.value, new.vintage
+            FROM new LEFT JOIN old
+                ON old.series = new.series AND old.period = new.period
+            WHERE old.vintage IS NULL OR old.value IS NOT new.value
+            ORDER BY new.series, new.period
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                sql,
+                [route, make_vintage(before), *args, route, make_vintage(after), *args],
+            ).fetchall()
+        return [
+            {"series": s, "period": p, "before": b, "after": a, "vintage": t}
+            for s, p, b, a, t in rows
+        ]
+
+    def vintages(self, route: str) -> List[str]:
+        """Return the vintages recorded for a route, oldest first."""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT DISTINCT vintage FROM vintages WHERE route = ? ORDER BY 1",
+                (route,),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+
+_vintage_store: Optional[VintageStore] = None
+
+
+def get_vintage_store() -> Optional[VintageStore]:
+    """Return the store set by `OPENBB_EIA_VINTAGES`, or None."""
+    global _vintage_store  # pylint: disable=global-statement
+    path = os.environ.get("OPENBB_EIA_VINTAGES")
+    if not path:
+        return None
+    if _vintage_store is None or _vintage_store.path != Path(path):
+        _vintage_store = VintageStore(path)
+    return _vintage_store
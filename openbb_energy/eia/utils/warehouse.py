@@ -0,0 +1,397 @@
+"""Local Parquet warehouse of EIA routes.
+
+Rows are stored as Parquet files partitioned by route, frequency and area
+(`route=natural-gas_cons_sum/frequency=monthly/duoarea=SCA/part-*.parquet`)
+with the EIA column names. The manifest keeps the last stored period of
+each series of each area partition. `sync` requests the periods from the
+last stored ones, less a revision window, and `write` appends the new rows
+and rewrites the partitions where stored values were revised.
+
+See `openbb_energy.eia.utils.sync` to sync the routes of the provider from
+the command line.
+"""
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .columnar import coerce_values
+from .helpers import aiter_eia_pages, make_cache_route
+
+PARTITION_COLUMN = "duoarea"
+SERIES_COLUMN = "series"
+FLAG_COLUMN = "value-flag"
+# Columns identifying a row within an area partition.
+KEY_COLUMNS = ["period", "product", "process", SERIES_COLUMN]
+
+# Periods requested again by `sync` to pick up EIA revisions, by frequency.
+REVISION_WINDOWS = {
+    "annual": 1,
+    "quarterly": 2,
+    "monthly": 6,
+    "weekly": 8,
+    "daily": 30,
+}
+
+
+def _require_pyarrow() -> None:
+    """Raise an informative error if pyarrow is not installed."""
+    try:
+        # pylint: disable=import-outside-toplevel,unused-import
+        import pyarrow  # noqa: F401
+    except ImportError as e:
+        raise ImportError(
+            "pyarrow is required for the warehouse."
+            + " Install it with `pip install pyarrow`."
+        ) from e
+
+
+def shift_period(period: str, frequency: str, periods: int) -> str:
+    """Return an EIA period moved by a number of periods of its frequency."""
+    if frequency == "quarterly":
+        shifted = pd.Period(period.replace("-", ""), freq="Q") + periods
+        return f"{shifted.year}-Q{shifted.quarter}"
+    if frequency in ("weekly", "daily"):
+        days = periods * 7 if frequency == "weekly" else periods
+        return str(pd.Period(period, freq="D") + days)
+    return str(pd.Period(period, freq="Y" if frequency == "annual" else "M") + periods)
+
+
+def _same(left: pd.Series, right: pd.Series) -> np.ndarray:
+    """Return where two columns are equal, missing values included."""
+    return ((left == right) | (left.isna() & right.isna())).to_numpy(dtype=bool)
+
+
+class ParquetWarehouse:
+    """Partitioned Parquet mirror of EIA routes.
+
+    Parameters
+    ----------
+    root : Union[str, Path]
+        Root directory of the warehouse.
+    """
+
+    def __init__(self, root: Union[str, Path]):
+        """Initialize the warehouse."""
+        _require_pyarrow()
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._manifest_path = self.root / "manifest.json"
+        manifest = (
+            json.loads(self._manifest_path.read_text())
+            if self._manifest_path.exists()
+            else {}
+        )
+        # Manifests written before the series watermarks hold one period per
+        # area, which stands for all its series.
+        self._manifest: Dict[str, Dict[str, Dict[str, Dict[str, str]]]] = {
+            route: {
+                frequency: {
+                    area: {"": mark} if isinstance(mark, str) else mark
+                    for area, mark in marks.items()
+                }
+                for frequency, marks in frequencies.items()
+            }
+            for route, frequencies in manifest.items()
+        }
+
+    def dataset_path(self, route: str, frequency: str) -> Path:
+        """Return the directory of a route and frequency."""
+        return self.root / f"route={route.replace('/', '_')}" / f"frequency={frequency}"
+
+    def watermarks(self, route: str, frequency: str) -> Dict[str, Dict[str, str]]:
+        """Return the last stored period of each series, by area partition."""
+        marks = self._manifest.get(route, {}).get(frequency, {})
+        return {area: dict(series) for area, series in marks.items()}
+
+    def last_periods(self, route: str, frequency: str) -> Dict[str, str]:
+        """Return the last stored period of each area partition."""
+        return {
+            area: max(series.values())
+            for area, series in self.watermarks(route, frequency).items()
+            if series
+        }
+
+    def has(self, route: str, frequency: str) -> bool:
+        """Return whether the warehouse holds a route and frequency."""
+        return bool(self.last_periods(route, frequency))
+
+    def clear(self, route: str, frequency: Optional[str] = None) -> None:
+        """Remove a route, or one of its frequencies, from the warehouse."""
+        frequencies = [frequency] if frequency else list(self._manifest.get(route, {}))
+        for name in frequencies:
+            shutil.rmtree(self.dataset_path(route, name), ignore_errors=True)
+            self._manifest.get(route, {}).pop(name, None)
+        if not self._manifest.get(route):
+            self._manifest.pop(route, None)
+        self._manifest_path.write_text(json.dumps(self._manifest, indent=2))
+
+    def replace(self, route: str, frequency: str, source: "ParquetWarehouse") -> None:
+        """Replace a route and frequency with its rows in another warehouse.
+
+        The directory of `source` is moved into place, so both warehouses
+        must be on the same file system, e.g. `source` staged under `root`.
+        The previous rows are removed once the new ones are in place.
+        """
+        target = self.dataset_path(route, frequency)
+        staged = source.dataset_path(route, frequency)
+        previous = source.root / f"previous-{time.time_ns()}"
+        if target.exists():
+            target.rename(previous)
+        if staged.exists():
+            target.parent.mkdir(parents=True, exist_ok=True)
+            staged.rename(target)
+        marks = source.watermarks(route, frequency)
+        if marks:
+            self._manifest.setdefault(route, {})[frequency] = marks
+        else:
+            self._manifest.get(route, {}).pop(frequency, None)
+            if not self._manifest.get(route):
+                self._manifest.pop(route, None)
+        self._manifest_path.write_text(json.dumps(self._manifest, indent=2))
+        shutil.rmtree(previous, ignore_errors=True)
+
+    def write(
+        self,
+        route: str,
+        frequency: str,
+        rows: Union[List[Dict[str, Any]], pd.DataFrame],
+        incremental: bool = True,
+    ) -> int:
+        """Upsert rows into their area partitions.
+
+        Rows newer than the last stored period of their series are appended.
+        Rows at or before it are compared with the stored ones: unchanged
+        rows are skipped, and a partition with revised values is rewritten
+        with the incoming rows replacing the stored ones.
+
+        With `incremental=False` every row is appended without comparison,
+        e.g. to load a route series by series after `clear`.
+
+        Returns the number of new or revised rows written.
+        """
+        if len(rows) == 0:
+            return 0
+        df = (
+            rows.copy(deep=False)
+            if isinstance(rows, pd.DataFrame)
+            else pd.DataFrame(rows)
+        )
+        df["period"] = df["period"].astype(str)
+        df["value"], flags = coerce_values(df["value"].to_numpy(dtype=object))
+        df[FLAG_COLUMN] = np.asarray(flags, dtype=object)
+
+        marks = self.watermarks(route, frequency)
+        stamp = time.time_ns()
+        written = 0
+        for area, group in df.groupby(PARTITION_COLUMN, sort=False):
+            path = self.dataset_path(route, frequency) / f"{PARTITION_COLUMN}={area}"
+            path.mkdir(parents=True, exist_ok=True)
+            group = group.drop(columns=[PARTITION_COLUMN])
+            series_marks = marks.setdefault(str(area), {})
+            changed = len(group)
+            replaced: List[Path] = []
+            if incremental:
+                upsert, changed, replaced = self._upsert(path, group, series_marks)
+                if upsert is None:
+                    continue
+                group = upsert
+            group.to_parquet(path / f"part-{stamp}.parquet", index=False)
+            # The rewritten partition replaces its previous files.
+            for part in replaced:
+                part.unlink()
+            written += changed
+            for series, period in group.groupby(SERIES_COLUMN)["period"].max().items():
+                series_marks[str(series)] = max(
+                    series_marks.get(str(series), ""), period
+                )
+
+        self._manifest.setdefault(route, {})[frequency] = marks
+        self._manifest_path.write_text(json.dumps(self._manifest, indent=2))
+        return written
+
+    @staticmethod
+    def _upsert(
+        path: Path, rows: pd.DataFrame, series_marks: Dict[str, str]
+    ) -> Tuple[Optional[pd.DataFrame], int, List[Path]]:
+        """Return the rows to write to a partition, how many are new or revised,
+        and the files they replace.
+
+        The rows are the incoming new rows to append when no stored value was
+        revised, the whole updated partition replacing its files otherwise, or
+        None when nothing changed.
+        """
+        default = series_marks.get("", "")
+        stored_until = (
+            rows[SERIES_COLUMN]
+            .astype(str)
+            .map(lambda series: series_marks.get(series, default))
+        )
+        known = (rows["period"] <= stored_until).to_numpy(dtype=bool)
+        parts = sorted(path.glob("part-*.parquet"))
+        if not known.any() or not parts:
+            return rows, len(rows), []
+
+        keys = [column for column in KEY_COLUMNS if column in rows.columns]
+        stored = pd.concat(
+            [pd.read_parquet(part, engine="pyarrow") for part in parts],
+            ignore_index=True,
+        ).drop_duplicates(subset=keys, keep="last", ignore_index=True)
+        joined = rows[keys].merge(
+            stored[keys + ["value", FLAG_COLUMN]],
+            on=keys,
+            how="left",
+            indicator=True,
+        )
+        new = (joined["_merge"] == "left_only").to_numpy(dtype=bool)
+        revised = ~new & ~(
+            _same(rows["value"].reset_index(drop=True), joined["value"])
+            & _same(rows[FLAG_COLUMN].reset_index(drop=True), joined[FLAG_COLUMN])
+        )
+        changed = int(revised.sum() + new.sum())
+        if revised.any():
+            merged = pd.concat([stored, rows], ignore_index=True)
+            return (
+                merged.drop_duplicates(subset=keys, keep="last", ignore_index=True),
+                changed,
+                parts,
+            )
+        if new.any():
+            return rows[new], changed, []
+        return None, 0, []
+
+    def read(
+        self,
+        route: str,
+        frequency: str,
+        areas: Optional[Sequence[str]] = None,
+        processes: Optional[Sequence[str]] = None,
+        series: Optional[Sequence[str]] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+    ) -> pd.DataFrame:
+        """Read a route with the filters pushed down to the Parquet scan."""
+        filters: List[Tuple[str, str, Any]] = []
+        if areas:
+            filters.append((PARTITION_COLUMN, "in", list(areas)))
+        if processes:
+            filters.append(("process", "in", list(processes)))
+        if series:
+            filters.append(("series", "in", list(series)))
+        if start:
+            filters.append(("period", ">=", start))
+        if end:
+            filters.append(("period", "<=", end))
+        df = pd.read_parquet(
+            self.dataset_path(route, frequency),
+            engine="pyarrow",
+            filters=filters or None,
+        )
+        df[PARTITION_COLUMN] = df[PARTITION_COLUMN].astype(str)
+        return df.sort_values(["period", PARTITION_COLUMN], ignore_index=True)
+
+    def read_rows(self, route: str, frequency: str, **filters: Any) -> List[Dict]:
+        """Read a route as EIA data rows, restoring the sentinel codes."""
+        df = self.read(route, frequency, **filters)
+        flags = df.pop(FLAG_COLUMN)
+        values = df["value"].astype(object)
+        df["value"] = values.where(flags.isna(), flags)
+        return df.replace({np.nan: None}).to_dict("records")
+
+    async def sync(
+        self,
+        api: str,
+        route1: str,
+        route2: Optional[str],
+        frequency: str,
+        api_key: Optional[str] = "",
+        api_version: int = 2,
+    ) -> int:
+        """Fetch the periods from the last stored ones and store them.
+
+        The last `REVISION_WINDOWS` periods before the last stored period of
+        each area are requested again, so that their revisions are stored.
+
+        Returns the number of new or revised rows written.
+        """
+        route = make_cache_route(api, route1, route2)
+        params: Dict[str, Any] = {
+            "frequency": frequency,
+            "data[0]": "value",
+            "api_key": api_key,
+        }
+        last = self.last_periods(route, frequency)
+        if last:
+            params["start"] = shift_period(
+                min(last.values()), frequency, -REVISION_WINDOWS.get(frequency, 0)
+            )
+
+        written = 0
+        async for page in aiter_eia_pages(
+            api=api,
+            route1=route1,
+            route2=route2,
+            api_version=api_version,
+            params=params,
+        ):
+            written += self.write(route, frequency, page["response"]["data"])
+        return written
+
+
+_warehouse: Optional[ParquetWarehouse] = None
+
+
+def get_warehouse() -> Optional[ParquetWarehouse]:
+    """Return the warehouse set by `OPENBB_EIA_WAREHOUSE`, or None."""
+    global _warehouse  # pylint: disable=global-statement
+    root = os.environ.get("OPENBB_EIA_WAREHOUSE")
+    if not root:
+        return None
+    if _warehouse is None or _warehouse.root != Path(root):
+        _warehouse = ParquetWarehouse(root)
+    return _warehouse
+
+
+async def sync_provider_routes(
+    warehouse: ParquetWarehouse,
+    fetchers: Iterable[Any],
+    api_key: Optional[str] = "",
+) -> Dict[str, int]:
+    """Sync every route and frequency served by the fetchers.
+
+    Parameters
+    ----------
+    warehouse : ParquetWarehouse
+        Warehouse to sync.
+    fetchers : Iterable[Any]
+        Fetcher classes with the `api`, `route1`, `route2` and `frequencies`
+        attributes, e.g. the values of the provider `fetcher_dict`.
+    api_key : Optional[str]
+        EIA API key.
+
+    Returns
+    -------
+    Dict[str, int]
+        Number of new or revised rows written, by route and frequency.
+    """
+    routes = {
+        (fetcher.api, fetcher.route1, fetcher.route2, frequency)
+        for fetcher in fetchers
+        for frequency in getattr(fetcher, "frequencies", ())
+    }
+    written = {}
+    for api, route1, route2, frequency in sorted(routes, key=str):
+        key = f"{make_cache_route(api, route1, route2)} ({frequency})"
+        written[key] = await warehouse.sync(
+            api=api,
+            route1=route1,
+            route2=route2,
+            frequency=frequency,
+            api_key=api_key,
+        )
+    return written
@@ -1,28 +1,12 @@
 """EIA Data Provider for OpenBB Energy."""
 from openbb_core.provider.abstract.provider import Provider
 
-from openbb_energy.eia.natural_gas.consumption import (
-    ConsumptionByEndUseFetcher,
-    ConsumptionNumberOfConsumersFetcher,
-    ConsumptionShareOfGasDeliveredFetcher,
-    ConsumptionAccountOfOthersFetcher,
-    ConsumptionHeatContentFetcher,
-)
-from openbb_energy.eia.natural_gas.exploration_and_reserves import (
-    EnRCrudeOilPlusLeaseCondensateFetcher,
-)
+from openbb_energy.eia.natural_gas.registry import FETCHERS
 
 provider = Provider(
     name="eia",
     description="U.S. Energy Information Administration provider for OpenBB Energy.",
     credentials=["api_key"],
     website="https://www.eia.gov/",
-    fetcher_dict={
-        "ConsumptionByEndUse": ConsumptionByEndUseFetcher,
-        "ConsumptionNumberOfConsumers": ConsumptionNumberOfConsumersFetcher,
-        "ConsumptionShareOfGasDelivered": ConsumptionShareOfGasDeliveredFetcher,
-        "EnRCrudeOilPlusLeaseCondensate": EnRCrudeOilPlusLeaseCondensateFetcher,
-        "ConsumptionAccountOfOthers": ConsumptionAccountOfOthersFetcher,
-        "ConsumptionHeatContent": ConsumptionHeatContentFetcher,
-    },
+    fetcher_dict=FETCHERS,  # type: ignore
 )
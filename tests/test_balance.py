@@ -0,0 +1,89 @@
+"""Tests of the supply and disposition balance."""
+import math
+
+import pandas as pd
+import pytest
+
+from openbb_energy.eia.natural_gas.balance import BalanceComponent, BalanceEngine
+
+COMPONENTS = [
+    BalanceComponent("production", "supply", ["FPD", "Dry Production"]),
+    BalanceComponent("imports", "supply", ["IM0"]),
+    BalanceComponent("consumption", "disposition", ["VC0"]),
+    BalanceComponent("reported", "reported", ["Balancing Item"]),
+]
+
+
+def make_rows(rows) -> pd.DataFrame:
+    """Return columnar rows from (area, period, process, process name, value).
+
+    Each area and process is one series.
+    """
+    df = pd.DataFrame(
+        rows, columns=["area", "period", "process", "process_name", "value"]
+    )
+    df["series"] = df["area"] + df["process"]
+    return df
+
+
+def test_compute_joins_components_on_area_and_period():
+    """Components are matched by id or name and summed by area and period."""
+    rows = make_rows(
+        [
+            ("SCA", "2023-01", "XXX", "dry production", 105.0),
+            ("SCA", "2023-01", "IM0", "Imports", 20.0),
+            ("SCA", "2023-01", "VC0", "Consumption", 130.0),
+            ("SCA", "2023-01", "BAL", "Balancing Item", 6.0),
+            ("SCA", "2023-01", "OTH", "Other", 1000.0),
+            ("SFL", "2023-01", "VC0", "Consumption", 50.0),
+            ("SFL", "2023-01", "FPD", "Dry Production", float("nan")),
+        ]
+    )
+    result = BalanceEngine(COMPONENTS).compute(rows).set_index("area")
+    assert result.loc["SCA", "production"] == 105
+    assert result.loc["SCA", "imports"] == 20
+    assert result.loc["SCA", "total_supply"] == 125
+    assert result.loc["SCA", "balancing_item"] == 5
+    assert result.loc["SCA", "reported"] == 6
+    assert result.loc["SCA", "missing"] == 0
+    assert math.isnan(result.loc["SFL", "production"])
+    assert result.loc["SFL", "balancing_item"] == 50
+    assert result.loc["SFL", "missing"] == 2
+
+
+def test_plan_requests_each_route_once():
+    """Components of the same model share one request with every process."""
+    engine = BalanceEngine(
+        COMPONENTS + [BalanceComponent("exports", "disposition", ["EEX"])]
+    )
+    plan = engine.plan({"frequency": "monthly", "process": "VC0"})
+    assert len(plan) == 1
+    assert "process" not in plan[0][1]
+    assert plan[0][1]["lean"] is False
+
+
+def test_component_names_must_be_unique():
+    """Duplicate output columns are rejected."""
+    with pytest.raises(ValueError):
+        BalanceEngine(COMPONENTS + [COMPONENTS[0]])
+
+
+def test_component_takes_one_series():
+    """Repeated rows of a series keep the last one, several series are an error."""
+    engine = BalanceEngine(COMPONENTS)
+    repeated = make_rows(
+        [
+            ("SCA", "2023-01", "FPD", "Dry Production", 100.0),
+            ("SCA", "2023-01", "FPD", "Dry Production", 101.0),
+        ]
+    )
+    assert engine.compute(repeated)["production"].tolist() == [101]
+    two_series = make_rows(
+        [
+            ("SCA", "2023-01", "FPD", "Dry Production", 100.0),
+            ("SCA", "2023-01", "FPD", "Dry Production", 40.0),
+        ]
+    )
+    two_series.loc[1, "series"] = "N9050CA1"
+    with pytest.raises(ValueError, match="SCAFPD, N9050CA1"):
+        engine.compute(two_series)
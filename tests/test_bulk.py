@@ -0,0 +1,174 @@
+"""Tests of the parsing and ingestion of the EIA bulk archives."""
+import asyncio
+import json
+import zipfile
+from typing import Any, AsyncIterator, Dict, List
+
+import pytest
+
+from openbb_energy.eia.utils import bulk
+
+ROUTE = "natural-gas/cons/sum"
+
+SERIES = {
+    "series_id": "NG.N3010CA2.M",
+    "name": "California Natural Gas Total Consumption, Monthly",
+    "units": "Million Cubic Feet",
+    "f": "M",
+    "geography": "USA-CA",
+    "data": [["202302", 2.5], ["202301", "W"]],
+}
+
+
+V2_ROW = {
+    "period": "2023",
+    "duoarea": "SCA",
+    "area-name": "CALIFORNIA",
+    "product": "EPG0",
+    "product-name": "Natural Gas",
+    "process": "VC0",
+    "process-name": "Total Consumption",
+    "series": "N3010CA2",
+    "series-description": "California Natural Gas Total Consumption (MMcf)",
+    "value": 1.0,
+    "units": "MMCF",
+}
+
+
+def make_index() -> bulk.SeriesIndex:
+    """Return the index of the consumption series of California."""
+    index: bulk.SeriesIndex = {}
+    bulk.index_rows(index, ROUTE, [V2_ROW, {**V2_ROW, "period": "2022"}])
+    return index
+
+
+def make_archive(path, lines):
+    """Write a bulk archive of JSON lines."""
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("NG.txt", "\n".join(json.dumps(line) for line in lines))
+    return path
+
+
+def test_periods_and_areas():
+    """Bulk periods and geographies map to their API v2 ids."""
+    assert bulk.to_period("202312") == "2023-12"
+    assert bulk.to_period("20231201") == "2023-12-01"
+    assert bulk.to_period("2023Q4") == "2023-Q4"
+    assert bulk.to_area("USA") == "NUS"
+    assert bulk.to_area("USA-CA") == "SCA"
+    assert bulk.to_area(None) == bulk.UNKNOWN_AREA
+
+
+def test_series_rows():
+    """A series line becomes API v2 rows."""
+    rows = bulk.series_rows(SERIES)
+    assert [(r["period"], r["value"]) for r in rows] == [
+        ("2023-02", 2.5),
+        ("2023-01", "W"),
+    ]
+    assert rows[0]["series"] == "N3010CA2"
+    assert rows[0]["duoarea"] == "SCA"
+    assert rows[0]["process"] == ""
+
+    (facets,) = make_index()["N3010CA2"]
+    columns = bulk.series_columns(SERIES, facets)
+    assert columns["process"] == ["VC0", "VC0"]
+    assert columns["units"] == ["MMCF", "MMCF"]
+
+
+def test_iter_batches_skips_categories_and_other_frequencies(tmp_path):
+    """Category lines and unwanted frequencies are skipped."""
+    archive = make_archive(
+        tmp_path / "NG.zip",
+        [
+            {"category_id": 1, "name": "Natural Gas"},
+            SERIES,
+            {**SERIES, "series_id": "NG.N3010CA2.A", "f": "A"},
+        ],
+    )
+    batches = list(bulk.iter_batches(archive, frequencies=["monthly"]))
+    assert [(batch["route"], batch["frequency"]) for batch in batches] == [
+        (None, "monthly")
+    ]
+    assert len(batches[0]["rows"]) == 2
+
+    (batch,) = bulk.iter_batches(archive, frequencies=["monthly"], output="models")
+    assert [(d.value, d.value_flag) for d in batch["rows"]] == [
+        (2.5, None),
+        (None, "W"),
+    ]
+
+
+def test_iter_batches_maps_series_to_their_routes(tmp_path):
+    """Series are batched by route with their facets, unknown ones skipped."""
+    archive = make_archive(
+        tmp_path / "NG.zip", [SERIES, {**SERIES, "series_id": "NG.XXX.M"}]
+    )
+    index = make_index()
+    bulk.index_rows(index, "natural-gas/cons/acct", [V2_ROW])
+    with pytest.warns(UserWarning, match="1 bulk series match no indexed route"):
+        batches = list(bulk.iter_batches(archive, index=index))
+    assert [(b["route"], len(b["rows"])) for b in batches] == [
+        (ROUTE, 2),
+        ("natural-gas/cons/acct", 2),
+    ]
+    assert {row["process"] for row in batches[0]["rows"]} == {"VC0"}
+
+
+def test_aload_series_index(monkeypatch):
+    """Each route is requested once, at its lowest frequency."""
+    requests: List[Dict] = []
+
+    async def aiter_eia_pages(**kwargs: Any) -> AsyncIterator[Dict]:
+        requests.append(kwargs)
+        yield {"response": {"data": [V2_ROW]}}
+
+    class Fetcher:  # pylint: disable=too-few-public-methods
+        """Fetcher of the consumption route."""
+
+        api = "natural-gas"
+        route1 = "cons"
+        route2 = "sum"
+        frequencies = ("monthly", "annual")
+
+    class WeeklyFetcher(Fetcher):  # pylint: disable=too-few-public-methods
+        """Fetcher of the weekly storage route."""
+
+        route1 = "stor"
+        route2 = "wkly"
+        frequencies = ("weekly",)
+
+    monkeypatch.setattr(bulk, "aiter_eia_pages", aiter_eia_pages)
+    index = asyncio.run(
+        bulk.aload_series_index([Fetcher, Fetcher, WeeklyFetcher], api_key="key")
+    )
+    assert [entry["route"] for entry in index["N3010CA2"]] == [
+        ROUTE,
+        "natural-gas/stor/wkly",
+    ]
+    assert index["N3010CA2"][0]["process"] == "VC0"
+    assert sorted(
+        (r["route1"], r["params"]["frequency"], r["params"]["start"][4:])
+        for r in requests
+    ) == [("cons", "annual", ""), ("stor", "weekly", "-01-01")]
+
+
+def test_failed_ingestion_keeps_the_stored_rows(tmp_path):
+    """The archive is swapped in only once it is fully loaded."""
+    pytest.importorskip("pyarrow")
+    # pylint: disable=import-outside-toplevel
+    from openbb_energy.eia.utils.warehouse import ParquetWarehouse
+
+    warehouse = ParquetWarehouse(tmp_path / "warehouse")
+    archive = make_archive(tmp_path / "NG.zip", [SERIES])
+    index = make_index()
+    assert bulk.ingest(archive, warehouse, index) == {f"{ROUTE} (monthly)": 2}
+    assert {row["process"] for row in warehouse.read_rows(ROUTE, "monthly")} == {"VC0"}
+
+    broken = make_archive(tmp_path / "broken.zip", [SERIES])
+    with zipfile.ZipFile(broken, "a") as f:
+        f.writestr("NG2.txt", "{not json")
+    with pytest.raises(ValueError):
+        bulk.ingest(broken, warehouse, index)
+    assert len(warehouse.read(ROUTE, "monthly")) == 2
+    assert [p.name for p in warehouse.root.iterdir() if p.name.startswith(".")] == []
@@ -0,0 +1,69 @@
+"""Tests of the response cache."""
+import time
+
+from openbb_energy.eia.utils.cache import (
+    DAY,
+    HOUR,
+    ResponseCache,
+    get_ttl,
+    make_cache_key,
+)
+
+ROUTE = "natural-gas/cons/sum"
+
+
+def make_response(size: int) -> dict:
+    """Return a response of about `size` bytes."""
+    return {"response": {"data": "x" * size}}
+
+
+def test_cache_key_ignores_api_key_and_order():
+    """Keys do not depend on the API key or the order of the parameters."""
+    key = make_cache_key(ROUTE, {"frequency": "monthly", "start": "2020"})
+    assert key == make_cache_key(
+        ROUTE, {"start": "2020", "frequency": "monthly", "api_key": "secret"}
+    )
+    assert key != make_cache_key(ROUTE, {"frequency": "annual", "start": "2020"})
+    assert key != make_cache_key("natural-gas/cons/num", {"frequency": "monthly"})
+
+
+def test_ttl_prefers_the_longest_route_prefix():
+    """Route TTLs win over frequency TTLs."""
+    assert get_ttl("natural-gas/stor/wkly", {"frequency": "weekly"}) == 6 * HOUR
+    assert get_ttl("natural-gas/enr/cplc", {"frequency": "annual"}) == 90 * DAY
+    assert get_ttl(ROUTE, {"frequency": "monthly"}) == DAY
+
+
+def test_cache_round_trip(tmp_path):
+    """Fresh responses are returned, expired ones are misses."""
+    cache = ResponseCache(tmp_path / "cache.sqlite")
+    cache.set(ROUTE, {"frequency": "monthly"}, make_response(10))
+    cache.set(ROUTE, {"frequency": "annual"}, make_response(10), ttl=-1)
+    assert cache.get(ROUTE, {"frequency": "monthly"}) == make_response(10)
+    assert cache.get(ROUTE, {"frequency": "annual"}) is None
+    assert cache.stats["hits"] == 1
+    assert cache.stats["misses"] == 1
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    """Above the size limit, the least recently read entries are dropped."""
+    cache = ResponseCache(tmp_path / "cache.sqlite", max_bytes=350)
+    for name in ("a", "b"):
+        cache.set(ROUTE, {"name": name}, make_response(100))
+        time.sleep(0.01)
+    assert cache.get(ROUTE, {"name": "a"}) is not None
+    time.sleep(0.01)
+    cache.set(ROUTE, {"name": "c"}, make_response(100))
+    assert cache.get(ROUTE, {"name": "b"}) is None
+    assert cache.get(ROUTE, {"name": "a"}) is not None
+    assert cache.get(ROUTE, {"name": "c"}) is not None
+    assert cache.stats["bytes"] <= 350
+
+
+def test_queries_leave_out_the_api_key(tmp_path):
+    """The queries of a route are listed without their API key."""
+    cache = ResponseCache(tmp_path / "cache.sqlite")
+    cache.set(ROUTE, {"frequency": "monthly", "api_key": "secret"}, make_response(1))
+    assert cache.queries(ROUTE) == [{"frequency": "monthly"}]
+    cache.invalidate(ROUTE)
+    assert not cache.queries(ROUTE)
@@ -0,0 +1,212 @@
+"""Tests of the async EIA client against a local server."""
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, List, Tuple
+
+import pytest
+from aiohttp import web
+
+from openbb_energy.eia.utils import helpers
+from openbb_energy.eia.utils.client import EIAClient
+from openbb_energy.eia.utils.transport import (
+    CircuitBreaker,
+    CircuitOpenError,
+    EIAError,
+    RetryPolicy,
+)
+
+FAST_RETRY = RetryPolicy(attempts=3, base_delay=0.0, max_delay=0.0)
+
+
+@pytest.fixture(autouse=True)
+def no_rate_limit(monkeypatch):
+    """Disable the shared rate limiter."""
+    monkeypatch.setenv("OPENBB_EIA_RATE", "0")
+
+
+@asynccontextmanager
+async def serve(
+    statuses: List[int], hits: List[float], delay: Callable[[int], float]
+) -> AsyncIterator[str]:
+    """Serve `statuses` in turn, then 200s, recording the time of each hit."""
+    loop = asyncio.get_running_loop()
+
+    async def handler(_: web.Request) -> web.Response:
+        hit = len(hits)
+        hits.append(loop.time())
+        await asyncio.sleep(delay(hit))
+        status = statuses[hit] if hit < len(statuses) else 200
+        return web.json_response({"response": {"hit": hit}}, status=status)
+
+    app = web.Application()
+    app.router.add_get("/data", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    try:
+        yield f"http://127.0.0.1:{port}/data"
+    finally:
+        await runner.cleanup()
+
+
+def run(client: EIAClient, statuses: List[int], hits: List[float], **kwargs):
+    """Make one request of the client and return its body."""
+
+    async def main():
+        async with serve(statuses, hits, kwargs.get("delay", lambda _: 0.0)) as url:
+            try:
+                return await client.get_json(url, [])
+            finally:
+                await client.close()
+
+    return asyncio.run(main())
+
+
+def test_retries_retryable_statuses():
+    """Retryable statuses are retried until a response succeeds."""
+    hits: List[float] = []
+    client = EIAClient(retry=FAST_RETRY, hedge_percentile=None)
+    assert run(client, [503, 429], hits) == {"response": {"hit": 2}}
+    assert len(hits) == 3
+
+
+def test_gives_up_after_the_last_attempt():
+    """The last retryable failure is raised."""
+    hits: List[float] = []
+    client = EIAClient(retry=FAST_RETRY, hedge_percentile=None)
+    with pytest.raises(EIAError) as error:
+        run(client, [503, 503, 503], hits)
+    assert error.value.status == 503
+    assert len(hits) == 3
+
+
+def test_does_not_retry_client_errors():
+    """Other errors are raised at once."""
+    hits: List[float] = []
+    client = EIAClient(retry=FAST_RETRY, hedge_percentile=None)
+    with pytest.raises(EIAError) as error:
+        run(client, [400], hits)
+    assert error.value.status == 400
+    assert len(hits) == 1
+
+
+def test_breaker_fails_fast_once_open():
+    """Once the circuit opens, requests fail without reaching the host."""
+    hits: List[float] = []
+    client = EIAClient(
+        retry=FAST_RETRY,
+        breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60.0),
+        hedge_percentile=None,
+    )
+
+    async def main():
+        async with serve([503, 503, 503], hits, lambda _: 0.0) as url:
+            for _ in range(2):
+                with pytest.raises(CircuitOpenError):
+                    await client.get_json(url, [])
+                assert len(hits) == 2
+            await client.close()
+
+    asyncio.run(main())
+
+
+def test_breaker_lets_a_trial_through_after_the_timeout():
+    """A successful trial request closes the circuit."""
+    hits: List[float] = []
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.0)
+    client = EIAClient(retry=FAST_RETRY, breaker=breaker, hedge_percentile=None)
+    assert run(client, [503], hits) == {"response": {"hit": 1}}
+    assert len(hits) == 2
+
+
+def test_breaker_closes_on_success():
+    """A success resets the failure count of the host."""
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60.0)
+    breaker.record_failure("eia")
+    breaker.record_success("eia")
+    breaker.record_failure("eia")
+    assert breaker.allow("eia")
+    breaker.record_failure("eia")
+    assert breaker.is_open("eia")
+    assert not breaker.allow("eia")
+
+
+def test_cancelling_the_caller_cancels_the_request(monkeypatch):
+    """A caller cancelled before the hedge delay cancels the first request."""
+    client = EIAClient(hedge_percentile=0.5)
+    for _ in range(client.latencies.min_samples):
+        client.latencies.record(1.0)
+    started: List[bool] = []
+    cancelled: List[bool] = []
+
+    async def attempt(*_):
+        started.append(True)
+        try:
+            await asyncio.sleep(5.0)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+        return 200, {}
+
+    monkeypatch.setattr(client, "_attempt", attempt)
+
+    async def main():
+        task = asyncio.ensure_future(client.get_json("http://eia", []))
+        while not started:
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await asyncio.sleep(0)
+        assert started == [True]
+        assert cancelled == [True]
+
+    asyncio.run(main())
+
+
+def make_hedging_client() -> EIAClient:
+    """Return a client that hedges requests slower than 50 ms."""
+    client = EIAClient(retry=FAST_RETRY, hedge_percentile=0.5)
+    for _ in range(client.latencies.min_samples):
+        client.latencies.record(0.05)
+    return client
+
+
+def test_slow_requests_are_hedged():
+    """A second request is sent after the hedge delay, and the first response wins."""
+    hits: List[float] = []
+    body = run(make_hedging_client(), [], hits, delay=lambda hit: 1.0 - hit)
+    assert body == {"response": {"hit": 1}}
+    assert len(hits) == 2
+    assert hits[1] - hits[0] >= 0.05
+
+
+def test_fast_requests_are_not_hedged():
+    """Requests faster than the hedge delay are sent once."""
+    hits: List[float] = []
+    assert run(make_hedging_client(), [], hits) == {"response": {"hit": 0}}
+    assert len(hits) == 1
+
+
+def test_blocking_request_uses_the_client(monkeypatch):
+    """The blocking request goes through the shared async client."""
+    calls: List[Any] = []
+
+    class Client:  # pylint: disable=too-few-public-methods
+        """Client stand-in."""
+
+        async def get_json(self, url: str, params: List[Tuple[str, Any]]) -> Dict:
+            """Record the request."""
+            calls.append((url, params))
+            return {"response": {"data": []}}
+
+    monkeypatch.setenv("OPENBB_EIA_CACHE", "0")
+    monkeypatch.setattr(helpers, "get_client", Client)
+    response = helpers.make_eia_request(
+        "natural-gas", "cons", "sum", 2, {"facets[duoarea][]": ["SCA", "NUS"]}
+    )
+    assert response["response"] == {"data": []}
+    assert calls[0][0].endswith("/natural-gas/cons/sum/data")
+    assert calls[0][1] == [("facets[duoarea][]", "SCA"), ("facets[duoarea][]", "NUS")]
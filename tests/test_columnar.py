@@ -0,0 +1,43 @@
+"""Tests of the coercion of EIA values."""
+import math
+
+from openbb_energy.eia.natural_gas.natural_gas import make_data
+from openbb_energy.eia.utils.columnar import coerce_values, parse_periods
+
+ROW = {
+    "period": "2023-01",
+    "duoarea": "SCA",
+    "area-name": "California",
+    "product": "EPG0",
+    "product-name": "Natural Gas",
+    "process": "VC0",
+    "process-name": "Total Consumption",
+    "series": "N3010CA2",
+    "series-description": "California Natural Gas Total Consumption",
+    "units": "MMCF",
+}
+
+
+def test_coerce_values_flags_sentinels():
+    """Numbers become floats and sentinel codes move to the flags."""
+    values, flags = coerce_values(["1.5", 2, "W", None, "NA"])
+    assert values[:2].tolist() == [1.5, 2.0]
+    assert all(math.isnan(v) for v in values[2:])
+    assert flags.isna().tolist() == [True, True, False, True, False]
+    assert [flags[2], flags[4]] == ["W", "NA"]
+
+
+def test_make_data_coerces_without_mutating_rows():
+    """Data models get float values and flags, the shared rows are unchanged."""
+    rows = [{**ROW, "value": "12.5"}, {**ROW, "period": "2023-02", "value": "W"}]
+    data = make_data(rows)
+    assert [d.value for d in data] == [12.5, None]
+    assert [d.value_flag for d in data] == [None, "W"]
+    assert rows[1]["value"] == "W"
+
+
+def test_parse_periods():
+    """Monthly, annual and quarterly periods are parsed."""
+    assert str(parse_periods(["2023-02"])[0].date()) == "2023-02-01"
+    assert str(parse_periods(["2023"])[0].date()) == "2023-01-01"
+    assert str(parse_periods(["2023-Q3"])[0].date()) == "2023-07-01"
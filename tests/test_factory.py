@@ -0,0 +1,83 @@
+"""Tests of the fetchers generated from the route table."""
+from typing import List
+
+import pytest
+from pydantic import ValidationError
+
+from openbb_energy.eia.natural_gas.factory import make_fetcher, make_query_params
+from openbb_energy.eia.natural_gas.natural_gas import (
+    NaturalGasAnnualFetcher,
+    NaturalGasData,
+    NaturalGasQueryParams,
+)
+from openbb_energy.eia.natural_gas.registry import FETCHERS
+from openbb_energy.eia.natural_gas.routes import (
+    ANNUAL,
+    NATURAL_GAS_PROCESSES,
+    ROUTE_SPECS,
+    ROUTES,
+    RouteSpec,
+)
+from openbb_energy.eia_provider import provider
+
+
+def test_every_route_has_a_fetcher():
+    """Each route spec generates one fetcher, served by the provider."""
+    names = [spec.name for spec in ROUTES]
+    assert len(set(names)) == len(names)
+    assert list(ROUTE_SPECS) == names
+    assert list(FETCHERS) == names
+    assert set(provider.fetcher_dict) == set(names)
+    for spec in ROUTES:
+        fetcher = FETCHERS[spec.name]
+        assert fetcher.__name__ == f"{spec.name}Fetcher"
+        assert (fetcher.route1, fetcher.route2) == (spec.route1, spec.route2)
+        assert fetcher.frequencies == spec.frequencies
+        assert issubclass(fetcher, NaturalGasAnnualFetcher) == (
+            spec.frequencies == ANNUAL
+        )
+
+
+def test_query_params_are_shared():
+    """Specs with the same frequencies and processes share a query class."""
+    assert make_query_params(ANNUAL, NATURAL_GAS_PROCESSES) is NaturalGasQueryParams
+    weekly = make_query_params(("weekly",), None)
+    assert make_query_params(["weekly"], None) is weekly
+    assert weekly.__name__ == "NaturalGasWeeklyAnyProcessQueryParams"
+    assert weekly.processes is None
+    assert weekly().frequency == "weekly"
+    with pytest.raises(ValidationError):
+        weekly(frequency="monthly")
+
+
+def test_openbb_core_reads_the_generated_types():
+    """The query params and data types are declared for openbb-core."""
+    storage = FETCHERS["StorageWeeklyWorkingGasUnderground"]
+    assert storage.query_params_type is make_query_params(("weekly",), None)
+    assert storage.return_type == List[NaturalGasData]
+    assert storage.data_type is NaturalGasData
+
+    class ConsumptionData(NaturalGasData):
+        """Consumption data."""
+
+    fetcher = make_fetcher(
+        RouteSpec(
+            "Custom",
+            "cons",
+            "sum",
+            "Custom data.",
+            processes=NATURAL_GAS_PROCESSES,
+            data=ConsumptionData,
+        )
+    )
+    assert fetcher.query_params_type is NaturalGasQueryParams
+    assert fetcher.data_type is ConsumptionData
+    assert fetcher.__doc__ == "Custom data Fetcher."
+
+
+def test_annual_fetchers_coerce_monthly_queries():
+    """Monthly queries of annual routes are changed to annual, with a warning."""
+    fetcher = FETCHERS["ConsumptionNumberOfConsumers"]
+    with pytest.warns(UserWarning, match="Changing frequency to annual"):
+        query = fetcher.transform_query({"frequency": "monthly"})
+    assert query.frequency == "annual"
@@ -0,0 +1,199 @@
+"""Tests of the pagination of EIA requests."""
+import asyncio
+from typing import Any, Dict, List
+from urllib.parse import urlencode
+
+import pytest
+
+from openbb_energy.eia.utils import helpers
+
+TOTAL = 12_000
+
+
+def make_rows(count: int) -> List[Dict]:
+    """Return EIA rows numbered from 0."""
+    return [{"period": f"row-{i:05d}", "value": str(i)} for i in range(count)]
+
+
+@pytest.fixture(name="made_requests")
+def fixture_made_requests(monkeypatch) -> List[Dict]:
+    """Serve the pages of a result set of TOTAL rows and record the requests."""
+    rows = make_rows(TOTAL)
+    made: List[Dict] = []
+
+    def make_eia_request(params: Dict, **_: Any) -> Dict:
+        made.append(params)
+        offset, length = params["offset"], params["length"]
+        warnings = (
+            [{"warning": "incomplete return", "description": "5000 rows max"}]
+            if length < TOTAL - offset
+            else []
+        )
+        return {
+            "response": {
+                "total": str(TOTAL),
+                "data": rows[offset : offset + length],
+                "warnings": warnings,
+            }
+        }
+
+    monkeypatch.setattr(helpers, "make_eia_request", make_eia_request)
+    return made
+
+
+def test_plan_pages():
+    """Windows cover the rows asked for, at most a page each."""
+    assert helpers.plan_pages(TOTAL) == [(0, 5000), (5000, 5000), (10000, 2000)]
+    assert helpers.plan_pages(TOTAL, offset=4000, length=7000) == [
+        (4000, 5000),
+        (9000, 2000),
+    ]
+    assert helpers.plan_pages(TOTAL, offset=11000) == [(11000, 1000)]
+    assert not helpers.plan_pages(0)
+
+
+def test_paginated_request_merges_every_page(made_requests):
+    """The pages are merged in order, without the incomplete return warning."""
+    response = helpers.make_eia_paginated_request(
+        "natural-gas", "cons", "sum", 2, {"frequency": "monthly"}
+    )["response"]
+    assert [row["value"] for row in response["data"]] == [str(i) for i in range(TOTAL)]
+    assert not response["warnings"]
+    assert [(r["offset"], r["length"]) for r in made_requests] == [
+        (0, 5000),
+        (5000, 5000),
+        (10000, 2000),
+    ]
+
+
+def test_paginated_request_stops_at_length(made_requests):
+    """Only the pages covering `offset` and `length` are requested."""
+    response = helpers.make_eia_paginated_request(
+        "natural-gas", "cons", "sum", 2, {"offset": 1000, "length": 6000}
+    )["response"]
+    assert len(response["data"]) == 6000
+    assert response["data"][0]["value"] == "1000"
+    assert [(r["offset"], r["length"]) for r in made_requests] == [
+        (1000, 5000),
+        (6000, 1000),
+    ]
+
+
+def test_single_page_drops_incomplete_return(made_requests):
+    """A limited query is complete even if EIA reports more rows."""
+    response = helpers.make_eia_paginated_request(
+        "natural-gas", "cons", "sum", 2, {"length": 10}
+    )["response"]
+    assert len(response["data"]) == 10
+    assert not response["warnings"]
+    assert len(made_requests) == 1
+
+
+def test_sort_rows_puts_missing_values_last():
+    """Values sort as numbers, and sentinel codes sort last in both directions."""
+    rows = [{"value": v} for v in ["W", "10", "9.5", None, "100"]]
+    descending = helpers.sort_rows(rows, [("value", True)])
+    ascending = helpers.sort_rows(rows, [("value", False)])
+    assert [r["value"] for r in descending] == ["100", "10", "9.5", "W", None]
+    assert [r["value"] for r in ascending] == ["9.5", "10", "100", "W", None]
+
+
+def test_get_sort_keys():
+    """Sort keys are read in priority order."""
+    params = {
+        "sort[0][column]": "period",
+        "sort[0][direction]": "desc",
+        "sort[1][column]": "value",
+    }
+    assert helpers.get_sort_keys(params) == [("period", True), ("value", False)]
+
+
+def test_merge_responses_sorts_before_truncating():
+    """The rows of sorted batches are merged in order before the length applies."""
+    responses = [
+        {"response": {"total": 2, "data": [{"value": "9"}, {"value": "1"}]}},
+        {"response": {"total": 2, "data": [{"value": "8"}, {"value": "7"}]}},
+    ]
+    merged = helpers.merge_responses(responses, length=3, sort=[("value", True)])
+    assert [r["value"] for r in merged["response"]["data"]] == ["9", "8", "7"]
+    assert merged["response"]["total"] == 4
+
+
+def test_plan_facet_requests_fits_the_url_length():
+    """Long facet lists are split into requests that fit, covering every value."""
+    url = "https://api.eia.gov/v2/natural-gas/cons/sum/data"
+    areas = [f"S{i:03d}" for i in range(300)]
+    params = {"frequency": "monthly", "facets[duoarea][]": areas}
+    batches = helpers.plan_facet_requests(url, params, max_url_length=1000)
+    assert len(batches) > 1
+    for batch in batches:
+        query = urlencode(helpers.to_query_items(batch))
+        assert len(url) + 1 + len(query) <= 1000
+        assert batch["frequency"] == "monthly"
+    assert [a for b in batches for a in b["facets[duoarea][]"]] == areas
+    assert helpers.plan_facet_requests(url, {"frequency": "monthly"}) == [
+        {"frequency": "monthly"}
+    ]
+
+
+@pytest.fixture(name="async_requests")
+def fixture_async_requests(monkeypatch) -> Dict[str, Any]:
+    """Serve TOTAL rows, or a row per area requested, and record the requests."""
+    made: Dict[str, Any] = {"requests": [], "active": 0, "max_active": 0}
+
+    async def amake_eia_request(params: Dict, **_: Any) -> Dict:
+        made["requests"].append(params)
+        made["active"] += 1
+        made["max_active"] = max(made["max_active"], made["active"])
+        await asyncio.sleep(0.001)
+        made["active"] -= 1
+        areas = params.get("facets[duoarea][]")
+        rows = (
+            make_rows(TOTAL)
+            if areas is None
+            else [{"period": "2023-01", "duoarea": a, "value": a[1:]} for a in areas]
+        )
+        rows = helpers.sort_rows(rows, helpers.get_sort_keys(params))
+        offset, length = params["offset"], params["length"]
+        return {
+            "response": {"total": len(rows), "data": rows[offset : offset + length]}
+        }
+
+    monkeypatch.setattr(helpers, "amake_eia_request", amake_eia_request)
+    return made
+
+
+def test_async_paginated_request_merges_every_page(async_requests):
+    """The pages are fetched concurrently, bounded by max_workers, and merged."""
+    response = asyncio.run(
+        helpers.amake_eia_paginated_request(
+            "natural-gas", "cons", "sum", 2, {"frequency": "monthly"}, max_workers=2
+        )
+    )["response"]
+    assert [row["value"] for row in response["data"]] == [str(i) for i in range(TOTAL)]
+    assert [(r["offset"], r["length"]) for r in async_requests["requests"]] == [
+        (0, 5000),
+        (5000, 5000),
+        (10000, 2000),
+    ]
+    assert async_requests["max_active"] == 2
+
+
+def test_async_paginated_request_splits_long_facet_lists(async_requests):
+    """Facet lists too long for one URL are requested in batches, merged in the
+    sort order before the length applies."""
+    areas = [f"S{i:03d}" for i in range(400)]
+    params = {
+        "frequency": "monthly",
+        "facets[duoarea][]": areas,
+        "sort[0][column]": "value",
+        "sort[0][direction]": "desc",
+        "length": 3,
+    }
+    response = asyncio.run(
+        helpers.amake_eia_paginated_request("natural-gas", "cons", "sum", 2, params)
+    )["response"]
+    requests = async_requests["requests"]
+    assert len(requests) > 1
+    assert sorted(a for r in requests for a in r["facets[duoarea][]"]) == areas
+    assert [row["value"] for row in response["data"]] == ["399", "398", "397"]
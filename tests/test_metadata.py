@@ -0,0 +1,160 @@
+"""Tests of the validation of queries against the EIA route metadata."""
+import asyncio
+import time
+from typing import Any, Dict, List
+
+import pytest
+
+from openbb_energy.eia.natural_gas.natural_gas import NaturalGasQueryParams
+from openbb_energy.eia.utils import metadata as metadata_module
+from openbb_energy.eia.utils.metadata import MetadataCatalog, RouteMetadata
+
+ROUTE = "natural-gas/cons/sum"
+
+
+def make_metadata(**kwargs: Any) -> RouteMetadata:
+    """Return the metadata of a monthly and annual route with its areas."""
+    return RouteMetadata(
+        **{
+            "route": ROUTE,
+            "frequencies": {"monthly": "YYYY-MM", "annual": "YYYY"},
+            "facets": {"duoarea": {"SCA": "California", "NUS": "U.S."}},
+            "start_period": "1997-01",
+            "end_period": "2023-12",
+            "facet_ids": ["duoarea", "process"],
+            **kwargs,
+        }
+    )
+
+
+class FakeClient:  # pylint: disable=too-few-public-methods
+    """Client serving the metadata of a route and its facets."""
+
+    def __init__(self):
+        """Initialize the requests made."""
+        self.urls: List[str] = []
+
+    async def get_json(self, url: str, **_: Any) -> Dict:
+        """Return the metadata of `url`."""
+        self.urls.append(url)
+        await asyncio.sleep(0.001)
+        if url.endswith("/facet/process"):
+            return {"response": {"facets": [{"id": "VC0", "name": "Consumption"}]}}
+        return {
+            "response": {
+                "frequency": [{"id": "monthly", "format": "YYYY-MM"}],
+                "facets": [{"id": "duoarea"}, {"id": "process"}],
+                "startPeriod": "1997-01",
+                "endPeriod": "2023-12",
+            }
+        }
+
+
+@pytest.fixture(name="client")
+def fixture_client(monkeypatch) -> FakeClient:
+    """Serve the metadata requests from a fake client."""
+    client = FakeClient()
+    monkeypatch.setattr(metadata_module, "get_client", lambda: client)
+    return client
+
+
+def test_normalize_facet_accepts_ids_and_names():
+    """Facet values are matched by id or name, in any case."""
+    metadata = make_metadata()
+    assert metadata.normalize_facet("duoarea", ["sca", "U.S.", " california"]) == [
+        "SCA",
+        "NUS",
+        "SCA",
+    ]
+    assert metadata.normalize_facet("series", ["anything"]) == ["anything"]
+    with pytest.raises(ValueError, match="Invalid duoarea XX"):
+        metadata.normalize_facet("duoarea", ["SCA", "XX"])
+
+
+def test_validate_period():
+    """Unsupported frequencies and periods outside the route are rejected."""
+    metadata = make_metadata()
+    metadata.validate_period("monthly", "2000-01", "2023-12")
+    with pytest.raises(ValueError, match="does not support weekly frequency"):
+        metadata.validate_period("weekly", None, None)
+    with pytest.raises(ValueError, match="no data after"):
+        metadata.validate_period("monthly", "2025-01", None)
+    with pytest.raises(ValueError, match="no data before"):
+        metadata.validate_period("monthly", None, "1990-12")
+
+
+def test_normalize_query():
+    """The query is returned with the facet ids, without changing the original."""
+    query = NaturalGasQueryParams(frequency="monthly", duoarea="california,nus")
+    normalized = make_metadata().normalize_query(query, ["duoarea", "process"])
+    assert normalized.filter_by_area == "SCA,NUS"
+    assert query.filter_by_area == "california,nus"
+
+
+def test_catalog_persists_and_expires(tmp_path):
+    """Metadata is reloaded from disk, until its time to live runs out."""
+    MetadataCatalog(tmp_path).put(make_metadata())
+    assert MetadataCatalog(tmp_path).get(ROUTE).facets["duoarea"]["SCA"] == (
+        "California"
+    )
+    expired = MetadataCatalog(tmp_path, ttl=60)
+    expired.put(make_metadata(fetched=time.time() - 120))
+    assert expired.get(ROUTE) is None
+
+
+def test_aget_serves_memory_without_a_thread(tmp_path, monkeypatch, client):
+    """Metadata in memory is returned without reading the disk in a thread."""
+    catalog = MetadataCatalog(tmp_path)
+    first = asyncio.run(catalog.aget("natural-gas", "cons", "sum", api_key="key"))
+    assert first.facet_ids == ["duoarea", "process"]
+
+    async def to_thread(*_: Any) -> Any:
+        raise AssertionError("Read from disk")
+
+    monkeypatch.setattr(metadata_module, "to_thread", to_thread)
+    again = asyncio.run(catalog.aget("natural-gas", "cons", "sum", api_key="key"))
+    assert again is first
+    assert len(client.urls) == 1
+
+
+def test_aload_facets_loads_each_facet_once(tmp_path, client):
+    """Concurrent loads of the same facet share one request."""
+    catalog = MetadataCatalog(tmp_path)
+    metadata = make_metadata()
+
+    async def main():
+        await asyncio.gather(
+            *(
+                catalog.aload_facets(
+                    metadata,
+                    ["duoarea", "process", "series"],
+                    "natural-gas",
+                    "cons",
+                    "sum",
+                )
+                for _ in range(3)
+            ),
+        )
+
+    asyncio.run(main())
+    assert [url.rsplit("/", 2)[-2:] for url in client.urls] == [["facet", "process"]]
+    assert metadata.normalize_facet("process", ["consumption"]) == ["VC0"]
+
+
+def test_anormalize_query_rejects_invalid_queries(tmp_path, monkeypatch, client):
+    """Queries are validated against the route before any data request."""
+    monkeypatch.setattr(metadata_module, "_catalog", MetadataCatalog(tmp_path))
+    query = NaturalGasQueryParams(frequency="annual")
+    with pytest.raises(ValueError, match="does not support annual frequency"):
+        asyncio.run(
+            metadata_module.anormalize_query(
+                query, "natural-gas", "cons", "sum", ["duoarea"], api_key="key"
+            )
+        )
+    unchecked = asyncio.run(
+        metadata_module.anormalize_query(
+            query, "natural-gas", "cons", "sum", ["duoarea"], api_key=""
+        )
+    )
+    assert unchecked is query
+    assert len(client.urls) == 1
@@ -0,0 +1,65 @@
+"""Tests of the token bucket shared by the processes calling EIA."""
+import asyncio
+
+import pytest
+
+from openbb_energy.eia.utils import ratelimit
+from openbb_energy.eia.utils.ratelimit import TokenBucket
+
+
+def test_burst_then_rate():
+    """The burst is served at once, later requests wait in arrival order."""
+    bucket = TokenBucket(rate=10.0, burst=3)
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.02)
+    assert bucket.reserve() == pytest.approx(0.2, abs=0.02)
+    stats = bucket.stats()
+    assert (stats["acquired"], stats["delayed"], stats["shared"]) == (5, 2, False)
+
+
+def test_refund_gives_the_token_back():
+    """A refunded reservation frees its token for the next request."""
+    bucket = TokenBucket(rate=1.0, burst=1)
+    assert bucket.reserve() == 0.0
+    bucket.refund()
+    assert bucket.reserve() == 0.0
+    assert bucket.stats()["acquired"] == 1
+
+
+def test_state_is_shared_through_the_file(tmp_path):
+    """Buckets sharing a state file share their tokens."""
+    first = TokenBucket(rate=10.0, burst=2, path=tmp_path / "ratelimit")
+    second = TokenBucket(rate=10.0, burst=2, path=tmp_path / "ratelimit")
+    assert first.stats()["shared"]
+    assert [first.reserve(), first.reserve()] == [0.0, 0.0]
+    assert second.reserve() == pytest.approx(0.1, abs=0.02)
+
+
+def test_cancelled_waiter_refunds_its_token():
+    """A waiter cancelled before its token is due gives the token back."""
+    bucket = TokenBucket(rate=2.0, burst=1)
+
+    async def main():
+        await bucket.aacquire()
+        waiter = asyncio.ensure_future(bucket.aacquire())
+        await asyncio.sleep(0.1)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        await asyncio.sleep(0.05)
+
+    asyncio.run(main())
+    assert bucket.stats()["acquired"] == 1
+    assert bucket.reserve() < 0.5
+
+
+def test_rate_limiter_can_be_disabled(monkeypatch, tmp_path):
+    """A rate of 0 disables the shared limiter."""
+    monkeypatch.setattr(ratelimit, "_rate_limiter", None)
+    monkeypatch.setenv("OPENBB_EIA_RATE", "0")
+    assert ratelimit.get_rate_limiter() is None
+    monkeypatch.setenv("OPENBB_EIA_RATE", "3")
+    monkeypatch.setenv("OPENBB_EIA_RATE_FILE", str(tmp_path / "ratelimit"))
+    limiter = ratelimit.get_rate_limiter()
+    assert limiter is not None
+    assert limiter.rate == 3.0
@@ -0,0 +1,82 @@
+"""Tests of the local rollups of monthly series."""
+import pytest
+
+from openbb_energy.eia.utils.rollups import classify_series, rollup, rollups
+
+
+def make_rows(
+    series: str, description: str, units: str, values, year: int = 2022
+) -> list:
+    """Return the monthly rows of a series, from January of `year`."""
+    return [
+        {
+            "period": f"{year + i // 12}-{i % 12 + 1:02d}",
+            "series": series,
+            "series_description": description,
+            "units": units,
+            "value": value,
+        }
+        for i, value in enumerate(values)
+    ]
+
+
+FLOW = make_rows("F", "Total Consumption", "MMCF", range(1, 16))
+STOCK = make_rows("S", "Working Gas in Underground Storage", "MMCF", range(1, 16))
+RATE = make_rows("R", "Citygate Price", "$/MCF", range(1, 16))
+
+
+def test_classify_series():
+    """Flows are summed, stocks take the last month and rates are averaged."""
+    assert classify_series("MMCF", "Underground Storage Withdrawals") == "sum"
+    assert classify_series("MMCF", "Working Gas in Underground Storage") == "last"
+    assert classify_series("$/MCF", "Citygate Price") == "mean"
+    assert classify_series("MMCF", "Total Consumption") == "sum"
+
+
+def test_annual_rollup_keeps_complete_years():
+    """The partial year is dropped unless asked for."""
+    annual = rollup(FLOW + STOCK + RATE, "annual")
+    values = dict(zip(annual["series"], annual["value"]))
+    assert len(annual) == 3
+    assert values == {"F": sum(range(1, 13)), "S": 12, "R": pytest.approx(6.5)}
+    assert set(annual["months"]) == {12}
+
+    partial = rollup(FLOW, "annual", partial=True)
+    assert partial["value"].tolist() == [sum(range(1, 13)), 13 + 14 + 15]
+
+
+def test_quarterly_rollup():
+    """Quarters start on their first month."""
+    quarterly = rollup(FLOW, "quarterly")
+    assert quarterly["value"].tolist() == [6, 15, 24, 33, 42]
+    assert str(quarterly["period"].iloc[1].date()) == "2022-04-01"
+
+
+def test_ytd_rollup_compares_like_for_like():
+    """Every year runs up to the last month reported for the series."""
+    ytd = rollup(FLOW, "ytd")
+    assert ytd["value"].tolist() == [1 + 2 + 3, 13 + 14 + 15]
+    assert ytd["months"].tolist() == [3, 3]
+
+
+def test_withheld_months_make_a_period_partial():
+    """Sentinel values are not counted as reported months."""
+    rows = make_rows("F", "Total Consumption", "MMCF", [1, "W", 3])
+    assert rollup(rows, "quarterly").empty
+    assert rollup(rows, "quarterly", partial=True)["value"].tolist() == [4]
+
+
+def test_invalid_aggregation_override():
+    """Overrides are validated."""
+    with pytest.raises(ValueError):
+        rollup(FLOW, "annual", aggregations={"F": "median"})
+
+
+def test_rollups_of_every_frequency():
+    """One monthly frame serves every frequency, before 1970 too."""
+    rows = make_rows("F", "Total Consumption", "MMCF", range(1, 16), year=1968)
+    result = rollups(rows)
+    assert list(result) == ["quarterly", "annual", "ytd"]
+    assert str(result["annual"]["period"].iloc[0].date()) == "1968-01-01"
+    assert result["annual"]["value"].tolist() == [sum(range(1, 13))]
+    assert result["ytd"]["value"].tolist() == [1 + 2 + 3, 13 + 14 + 15]
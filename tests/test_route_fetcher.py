@@ -0,0 +1,76 @@
+"""Tests of the deduplication of concurrent EIA requests."""
+import asyncio
+from typing import Dict, List
+
+import pytest
+
+from openbb_energy.eia.utils.route_fetcher import make_flight_key, single_flight
+
+PARAMS = {"frequency": "monthly", "facets[duoarea][]": ["NUS"]}
+
+
+def test_single_flight_runs_once_for_concurrent_callers():
+    """Concurrent callers with the same key share one call."""
+    calls: List[int] = []
+
+    async def fetch() -> Dict:
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"calls": len(calls)}
+
+    async def main():
+        first = await asyncio.gather(*(single_flight("a", fetch) for _ in range(5)))
+        other = await single_flight("b", fetch)
+        again = await single_flight("a", fetch)
+        return first, other, again
+
+    first, other, again = asyncio.run(main())
+    assert first == [{"calls": 1}] * 5
+    assert other == {"calls": 2}
+    assert again == {"calls": 3}
+
+
+def test_single_flight_shares_errors():
+    """Every caller gets the error of the shared call."""
+
+    async def fetch() -> Dict:
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def main():
+        return await asyncio.gather(
+            *(single_flight("a", fetch) for _ in range(3)), return_exceptions=True
+        )
+
+    errors = asyncio.run(main())
+    assert all(isinstance(error, ValueError) for error in errors)
+
+
+def test_single_flight_survives_a_cancelled_caller():
+    """Cancelling one caller does not cancel the call of the others."""
+
+    async def fetch() -> Dict:
+        await asyncio.sleep(0.05)
+        return {"done": True}
+
+    async def main():
+        first = asyncio.ensure_future(single_flight("a", fetch))
+        second = asyncio.ensure_future(single_flight("a", fetch))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(main()) == {"done": True}
+
+
+def test_flight_key_separates_api_keys():
+    """Requests are shared only between callers with the same API key."""
+    key = make_flight_key("natural-gas/pri/sum", PARAMS, "key-a")
+    assert key == make_flight_key("natural-gas/pri/sum", dict(PARAMS), "key-a")
+    assert key != make_flight_key("natural-gas/pri/sum", PARAMS, "key-b")
+    assert key != make_flight_key("natural-gas/cons/sum", PARAMS, "key-a")
+    assert make_flight_key("natural-gas/pri/sum", PARAMS, None) == make_flight_key(
+        "natural-gas/pri/sum", PARAMS, ""
+    )
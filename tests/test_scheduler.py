@@ -0,0 +1,144 @@
+"""Tests of the release-calendar-aware cache prefetching."""
+import asyncio
+import json
+from datetime import datetime
+from typing import Any, Dict, List
+
+import pytest
+
+from openbb_energy.eia.utils import helpers, scheduler
+from openbb_energy.eia.utils.cache import ResponseCache
+from openbb_energy.eia.utils.scheduler import (
+    MonthlyRelease,
+    PrefetchJob,
+    PrefetchScheduler,
+    WeeklyRelease,
+    get_release,
+    load_jobs,
+)
+
+WEEKLY = "natural-gas/stor/wkly"
+MONTHLY = "natural-gas/cons/sum"
+
+
+class FakeClient:  # pylint: disable=too-few-public-methods
+    """Client answering every request with a new value, or failing."""
+
+    def __init__(self, fail: bool = False):
+        """Initialize the requests made."""
+        self.fail = fail
+        self.urls: List[str] = []
+
+    async def get_json(self, url: str, **_: Any) -> Dict:
+        """Return a response with the number of requests made."""
+        self.urls.append(url)
+        if self.fail:
+            raise ConnectionError("EIA is down")
+        return {"response": {"total": 1, "data": [{"value": len(self.urls)}]}}
+
+
+class FakeFetcher:  # pylint: disable=too-few-public-methods
+    """Fetcher recording its queries."""
+
+    api = "natural-gas"
+    route1 = "stor"
+    route2 = "wkly"
+    queries: List[Dict] = []
+
+    @classmethod
+    async def fetch_data(cls, params: Dict, credentials: Dict) -> List:
+        """Record the query."""
+        cls.queries.append({**params, **credentials})
+        return []
+
+
+@pytest.fixture(name="cache")
+def fixture_cache(tmp_path, monkeypatch) -> ResponseCache:
+    """Share a temporary cache between the scheduler and the requests."""
+    cache = ResponseCache(tmp_path / "responses.sqlite")
+    monkeypatch.setattr(scheduler, "get_cache", lambda: cache)
+    monkeypatch.setattr(helpers, "get_cache", lambda: cache)
+    return cache
+
+
+def use_client(monkeypatch, client: FakeClient) -> FakeClient:
+    """Send the requests to a fake client."""
+    monkeypatch.setattr(helpers, "get_client", lambda: client)
+    return client
+
+
+def cached_value(cache: ResponseCache, route: str, params: Dict) -> Any:
+    """Return the value of a cached response."""
+    return cache.get(route, params)["response"]["data"][0]["value"]
+
+
+def test_releases():
+    """Releases are the next ones strictly after a moment."""
+    thursday = WeeklyRelease(weekday=3, hour=15, minute=30)
+    assert thursday.next_after(datetime(2024, 1, 4, 15, 30)) == datetime(
+        2024, 1, 11, 15, 30
+    )
+    end_of_month = MonthlyRelease(day=-1, hour=16)
+    assert end_of_month.next_after(datetime(2024, 2, 10)) == datetime(2024, 2, 29, 16)
+    assert end_of_month.next_after(datetime(2024, 12, 31, 17)) == datetime(
+        2025, 1, 31, 16
+    )
+    assert get_release(WEEKLY) is not get_release(MONTHLY)
+
+
+def test_routes_default_to_the_cached_requests(cache):
+    """Only the routes with cached requests or jobs are scheduled."""
+    assert not PrefetchScheduler().routes()
+    cache.set(MONTHLY, {"frequency": "monthly"}, {"response": {"data": []}})
+    assert PrefetchScheduler().routes() == [MONTHLY]
+    assert PrefetchScheduler([PrefetchJob(FakeFetcher, {})]).routes() == [
+        MONTHLY,
+        WEEKLY,
+    ]
+
+
+def test_warm_overwrites_the_cached_requests(cache, monkeypatch):
+    """Cached requests are refetched in place, without jobs for the route."""
+    client = use_client(monkeypatch, FakeClient())
+    params = {"frequency": "monthly", "offset": 0}
+    cache.set(MONTHLY, params, {"response": {"data": [{"value": 0}]}})
+    assert asyncio.run(PrefetchScheduler(api_key="key").warm(MONTHLY)) == 1
+    assert client.urls[0].endswith("/natural-gas/cons/sum/data")
+    assert cached_value(cache, MONTHLY, params) == 1
+
+
+def test_failed_warm_keeps_the_cached_response(cache, monkeypatch):
+    """A request failing after a release keeps its previous response."""
+    use_client(monkeypatch, FakeClient(fail=True))
+    params = {"frequency": "monthly"}
+    cache.set(MONTHLY, params, {"response": {"data": [{"value": 0}]}})
+    with pytest.warns(UserWarning, match="1 cached requests"):
+        assert asyncio.run(PrefetchScheduler().warm(MONTHLY)) == 0
+    assert cached_value(cache, MONTHLY, params) == 0
+
+
+def test_warm_runs_the_jobs_of_the_route(cache, monkeypatch):
+    """Jobs are refetched after the cached requests of their route."""
+    use_client(monkeypatch, FakeClient())
+    monkeypatch.setattr(FakeFetcher, "queries", [])
+    cache.set(WEEKLY, {"frequency": "weekly"}, {"response": {"data": [{"value": 0}]}})
+    jobs = [PrefetchJob(FakeFetcher, {"frequency": "weekly"})]
+    warmer = PrefetchScheduler(jobs, api_key="key")
+    assert asyncio.run(warmer.warm(WEEKLY)) == 2
+    assert asyncio.run(warmer.warm(MONTHLY)) == 0
+    assert FakeFetcher.queries == [{"frequency": "weekly", "eia_api_key": "key"}]
+    assert cached_value(cache, WEEKLY, {"frequency": "weekly"}) == 1
+
+
+def test_load_jobs(tmp_path):
+    """Jobs are read from a JSON file of fetcher names and queries."""
+    path = tmp_path / "jobs.json"
+    path.write_text(
+        json.dumps([{"fetcher": "Fake", "params": {"frequency": "weekly"}}])
+    )
+    jobs = load_jobs(path, {"Fake": FakeFetcher})
+    assert [(job.route, job.params) for job in jobs] == [
+        (WEEKLY, {"frequency": "weekly"})
+    ]
+    with pytest.raises(ValueError, match="Unknown fetcher Fake"):
+        load_jobs(path, {})
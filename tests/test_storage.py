@@ -0,0 +1,83 @@
+"""Tests of the weekly storage statistics."""
+from datetime import date
+
+import pytest
+
+from openbb_energy.eia.natural_gas.storage import KEPT_YEARS, WeeklyStorageStats
+
+
+def make_row(period: date, value, series: str = "NW2_EPG0_SWO_R48_BCF") -> dict:
+    """Return a weekly storage row."""
+    return {
+        "period": period.isoformat(),
+        "series": series,
+        "duoarea": "R48",
+        "series-description": "Weekly Lower 48 States Natural Gas Working Gas",
+        "units": "BCF",
+        "value": value,
+    }
+
+
+def week(year: int, number: int = 45) -> date:
+    """Return the Friday of an ISO week."""
+    return date.fromisocalendar(year, number, 5)
+
+
+def test_report_compares_with_last_year_and_five_year_average():
+    """Reports are compared with the same week of the previous years."""
+    stats = WeeklyStorageStats()
+    stats.update(
+        [make_row(week(year), 3000 + year - 2018) for year in range(2018, 2023)]
+    )
+    stats.update([make_row(week(2023, 44), 3700)])
+    report = stats.update([make_row(week(2023), 3800)])[0]
+    assert report["last_year"] == 3004
+    assert report["vs_last_year"] == 796
+    assert report["five_year_average"] == pytest.approx(3002)
+    assert report["five_year_min"] == 3000
+    assert report["five_year_max"] == 3004
+    assert report["net_change"] == 100
+    assert stats.report() == [report]
+
+
+def test_average_needs_five_years():
+    """The 5-year statistics are left out until five years are stored."""
+    stats = WeeklyStorageStats()
+    report = stats.update([make_row(week(2022), 10), make_row(week(2023), 12)])[-1]
+    assert report["last_year"] == 10
+    assert report["five_year_average"] is None
+    assert report["net_change"] is None
+
+
+def test_old_years_are_dropped_and_sentinels_skipped():
+    """Each week keeps the years of the average and the current one."""
+    stats = WeeklyStorageStats()
+    assert not stats.update([make_row(week(2023), "NA")])
+    stats.update([make_row(week(year), year) for year in range(2010, 2024)])
+    (state,) = stats.series.values()
+    assert sorted(state.weeks[45]) == list(range(2024 - KEPT_YEARS, 2024))
+
+
+def test_statistics_are_saved(tmp_path):
+    """Saved statistics are loaded back."""
+    path = tmp_path / "stats.json"
+    stats = WeeklyStorageStats(path)
+    stats.update([make_row(week(2022), 10), make_row(week(2023), 12)])
+    stats.save()
+    loaded = WeeklyStorageStats(path)
+    assert loaded.report() == stats.report()
+    assert loaded.last_period() == week(2023).isoformat()
+
+
+def test_week_53_falls_back_to_week_52():
+    """Week 53 is kept apart, and compared with week 52 of years without one."""
+    stats = WeeklyStorageStats()
+    stats.update([make_row(week(year, 52), year - 2000) for year in range(2015, 2021)])
+    stats.update([make_row(week(2015, 53), 100)])
+    report = stats.update([make_row(week(2020, 53), 30)])[0]
+    assert report["last_year"] == 19
+    assert report["five_year_average"] == pytest.approx((100 + 16 + 17 + 18 + 19) / 5)
+    assert report["net_change"] == 10
+    (state,) = stats.series.values()
+    assert state.weeks[52][2015] == 15
+    assert state.weeks[53] == {2015: 100, 2020: 30}
@@ -0,0 +1,159 @@
+"""Tests of the tracing and metrics of the EIA provider."""
+import asyncio
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List
+
+import pytest
+
+from openbb_energy.eia.natural_gas import natural_gas
+from openbb_energy.eia.natural_gas.registry import FETCHERS
+from openbb_energy.eia.utils import telemetry
+from openbb_energy.eia.utils.telemetry import (
+    MetricsRegistry,
+    Tracer,
+    is_traced,
+    traced,
+)
+
+ROW = {
+    "period": "2023-01",
+    "duoarea": "SCA",
+    "area-name": "California",
+    "product": "EPG0",
+    "product-name": "Natural Gas",
+    "process": "VC0",
+    "process-name": "Total Consumption",
+    "series": "N3010CA2",
+    "series-description": "California Natural Gas Total Consumption",
+    "value": "12.5",
+    "units": "MMCF",
+}
+
+
+@pytest.fixture(name="tracer")
+def fixture_tracer(monkeypatch) -> Tracer:
+    """Trace into a fresh tracer and metrics registry."""
+    metrics = MetricsRegistry()
+    tracer = Tracer(metrics)
+    monkeypatch.setattr(telemetry, "_metrics", metrics)
+    monkeypatch.setattr(telemetry, "_tracer", tracer)
+    return tracer
+
+
+def test_spans_nest_and_record_errors(tracer):
+    """Child spans share the trace and model of their parent."""
+    with pytest.raises(ValueError):
+        with tracer.span("fetch", model="Storage") as parent:
+            with tracer.span("http") as child:
+                raise ValueError("boom")
+    assert [span.name for span in tracer.recent] == ["http", "fetch"]
+    assert child.trace_id == parent.trace_id
+    assert child.parent_id == parent.span_id
+    assert child.attributes["model"] == "Storage"
+    assert (child.status, parent.status) == ("ERROR", "ERROR")
+    assert telemetry.current_span() is None
+    assert child.to_dict()["parentSpanId"] == f"{parent.span_id:016x}"
+
+
+def test_failing_exporter_is_skipped(tracer):
+    """A failing exporter warns without failing the traced block."""
+    exported: List[str] = []
+
+    def exporter(span: telemetry.Span) -> None:
+        raise RuntimeError("collector down")
+
+    tracer.add_exporter(exporter)
+    tracer.add_exporter(lambda span: exported.append(span.name))
+    with pytest.warns(UserWarning, match="collector down"):
+        with tracer.span("decode"):
+            pass
+    assert exported == ["decode"]
+
+
+def test_otel_spans_get_the_error(tracer):
+    """OpenTelemetry spans are entered and exited with the error of the block."""
+    events: List[Any] = []
+
+    class FakeOtelTracer:  # pylint: disable=too-few-public-methods
+        """OpenTelemetry tracer recording its spans."""
+
+        @contextmanager
+        def start_as_current_span(self, name: str, **_: Any) -> Iterator[Any]:
+            """Record the span and its error."""
+            events.append(("enter", name))
+            try:
+                yield self
+            except ValueError as e:
+                events.append(("error", str(e)))
+                raise
+
+    tracer._otel_tracer = FakeOtelTracer()  # pylint: disable=protected-access
+    with tracer.span("http"):
+        pass
+    with pytest.raises(ValueError):
+        with tracer.span("decode"):
+            raise ValueError("bad json")
+    assert events == [("enter", "http"), ("enter", "decode"), ("error", "bad json")]
+
+
+def test_render_prometheus_text():
+    """Counters and histograms are rendered in the text exposition format."""
+    metrics = MetricsRegistry()
+    metrics.counter("requests_total", "Requests.", ("host",)).inc(host='a"b')
+    histogram = metrics.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+    histogram.observe(0.5)
+    histogram.observe(2.0)
+    lines = metrics.render().splitlines()
+    assert "# TYPE requests_total counter" in lines
+    assert 'requests_total{host="a\\"b"} 1.0' in lines
+    assert 'latency_seconds_bucket{le="0.1"} 0' in lines
+    assert 'latency_seconds_bucket{le="1.0"} 1' in lines
+    assert 'latency_seconds_bucket{le="+Inf"} 2' in lines
+    assert "latency_seconds_count 2" in lines
+
+
+def test_traced_records_rows(tracer):
+    """Decorated functions, sync or async, run in a span with their rows."""
+
+    @traced("decode", rows=True)
+    def decode() -> List[int]:
+        return [1, 2]
+
+    @traced("http")
+    async def fetch() -> Dict:
+        return {}
+
+    decode()
+    asyncio.run(fetch())
+    assert [(span.name, span.attributes) for span in tracer.recent] == [
+        ("decode", {"rows": 2}),
+        ("http", {}),
+    ]
+    assert is_traced(decode) and not is_traced(decode.__wrapped__)
+
+
+def test_fetcher_stages_are_traced_once(tracer, monkeypatch):
+    """The pipeline runs in a fetch span with one child span per stage."""
+
+    async def afetch_route(**_: Any) -> List[Dict]:
+        return [ROW, {**ROW, "period": "2023-02"}]
+
+    monkeypatch.setattr(natural_gas, "afetch_route", afetch_route)
+    fetcher = FETCHERS["ConsumptionByEndUse"]
+
+    class ResidentialFetcher(fetcher):  # type: ignore
+        """Subclass inheriting the timed stages."""
+
+    assert not set(ResidentialFetcher.__dict__) & set(natural_gas.TRACED_STAGES)
+    data = asyncio.run(ResidentialFetcher.fetch_data({"frequency": "monthly"}))
+    assert len(data) == 2
+    assert [span.name for span in tracer.recent] == [
+        "transform_query",
+        "extract_data",
+        "transform_data",
+        "fetch",
+    ]
+    assert tracer.recent[-1].attributes == {"model": "ResidentialFetcher"}
+    assert tracer.recent[1].attributes["rows"] == 2
+    rows = tracer.metrics.counter("eia_rows_total", "", ("model",))
+    assert rows.get(model="ResidentialFetcher") == 2
@@ -0,0 +1,92 @@
+"""Tests of the vintage store of EIA observations."""
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from openbb_energy.eia.utils.vintages import VintageStore, make_vintage
+
+ROUTE = "natural-gas/cons/sum"
+
+
+def make_row(series: str, period: str, value: str) -> dict:
+    """Return an EIA row."""
+    return {"series": series, "period": period, "value": value}
+
+
+@pytest.fixture(name="store")
+def fixture_store(tmp_path) -> VintageStore:
+    """Return a store with a preliminary and a revised release."""
+    store = VintageStore(tmp_path / "vintages.sqlite")
+    store.record(
+        ROUTE,
+        [make_row("A", "2023-01", "10"), make_row("A", "2023-02", "20")],
+        "2023-03-31T12:00:00",
+    )
+    store.record(
+        ROUTE,
+        [
+            make_row("A", "2023-01", "10"),
+            make_row("A", "2023-02", "21"),
+            make_row("A", "2023-03", "30"),
+        ],
+        "2023-04-30T12:00:00",
+    )
+    return store
+
+
+def test_make_vintage():
+    """Vintages are naive UTC timestamps, dates stand for the end of the day."""
+    assert make_vintage("2023-04-30") == "2023-04-30T23:59:59"
+    assert make_vintage(date(2023, 4, 30)) == "2023-04-30T23:59:59"
+    assert make_vintage("2023-04-30T12:00:00Z") == "2023-04-30T12:00:00"
+    eastern = timezone(timedelta(hours=-5))
+    assert make_vintage(datetime(2023, 4, 30, 7, tzinfo=eastern)) == (
+        "2023-04-30T12:00:00"
+    )
+
+
+def test_only_revisions_are_stored(store):
+    """Unchanged observations add no vintage."""
+    assert store.record(ROUTE, [make_row("A", "2023-01", "10")], "2023-05-31") == 0
+    assert store.vintages(ROUTE) == ["2023-03-31T12:00:00", "2023-04-30T12:00:00"]
+
+
+def test_as_of(store):
+    """Observations are returned as they were known at a time."""
+    assert [(r["period"], r["value"]) for r in store.as_of(ROUTE, "2023-04-01")] == [
+        ("2023-01", "10"),
+        ("2023-02", "20"),
+    ]
+    latest = store.as_of(ROUTE, "2023-12-31")
+    assert [(r["period"], r["value"], r["vintage"]) for r in latest] == [
+        ("2023-01", "10", "2023-03-31T12:00:00"),
+        ("2023-02", "21", "2023-04-30T12:00:00"),
+        ("2023-03", "30", "2023-04-30T12:00:00"),
+    ]
+    assert not store.as_of(ROUTE, "2023-03-01")
+    assert [r["period"] for r in store.as_of(ROUTE, "2023-12-31", start="2023-02")] == [
+        "2023-02",
+        "2023-03",
+    ]
+
+
+def test_diff(store):
+    """Revised and new observations between two times are returned."""
+    assert store.diff(ROUTE, "2023-04-01", "2023-05-01") == [
+        {
+            "series": "A",
+            "period": "2023-02",
+            "before": "20",
+            "after": "21",
+            "vintage": "2023-04-30T12:00:00",
+        },
+        {
+            "series": "A",
+            "period": "2023-03",
+            "before": None,
+            "after": "30",
+            "vintage": "2023-04-30T12:00:00",
+        },
+    ]
+    assert not store.diff(ROUTE, "2023-05-01", "2023-06-01")
+    assert not store.diff(ROUTE, "2023-04-01", "2023-05-01", series=["B"])
@@ -0,0 +1,156 @@
+"""Tests of the watermarks and upserts of the Parquet warehouse."""
+import asyncio
+import json
+from typing import Any, List
+
+import pytest
+
+from openbb_energy.eia.natural_gas.natural_gas import NaturalGasQueryParams
+from openbb_energy.eia.utils import warehouse as warehouse_module
+from openbb_energy.eia.utils.route_fetcher import read_warehouse
+from openbb_energy.eia.utils.warehouse import (
+    ParquetWarehouse,
+    shift_period,
+    sync_provider_routes,
+)
+
+pytest.importorskip("pyarrow")
+
+ROUTE = "natural-gas/cons/sum"
+
+
+def make_row(series: str, period: str, value: str, area: str = "SCA") -> dict:
+    """Return an EIA row."""
+    return {
+        "period": period,
+        "duoarea": area,
+        "product": "EPG0",
+        "process": "VC0",
+        "series": series,
+        "value": value,
+    }
+
+
+def test_shift_period():
+    """Periods move by periods of their frequency."""
+    assert shift_period("2023-03", "monthly", -6) == "2022-09"
+    assert shift_period("2023-Q1", "quarterly", -2) == "2022-Q3"
+    assert shift_period("2023", "annual", -1) == "2022"
+    assert shift_period("2023-03-10", "weekly", -1) == "2023-03-03"
+
+
+def test_watermarks_are_kept_per_series(tmp_path):
+    """Each series of an area keeps its own last period."""
+    warehouse = ParquetWarehouse(tmp_path)
+    warehouse.write(
+        ROUTE,
+        "monthly",
+        [
+            make_row("A", "2023-01", "1"),
+            make_row("A", "2023-03", "3"),
+            make_row("B", "2023-01", "1"),
+            make_row("C", "2022-12", "1", area="SFL"),
+        ],
+    )
+    assert warehouse.watermarks(ROUTE, "monthly") == {
+        "SCA": {"A": "2023-03", "B": "2023-01"},
+        "SFL": {"C": "2022-12"},
+    }
+    assert warehouse.last_periods(ROUTE, "monthly") == {
+        "SCA": "2023-03",
+        "SFL": "2022-12",
+    }
+
+
+def test_write_upserts_revised_rows(tmp_path):
+    """Unchanged rows are skipped, revised rows replace the stored ones."""
+    warehouse = ParquetWarehouse(tmp_path)
+    rows = [make_row("A", "2023-01", "1"), make_row("A", "2023-02", "2")]
+    assert warehouse.write(ROUTE, "monthly", rows) == 2
+    assert warehouse.write(ROUTE, "monthly", rows) == 0
+    revised = [make_row("A", "2023-02", "2.5"), make_row("A", "2023-03", "W")]
+    assert warehouse.write(ROUTE, "monthly", revised) == 2
+
+    stored = warehouse.read_rows(ROUTE, "monthly")
+    assert [(r["period"], r["value"]) for r in stored] == [
+        ("2023-01", 1.0),
+        ("2023-02", 2.5),
+        ("2023-03", "W"),
+    ]
+    assert warehouse.watermarks(ROUTE, "monthly") == {"SCA": {"A": "2023-03"}}
+
+
+def test_legacy_manifest_watermarks(tmp_path):
+    """Manifests with one period per area are read as a watermark of all series."""
+    (tmp_path / "manifest.json").write_text(
+        json.dumps({ROUTE: {"monthly": {"SCA": "2023-01"}}})
+    )
+    warehouse = ParquetWarehouse(tmp_path)
+    assert warehouse.watermarks(ROUTE, "monthly") == {"SCA": {"": "2023-01"}}
+    assert warehouse.last_periods(ROUTE, "monthly") == {"SCA": "2023-01"}
+
+
+def test_read_warehouse_sorts_like_eia(tmp_path, monkeypatch):
+    """Queries served from the warehouse are sorted by `sort_by`."""
+    monkeypatch.setattr(warehouse_module, "_warehouse", None)
+    monkeypatch.setenv("OPENBB_EIA_WAREHOUSE", str(tmp_path))
+    ParquetWarehouse(tmp_path).write(
+        ROUTE,
+        "monthly",
+        [
+            make_row("A", "2023-01", "3"),
+            make_row("A", "2023-02", "W"),
+            make_row("A", "2023-03", "1"),
+            make_row("A", "2023-04", "2"),
+        ],
+    )
+    query = NaturalGasQueryParams(
+        frequency="monthly", sort_by="value", sort_order="desc"
+    )
+    rows = read_warehouse(query, ROUTE)
+    assert rows is not None
+    assert [row["period"] for row in rows] == [
+        "2023-01",
+        "2023-04",
+        "2023-03",
+        "2023-02",
+    ]
+    unsorted = read_warehouse(NaturalGasQueryParams(frequency="monthly"), ROUTE)
+    assert unsorted is not None
+    assert [row["period"] for row in unsorted] == [
+        "2023-01",
+        "2023-02",
+        "2023-03",
+        "2023-04",
+    ]
+
+
+def test_sync_provider_routes_syncs_each_route_once(tmp_path, monkeypatch):
+    """Fetchers of the same route and frequency are synced once."""
+    synced: List[Any] = []
+
+    async def sync(self, **kwargs: Any) -> int:  # pylint: disable=unused-argument
+        synced.append((kwargs["route1"], kwargs["route2"], kwargs["frequency"]))
+        return 1
+
+    monkeypatch.setattr(ParquetWarehouse, "sync", sync)
+
+    class Consumption:  # pylint: disable=too-few-public-methods
+        """Fetcher stand-in."""
+
+        api, route1, route2 = "natural-gas", "cons", "sum"
+        frequencies = ("monthly", "annual")
+
+    class ConsumptionByArea(Consumption):  # pylint: disable=too-few-public-methods
+        """Fetcher of the same route."""
+
+    written = asyncio.run(
+        sync_provider_routes(
+            ParquetWarehouse(tmp_path), [Consumption, ConsumptionByArea], "key"
+        )
+    )
+    assert sorted(synced) == [("cons", "sum", "annual"), ("cons", "sum", "monthly")]
+    assert written == {
+        "natural-gas/cons/sum (annual)": 1,
+        "natural-gas/cons/sum (monthly)": 1,
+    }